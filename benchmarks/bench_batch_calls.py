@@ -0,0 +1,63 @@
+"""
+Batch Call Benchmark
+====================
+Tool calls per second over stdio when each call is its own JSON-RPC round
+trip versus packed into batch_call requests of 1, 10, 100 and 1,000
+entries. Calls cycle through echo, add_numbers and timestamp.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "server.py")
+BATCH_SIZES = [1, 10, 100, 1000]
+CALLS = [
+    {"name": "echo", "arguments": {"message": "hello"}},
+    {"name": "add_numbers", "arguments": {"a": 2, "b": 3}},
+    {"name": "timestamp", "arguments": {"format": "unix"}},
+]
+
+
+async def individual(session, total):
+    start = time.perf_counter()
+    for call in itertools.islice(itertools.cycle(CALLS), total):
+        await session.call_tool(call["name"], call["arguments"])
+    return total / (time.perf_counter() - start)
+
+
+async def batched(session, total, size):
+    calls = list(itertools.islice(itertools.cycle(CALLS), size))
+    start = time.perf_counter()
+    for _ in range(total // size):
+        result = await session.call_tool("batch_call", {"calls": calls})
+        assert result.structuredContent["errors"] == 0
+    return (total // size * size) / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=10000, help="Tool calls per measurement")
+    args = parser.parse_args()
+
+    params = StdioServerParameters(command=sys.executable, args=[SERVER, "--batch-tool"])
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            baseline = await individual(session, args.calls)
+            print(f"{args.calls} calls over stdio\n")
+            print(f"{'mode':<18}{'calls/sec':>12}{'vs individual':>15}")
+            print(f"{'individual':<18}{baseline:>12.0f}{1:>14.1f}x")
+            for size in BATCH_SIZES:
+                rate = await batched(session, args.calls, size)
+                print(f"{f'batch of {size}':<18}{rate:>12.0f}{rate / baseline:>14.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Blob Resource Benchmark
+=======================
+Peak memory and throughput of serving a binary file resource, from the
+resources/read handler through the JSON serialization every transport
+does. "sdk bytes" is the stock path: the provider slices the window out
+of the mmap and the SDK base64-encodes the bytes; "memoryview" encodes
+straight from a memoryview over the mmap and hands the SDK the finished
+base64. Whole-blob reads use one window the size of the
+blob; paged reads walk `next` links in --page-mb windows. Each case runs
+in its own process; peak RSS is reported above the pre-read baseline,
+as a multiple of the blob size.
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import ReadResourceRequest, ReadResourceRequestParams
+
+SIZES_MB = [1, 10, 100, 500]
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def sdk_bytes_handler(provider):
+    """The SDK's own read_resource wrapper fed bytes sliced out of the mapping."""
+    import mmap
+
+    async def read(uri):
+        path, query = provider.resolve(str(uri))
+        size = os.path.getsize(path)
+        start, stop, meta = provider._byte_window(size, query.get("bytes", ["0-"])[0], str(uri).split("?")[0])
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [ReadResourceContents(mm[start:stop], "application/octet-stream", meta)]
+
+    baseline = Server("baseline")
+    baseline.read_resource()(read)
+    return baseline.request_handlers[ReadResourceRequest]
+
+
+async def child(mode, directory, size_mb, window_mb):
+    provider = server.configure_file_resources(directory, max_read_bytes=window_mb << 20)
+    handler = server.server.request_handlers[ReadResourceRequest] if mode == "memoryview" else sdk_bytes_handler(provider)
+    before = rss_mb()
+    uri = "mcp://files/blob.bin"
+    served = 0
+    start = time.perf_counter()
+    while uri:
+        result = await handler(ReadResourceRequest(
+            method="resources/read", params=ReadResourceRequestParams(uri=uri)
+        ))
+        wire = result.model_dump_json(by_alias=True, exclude_none=True)
+        contents = result.root.contents[0]
+        served += len(contents.blob) * 3 // 4
+        uri = contents.meta.get("next")
+        del result, contents, wire
+    elapsed = time.perf_counter() - start
+    assert served >= (size_mb << 20) - 2
+    print(f"{elapsed:.3f} {rss_mb() - before:.0f}")
+
+
+def run_child(mode, directory, size_mb, window_mb):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--dir", directory,
+         "--sizes", str(size_mb), "--page-mb", str(window_mb)],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES_MB)), help="Blob sizes in MB")
+    parser.add_argument("--page-mb", type=int, default=4, help="Window for paged reads")
+    parser.add_argument("--child", choices=("sdk", "memoryview"), help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.child:
+        asyncio.run(child(args.child, args.dir, sizes[0], args.page_mb))
+        return
+
+    print(f"{'blob':>8} {'read':<12}{'mode':<12}{'MB/s':>9}{'peak RSS MB':>13}{'x blob':>8}")
+    for size_mb in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            block = os.urandom(1 << 20)
+            with open(os.path.join(directory, "blob.bin"), "wb") as f:
+                for _ in range(size_mb):
+                    f.write(block)
+            for label, window_mb in (("whole", size_mb), (f"{args.page_mb} MB pages", args.page_mb)):
+                if window_mb > size_mb and label != "whole":
+                    continue
+                for mode in ("sdk", "memoryview"):
+                    seconds, peak = run_child(mode, directory, size_mb, window_mb)
+                    print(
+                        f"{size_mb:>5} MB {label:<12}{'sdk bytes' if mode == 'sdk' else mode:<12}"
+                        f"{size_mb / seconds:>9.0f}{peak:>13.0f}{peak / size_mb:>7.2f}x"
+                    )
+        print()
+
+
+if __name__ == "__main__":
+    main()
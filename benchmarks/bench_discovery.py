@@ -0,0 +1,68 @@
+"""
+Discovery Throughput Benchmark
+==============================
+Compares tools/list, resources/list and prompts/list throughput through
+the registered request handlers plus the JSON serialization every
+transport does: handlers that rebuild the result list on every call (the
+previous behaviour) against the memoized, versioned catalogs.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp.server import Server
+from mcp.types import ListPromptsRequest, ListResourcesRequest, ListToolsRequest
+
+import server
+
+CALLS = 5000
+
+REQUESTS = [
+    ("tools/list", ListToolsRequest(method="tools/list")),
+    ("resources/list", ListResourcesRequest(method="resources/list")),
+    ("prompts/list", ListPromptsRequest(method="prompts/list")),
+]
+
+
+def rebuilding_server():
+    """A server whose list handlers return fresh lists each call, the way the handlers used to."""
+    baseline = Server("baseline")
+
+    @baseline.list_tools()
+    async def list_tools():
+        return [tool.model_copy() for tool in server.registry.tools()]
+
+    @baseline.list_resources()
+    async def list_resources():
+        return [resource.model_copy() for resource in server.resource_catalog.items()]
+
+    @baseline.list_prompts()
+    async def list_prompts():
+        return [prompt.model_copy() for prompt in server.prompt_registry.catalog.items()]
+
+    return baseline
+
+
+async def rate(handler, request):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        result = await handler(request)
+        result.model_dump_json(by_alias=True, exclude_none=True)
+    return CALLS / (time.perf_counter() - start)
+
+
+async def main():
+    baseline = rebuilding_server()
+    print(f"{'request':<16} {'rebuild (calls/s)':>18} {'memoized (calls/s)':>19} {'speedup':>8}")
+    for name, request in REQUESTS:
+        rebuild_rate = await rate(baseline.request_handlers[type(request)], request)
+        memo_rate = await rate(server.server.request_handlers[type(request)], request)
+        print(f"{name:<16} {rebuild_rate:>18,.0f} {memo_rate:>19,.0f} {memo_rate / rebuild_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Tool Dispatch Benchmark
+=======================
+Measures call_tool dispatch latency as the number of registered tools grows.
+Synthetic tools are registered alongside the built-in six so the lookup
+cost can be compared from 6 up to 1,000 tools.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp.types import TextContent, Tool
+
+import server
+
+TOOL_COUNTS = [6, 10, 100, 1000]
+CALLS = 20000
+
+
+async def synthetic_handler(arguments):
+    return [TextContent(type="text", text="ok")]
+
+
+def populate(count):
+    """Pad the shared registry with synthetic tools up to `count` entries."""
+    for i in range(count - len(server.registry)):
+        server.registry.register(
+            Tool(
+                name=f"synthetic_{i}",
+                description="Synthetic tool for dispatch benchmarking",
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            synthetic_handler,
+        )
+
+
+async def time_dispatch(name, arguments):
+    """Return mean dispatch latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await server.call_tool(name, arguments)
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+async def time_unknown():
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        try:
+            await server.call_tool("does-not-exist", {})
+        except ValueError:
+            pass
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+async def main():
+    print(f"{'tools':>8} {'echo (us)':>12} {'last tool (us)':>16} {'unknown (us)':>14}")
+    for count in TOOL_COUNTS:
+        populate(count)
+        last = server.registry.tools()[-1].name
+        echo_us = await time_dispatch("echo", {"message": "hi"})
+        last_us = await time_dispatch(last, {})
+        unknown_us = await time_unknown()
+        print(f"{count:>8} {echo_us:>12.2f} {last_us:>16.2f} {unknown_us:>14.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+List Sort Benchmark
+===================
+Wall time and peak RSS of list_operations sort through call_tool on an
+in-memory list of short strings, the way the tool receives them, against
+the plain f"Sorted: {sorted(items)}" rendering. "stream" returns
+--chunk-size pieces (no progress token, so the chunks come back as
+TextContent blocks); a streamed natural/numeric sort spills its keys past
+--budget-mb. Each measurement runs in its own child process and reports
+peak RSS above the resident input list.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+
+MODES = ("sorted()", "call_tool", "stream")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_mode(mode, items, sort_key, chunk_size):
+    arguments = {"items": items, "operation": "sort", "sort_key": sort_key}
+    if mode == "sorted()":
+        return len(f"Sorted: {sorted(items, key=server.SORT_KEY_FUNCTIONS[sort_key])}")
+    if mode == "stream":
+        arguments.update(stream=True, chunk_size=chunk_size)
+    result = await server.call_tool("list_operations", arguments)
+    return sum(len(block.text) for block in result)
+
+
+def child(mode, count, budget_mb, sort_key, chunk_size):
+    rng = random.Random(0)
+    items = [f"{rng.getrandbits(40):010x}" for _ in range(count)]
+    server.configure_sort_memory(budget_mb << 20)
+    asyncio.run(run_mode(mode, items[:10], sort_key, chunk_size))
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    length = asyncio.run(run_mode(mode, items, sort_key, chunk_size))
+    elapsed = time.perf_counter() - start
+    assert length == len("Sorted: []") + count * 14 - 2
+    print(f"{elapsed:.2f} {peak_rss_mb() - before:.0f}")
+
+
+def run_child(mode, args, sort_key):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--count", str(args.count),
+         "--budget-mb", str(args.budget_mb), "--sort-keys", sort_key, "--chunk-size", str(args.chunk_size)],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=2_000_000, help="Strings in the list")
+    parser.add_argument("--budget-mb", type=int, default=16, help="--sort-memory-mb for the server")
+    parser.add_argument("--sort-keys", default="lexical,natural")
+    parser.add_argument("--chunk-size", type=int, default=server.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.count, args.budget_mb, args.sort_keys, args.chunk_size)
+        return
+
+    print(f"{args.count:,} 10-char strings, budget={args.budget_mb} MB\n")
+    print(f"{'sort_key':<10}{'mode':<12}{'seconds':>10}{'peak RSS MB':>14}")
+    for sort_key in args.sort_keys.split(","):
+        for mode in MODES:
+            seconds, rss = run_child(mode, args, sort_key)
+            print(f"{sort_key:<10}{mode:<12}{seconds:>10.2f}{rss:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+File Resource Benchmark
+=======================
+Pages through a large generated log file (1 GB by default) through the
+mmap-backed file resource provider, following each read's `next` URI, by
+byte range and by line range. Reports throughput and peak RSS growth per
+mode next to a naive whole-file read. Each mode runs in a fresh child
+process so peak RSS is measured independently (Linux only).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+LINE = b"2026-01-01T00:00:00Z INFO request handled path=/api/items status=200 duration_ms=12 id=%08d\n"
+
+
+def generate(path, size_mb):
+    block = b"".join(LINE % i for i in range(10000))
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+
+
+def status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def child(path, mode, page_bytes, page_lines):
+    import server
+
+    provider = server.configure_file_resources(os.path.dirname(path), max_read_bytes=page_bytes)
+    uri = provider.uri_for(os.path.basename(path))
+    reset_peak_rss()
+    baseline = status_kb("VmRSS:")
+    start = time.perf_counter()
+    total = 0
+    reads = 0
+    if mode == "naive":
+        with open(path, "rb") as f:
+            total = len(f.read())
+        reads = 1
+    else:
+        next_uri = f"{uri}?bytes=0-" if mode == "bytes" else f"{uri}?lines=1-{page_lines}"
+        while next_uri:
+            contents = provider.read(next_uri)[0]
+            total += len(contents.content)
+            reads += 1
+            meta = contents.meta
+            next_uri = meta.get("next")
+            if mode == "lines" and next_uri is None:
+                last = int(meta["range"].split("-")[1])
+                if last < meta["lines"]:
+                    next_uri = f"{uri}?lines={last + 1}-{last + page_lines}"
+    elapsed = time.perf_counter() - start
+    peak = status_kb("VmHWM:") - baseline
+    print(json.dumps({"elapsed": elapsed, "bytes": total, "reads": reads, "peak_kb": peak}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--page-bytes", type=int, default=4 << 20)
+    parser.add_argument("--page-lines", type=int, default=20000)
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.page_bytes, args.page_lines)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.log")
+        generate(path, args.size_mb)
+        print(f"{os.path.getsize(path) / 1024 / 1024:,.0f} MB file, pages of "
+              f"{args.page_bytes >> 20} MB / {args.page_lines:,} lines\n")
+        print(f"{'mode':<8} {'reads':>7} {'elapsed (s)':>12} {'MB/s':>9} {'peak RSS +MB':>13}")
+        for mode in ("naive", "bytes", "lines"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", path, mode,
+                 "--page-bytes", str(args.page_bytes), "--page-lines", str(args.page_lines)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(out.stdout)
+            rate = r["bytes"] / 1024 / 1024 / r["elapsed"]
+            print(f"{mode:<8} {r['reads']:>7,} {r['elapsed']:>12.2f} {rate:>9,.0f} {r['peak_kb'] / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
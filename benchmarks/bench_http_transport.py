@@ -0,0 +1,111 @@
+"""
+HTTP Transport Load Test
+========================
+Compares requests/sec of one long-lived `mcp-test-server --transport http`
+process serving concurrent sessions over persistent connections with the
+stdio model, where every session spawns its own server process.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamable_http_client
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "server.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"HTTP server did not start on port {port}")
+
+
+async def exercise(session, calls):
+    await session.initialize()
+    for i in range(calls):
+        await session.call_tool("echo", {"message": f"call-{i}"})
+
+
+async def http_session(url, client, calls):
+    async with streamable_http_client(url, http_client=client) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await exercise(session, calls)
+
+
+async def stdio_session(calls):
+    params = StdioServerParameters(command=sys.executable, args=[SERVER])
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await exercise(session, calls)
+
+
+async def run_sessions(factory, sessions, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            await factory()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(sessions)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=25, help="echo calls per session")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, SERVER, "--transport", "http", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_port(port)
+        url = f"http://127.0.0.1:{port}/mcp/"
+        limits = httpx.Limits(max_keepalive_connections=args.concurrency * 2)
+        async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+            http_elapsed = await run_sessions(
+                lambda: http_session(url, client, args.calls), args.sessions, args.concurrency
+            )
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    stdio_elapsed = await run_sessions(
+        lambda: stdio_session(args.calls), args.sessions, args.concurrency
+    )
+
+    # Each session also sends initialize, so count it as a request.
+    requests = args.sessions * (args.calls + 1)
+    print(f"{args.sessions} sessions x {args.calls} echo calls, {args.concurrency} concurrent\n")
+    print(f"{'transport':<28} {'elapsed (s)':>12} {'req/s':>10}")
+    print(f"{'http (one shared process)':<28} {http_elapsed:>12.2f} {requests / http_elapsed:>10,.0f}")
+    print(f"{'stdio (process per session)':<28} {stdio_elapsed:>12.2f} {requests / stdio_elapsed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""
+Sharded HTTP Worker Benchmark
+=============================
+tools/call requests per second against one Streamable HTTP endpoint
+served by 1, 2, 4 and 8 worker processes (--http-workers), with the
+single-process server as the baseline. The load comes from --client-procs
+generator processes on localhost, each holding --sessions MCP sessions
+on keep-alive connections and sending echo calls back to back, so the
+generators compete with the server for the same cores.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "server.py")
+WORKERS = [1, 2, 4, 8]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client for JSON-RPC POSTs to /mcp/."""
+
+    def __init__(self, port):
+        self.port = port
+        self.session_id = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+
+    async def post(self, message):
+        body = json.dumps(message).encode()
+        head = (
+            f"POST /mcp/ HTTP/1.1\r\nHost: 127.0.0.1:{self.port}\r\n"
+            "Content-Type: application/json\r\nAccept: application/json, text/event-stream\r\n"
+            f"Content-Length: {len(body)}\r\n"
+        )
+        if self.session_id:
+            head += f"Mcp-Session-Id: {self.session_id}\r\nMcp-Protocol-Version: 2025-06-18\r\n"
+        self.writer.write(head.encode() + b"\r\n" + body)
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}: {payload[:200]!r}")
+        self.session_id = headers.get("mcp-session-id", self.session_id)
+        return payload
+
+    async def initialize(self):
+        await self.post({
+            "jsonrpc": "2.0", "id": 0, "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "bench-http-workers", "version": "0"},
+            },
+        })
+        await self.post({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+
+async def child(port, sessions, warmup, duration):
+    connections = [Connection(port) for _ in range(sessions)]
+    for connection in connections:
+        await connection.open()
+        await connection.initialize()
+    start = time.perf_counter() + warmup
+    stop = start + duration
+    counts = [0] * sessions
+
+    async def drive(i, connection):
+        request_id = 0
+        while (now := time.perf_counter()) < stop:
+            request_id += 1
+            await connection.post({
+                "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                "params": {"name": "echo", "arguments": {"message": f"s{i} r{request_id}"}},
+            })
+            if now >= start:
+                counts[i] += 1
+
+    await asyncio.gather(*(drive(i, connection) for i, connection in enumerate(connections)))
+    print(sum(counts))
+
+
+def run_load(port, args):
+    generators = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--child", str(port), "--sessions", str(args.sessions),
+             "--warmup", str(args.warmup), "--duration", str(args.duration)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(args.client_procs)
+    ]
+    total = 0
+    for generator in generators:
+        out, _ = generator.communicate()
+        if generator.returncode:
+            raise RuntimeError("load generator failed")
+        total += int(out)
+    return total / args.duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default=",".join(map(str, WORKERS)), help="Worker counts to measure")
+    parser.add_argument("--client-procs", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--sessions", type=int, default=16, help="Sessions per generator process")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per configuration")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--child", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args.child, args.sessions, args.warmup, args.duration))
+        return
+
+    print(f"{os.cpu_count()} CPUs, {args.client_procs} generator processes x {args.sessions} sessions, "
+          f"{args.duration:g}s per configuration\n")
+    print(f"{'server':<16}{'req/s':>10}{'vs single':>11}")
+    baseline = None
+    for workers in [0] + [int(n) for n in args.workers.split(",")]:
+        port = free_port()
+        proc = subprocess.Popen(
+            [sys.executable, SERVER, "--transport", "http", "--port", str(port), "--json-response",
+             "--http-workers", str(workers)],
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            rate = run_load(port, args)
+        finally:
+            proc.terminate()
+            proc.wait()
+        baseline = baseline or rate
+        label = "single process" if workers == 0 else f"{workers} worker{'s' if workers > 1 else ''}"
+        print(f"{label:<16}{rate:>10,.0f}{rate / baseline:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+JSON Encoder Benchmark
+======================
+Encoder matrix over payload sizes and shapes (flat, deeply nested, wide
+arrays) for the stdlib and orjson serialization backends at indent=2.
+Every orjson result is checked to be byte-identical to json.dumps.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+
+SIZES = {"small": 100, "medium": 10_000, "large": 200_000}
+
+
+def flat(n):
+    return {f"key_{i}": (i if i % 3 else f"value-{i}") for i in range(n)}
+
+
+def nested(n):
+    # Chains of 50-deep objects, enough of them to reach ~n leaves.
+    def chain(depth, leaf):
+        node = {"leaf": leaf, "score": leaf * 0.25}
+        for level in range(depth):
+            node = {"level": level, "child": node}
+        return node
+    return {"chains": [chain(50, i) for i in range(max(1, n // 50))]}
+
+
+def wide(n):
+    return {"values": list(range(n)), "labels": [f"label-{i}" for i in range(n)]}
+
+
+SHAPES = {"flat": flat, "nested": nested, "wide": wide}
+
+
+def time_encode(backend, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = backend.dumps(payload, 2)
+    return (time.perf_counter() - start) / repeat * 1000, out
+
+
+def main():
+    if server.orjson is None:
+        print("orjson is not installed (pip install mcp-test-server[fast]); only stdlib is measured.\n")
+    backends = [server.StdlibJsonBackend()]
+    if server.orjson is not None:
+        backends.append(server.OrjsonJsonBackend())
+
+    header = f"{'shape':<8} {'size':<7} {'bytes':>11}"
+    for backend in backends:
+        header += f" {backend.name + ' (ms)':>14}"
+    print(header + f" {'speedup':>8}")
+
+    for shape, build in SHAPES.items():
+        for size_name, n in SIZES.items():
+            payload = build(n)
+            repeat = max(1, 200_000 // n)
+            reference = json.dumps(payload, indent=2)
+            row = f"{shape:<8} {size_name:<7} {len(reference):>11,}"
+            timings = []
+            for backend in backends:
+                ms, out = time_encode(backend, payload, repeat)
+                assert out == reference, f"{backend.name} output differs for {shape}/{size_name}"
+                timings.append(ms)
+                row += f" {ms:>14.3f}"
+            speedup = timings[0] / timings[-1]
+            print(row + f" {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+List Selection Benchmark
+========================
+One-pass heap/hash list_operations (top_k, bottom_k, distinct,
+distinct_count, frequency) versus the sort-then-slice emulation clients
+used before, from 10^4 to 10^7 items. The tool is timed end to end
+through call_tool, so argument validation is included; "render" is the
+operation alone. Items are drawn from a fixed vocabulary so the distinct
+count stays realistic as the list grows.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+
+K = 10
+
+
+def sort_top_k(items):
+    return sorted(items, reverse=True)[:K]
+
+
+def sort_bottom_k(items):
+    return sorted(items)[:K]
+
+
+def sort_distinct(items):
+    return [key for key, _ in itertools.groupby(sorted(items))][:K]
+
+
+def sort_distinct_count(items):
+    return sum(1 for _ in itertools.groupby(sorted(items)))
+
+
+def sort_frequency(items):
+    runs = [(key, sum(1 for _ in group)) for key, group in itertools.groupby(sorted(items))]
+    runs.sort(key=lambda run: run[1], reverse=True)
+    return runs[:K]
+
+
+BASELINES = {
+    "top_k": sort_top_k,
+    "bottom_k": sort_bottom_k,
+    "distinct": sort_distinct,
+    "distinct_count": sort_distinct_count,
+    "frequency": sort_frequency,
+}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+async def timed_call(items, operation):
+    start = time.perf_counter()
+    result = await server.call_tool("list_operations", {"items": items, "operation": operation, "k": K})
+    elapsed = time.perf_counter() - start
+    assert not getattr(result, "isError", False), result
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000")
+    parser.add_argument("--vocabulary", type=int, default=100000, help="Distinct values items are drawn from")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"item-{rng.getrandbits(48):012x}" for _ in range(args.vocabulary)]
+
+    # The tool's schema is compiled on its first call; keep that out of the table.
+    asyncio.run(timed_call(vocabulary[:K], "top_k"))
+    print(f"k={K}, vocabulary={args.vocabulary:,}\n")
+    print(f"{'items':>12} {'operation':<16}{'call_tool (ms)':>16}{'render (ms)':>13}"
+          f"{'sort+slice (ms)':>17}{'speedup':>9}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        items = rng.choices(vocabulary, k=size)
+        for operation, baseline in BASELINES.items():
+            call = asyncio.run(timed_call(items, operation))
+            render = timed(server.render_list_operation, items, operation, ", ", K)
+            sorted_slice = timed(baseline, items)
+            print(
+                f"{size:>12,} {operation:<16}{call * 1e3:>16.1f}{render * 1e3:>13.1f}"
+                f"{sorted_slice * 1e3:>17.1f}{sorted_slice / call:>8.1f}x"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
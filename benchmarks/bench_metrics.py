@@ -0,0 +1,79 @@
+"""
+Metrics Overhead Benchmark
+==========================
+Per-request cost of the latency histograms: each instrumented handler
+(call_tool, read_resource, get_prompt) is timed against the uninstrumented
+function it wraps, and Metrics.observe is timed on its own. Also reports
+how long the metrics resource and the Prometheus dump take to render.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+
+CALLS = 50000
+ROUNDS = 5
+
+
+async def per_call_us(func, *args):
+    """Best-of-ROUNDS mean latency in microseconds."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            await func(*args)
+        best = min(best, (time.perf_counter() - start) / CALLS * 1e6)
+    return best
+
+
+async def resolve(uri):
+    return server.resolve_resource(uri)
+
+
+async def render(name, arguments):
+    return server.render_prompt(name, arguments)
+
+
+def observe_ns():
+    metrics = server.Metrics()
+    observe = metrics.observe
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            observe("tool", "echo", 0.0003)
+        best = min(best, (time.perf_counter() - start) / CALLS * 1e9)
+    return best
+
+
+async def main():
+    cases = [
+        ("call_tool echo", server.registry.dispatch, server.call_tool, ("echo", {"message": "hi"})),
+        ("read_resource", resolve, server.read_resource, ("mcp://test/static-text",)),
+        ("get_prompt", render, server.get_prompt, ("test-prompt", {"topic": "metrics"})),
+    ]
+    print(f"{'handler':<16}{'bare (us)':>12}{'metered (us)':>14}{'overhead (us)':>15}")
+    for label, bare, metered, args in cases:
+        bare_us = await per_call_us(bare, *args)
+        metered_us = await per_call_us(metered, *args)
+        print(f"{label:<16}{bare_us:>12.2f}{metered_us:>14.2f}{metered_us - bare_us:>15.2f}")
+
+    print(f"\nMetrics.observe: {observe_ns():.0f} ns/op")
+
+    start = time.perf_counter()
+    snapshot = await server.read_resource(server.METRICS_URI)
+    resource_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    text = server.metrics.prometheus()
+    prometheus_ms = (time.perf_counter() - start) * 1e3
+    print(f"metrics resource: {resource_ms:.2f} ms ({len(snapshot[0].content)} bytes)")
+    print(f"prometheus dump:  {prometheus_ms:.2f} ms ({len(text)} bytes)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Catalog Pagination Benchmark
+============================
+Generates a large synthetic catalog (100k tools and 100k resources by
+default) and measures full-catalog enumeration through list_tools /
+list_resources with cursor pagination, against a naive pager that rebuilds
+and slices the whole list for every page. Reports time and peak traced
+memory per enumeration.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp.types import ListResourcesRequest, ListResourcesResult, ListToolsRequest, ListToolsResult
+
+import server
+
+
+def naive_page(catalog, result_cls, field, cursor, page_size):
+    """Rebuild the full list, then slice out the requested page."""
+    items = catalog.items()
+    start = int(cursor) if cursor else 0
+    end = start + page_size
+    return result_cls(
+        **{field: items[start:end]},
+        nextCursor=str(end) if end < len(items) else None,
+    )
+
+
+async def enumerate_all(fetch, field):
+    cursor = None
+    count = 0
+    pages = 0
+    while True:
+        page = await fetch(cursor)
+        count += len(getattr(page, field))
+        pages += 1
+        cursor = page.nextCursor
+        if cursor is None:
+            return count, pages
+
+
+async def measure(fetch, field):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count, pages = await enumerate_all(fetch, field)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, pages, elapsed, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tools", type=int, default=100_000)
+    parser.add_argument("--resources", type=int, default=100_000)
+    parser.add_argument("--page-sizes", default="100,1000")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    server.populate_synthetic_catalog(args.tools, args.resources)
+    print(f"Generated {args.tools:,} tools and {args.resources:,} resources "
+          f"in {time.perf_counter() - start:.2f}s\n")
+
+    def indexed(kind):
+        async def fetch(cursor):
+            if kind == "tools":
+                return await server.list_tools(ListToolsRequest(method="tools/list", params={"cursor": cursor}))
+            return await server.list_resources(
+                ListResourcesRequest(method="resources/list", params={"cursor": cursor})
+            )
+        return fetch
+
+    def naive(kind, page_size):
+        async def fetch(cursor):
+            if kind == "tools":
+                return naive_page(server.registry.catalog, ListToolsResult, "tools", cursor, page_size)
+            return naive_page(server.resource_catalog, ListResourcesResult, "resources", cursor, page_size)
+        return fetch
+
+    print(f"{'listing':<10} {'page':>6} {'pager':<8} {'items':>8} {'pages':>6} {'time (s)':>9} {'peak MB':>8}")
+    for page_size in [int(p) for p in args.page_sizes.split(",")]:
+        server.configure_page_size(page_size)
+        for kind in ("tools", "resources"):
+            for pager, fetch in (("naive", naive(kind, page_size)), ("indexed", indexed(kind))):
+                count, pages, elapsed, peak = await measure(fetch, kind)
+                print(f"{kind:<10} {page_size:>6} {pager:<8} {count:>8,} {pages:>6,} "
+                      f"{elapsed:>9.3f} {peak / 1024 / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Prompt Rendering Benchmark
+==========================
+debug-prompt renders with `code` arguments from 1 KB to 10 MB: the
+compiled template registry against the per-call f-string rendering it
+replaced. Peak traced allocation is reported as a multiple of the input,
+so 1.0x means the rendered text is the only copy of `code`. A small
+repeated argument set shows the render cache.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+from mcp.types import GetPromptResult, PromptMessage, TextContent
+
+SIZES = [1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20]
+
+
+def fstring_render(name, arguments):
+    code = arguments.get("code", "")
+    language = arguments.get("language", "unknown")
+    message = PromptMessage(
+        role="user",
+        content=TextContent(
+            type="text",
+            text=f"Debug the following {language} code:\n\n{code}\n\nProvide analysis and suggestions."
+        )
+    )
+    return GetPromptResult(messages=[message])
+
+
+def measure(render, arguments, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render("debug-prompt", arguments)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = render("debug-prompt", arguments)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    server.prompt_registry.cache_entries = 0
+    print(f"{'code size':>10} {'mode':<10}{'render us':>12}{'peak alloc':>12}")
+    for size in SIZES:
+        arguments = {"code": "x = 1  # probe\n" * (size // 15), "language": "python"}
+        for label, render in (("f-string", fstring_render), ("template", server.render_prompt)):
+            seconds, peak = measure(render, arguments, args.repeat)
+            print(f"{size >> 10:>8} KB {label:<10}{seconds * 1e6:>12.1f}{peak / size:>11.2f}x")
+
+    small = {"code": "print('hello')", "language": "python"}
+    uncached, _ = measure(server.render_prompt, small, 1000)
+    server.prompt_registry.cache_entries = server.PROMPT_CACHE_ENTRIES
+    cached, _ = measure(server.render_prompt, small, 1000)
+    fstring, _ = measure(fstring_render, small, 1000)
+    print(f"\nsmall arguments: f-string {fstring * 1e6:.1f} us, template {uncached * 1e6:.1f} us, "
+          f"cached {cached * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Result Cache Benchmark
+======================
+Repeated-argument workload against call_tool with and without the result
+cache. Calls are drawn from a fixed pool of add_numbers, format_json and
+list_operations argument sets with Zipf-distributed popularity (a few hot
+requests, a long tail), as seen when scanners and agents re-issue the same
+probes.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+
+
+def build_pool(size, rng):
+    pool = []
+    for i in range(size):
+        kind = i % 3
+        if kind == 0:
+            pool.append(("add_numbers", {"a": rng.randint(0, 10**6), "b": rng.random()}))
+        elif kind == 1:
+            data = {f"field_{j}": {"id": j, "tags": ["x"] * 5, "score": rng.random()} for j in range(30)}
+            pool.append(("format_json", {"data": data, "indent": 2}))
+        else:
+            items = [f"item-{rng.randint(0, 5000)}" for _ in range(500)]
+            pool.append(("list_operations", {"items": items, "operation": "sort", "sort_key": "natural"}))
+    return pool
+
+
+def zipf_weights(size, exponent):
+    return [1 / (rank ** exponent) for rank in range(1, size + 1)]
+
+
+async def run(workload):
+    latencies = []
+    start = time.perf_counter()
+    for name, arguments in workload:
+        t0 = time.perf_counter()
+        await server.call_tool(name, arguments)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rate": len(workload) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1e6,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=1000, help="Distinct argument sets in the pool")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew")
+    parser.add_argument("--cache-mb", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pool = build_pool(args.distinct, rng)
+    workload = rng.choices(pool, weights=zipf_weights(len(pool), args.zipf), k=args.calls)
+
+    print(f"{args.calls} calls over {args.distinct} argument sets, zipf s={args.zipf}\n")
+    print(f"{'mode':<18}{'calls/sec':>12}{'p50 us':>10}{'p99 us':>10}{'hit rate':>10}")
+    server.configure_result_cache(None)
+    baseline = await run(workload)
+    print(f"{'no cache':<18}{baseline['rate']:>12.0f}{baseline['p50']:>10.1f}{baseline['p99']:>10.1f}{'-':>10}")
+    cache = server.configure_result_cache(args.cache_mb << 20)
+    cached = await run(workload)
+    hit_rate = cache.hits / (cache.hits + cache.misses)
+    print(
+        f"{f'cache {args.cache_mb} MB':<18}{cached['rate']:>12.0f}{cached['p50']:>10.1f}"
+        f"{cached['p99']:>10.1f}{hit_rate:>9.1%}"
+    )
+    print(f"\n{cached['rate'] / baseline['rate']:.1f}x throughput, {cache.size / 2**20:.1f} MB cached, "
+          f"{cache.evictions} evictions")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
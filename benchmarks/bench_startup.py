@@ -0,0 +1,100 @@
+"""
+Startup Benchmark
+=================
+Time-to-first-response of a freshly spawned stdio server: from process
+spawn to the `initialize` reply and to the first `tools/list` reply, the
+path a scanner pays on every check. `python -c "import mcp.server"` is
+timed as the floor set by the interpreter and the MCP SDK itself.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "server.py")
+
+INITIALIZE = {
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench-startup", "version": "0"},
+    },
+}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+LIST_TOOLS = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+
+def send(proc, message):
+    proc.stdin.write((json.dumps(message) + "\n").encode())
+    proc.stdin.flush()
+
+
+def first_response(server):
+    """Seconds from spawn to the initialize reply and to the tools/list reply."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, server], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        send(proc, INITIALIZE)
+        assert json.loads(proc.stdout.readline())["id"] == 1
+        initialized = time.perf_counter() - start
+        send(proc, INITIALIZED)
+        send(proc, LIST_TOOLS)
+        assert json.loads(proc.stdout.readline())["id"] == 2
+        listed = time.perf_counter() - start
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return initialized, listed
+
+
+def import_floor():
+    """Seconds until a bare interpreter has imported mcp.server (excluding its shutdown)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "import mcp.server; print(flush=True)"], stdout=subprocess.PIPE
+    )
+    proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    proc.wait()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--server", action="append",
+        help="server.py to spawn; repeat to compare checkouts (runs are interleaved to share noise)",
+    )
+    args = parser.parse_args()
+    servers = args.server or [SERVER]
+
+    samples = {server: [] for server in servers}
+    floor = []
+    for server in servers:
+        first_response(server)  # warm the OS page cache and .pyc files
+    for _ in range(args.runs):
+        floor.append(import_floor())
+        for server in servers:
+            samples[server].append(first_response(server))
+
+    print(f"{args.runs} cold starts per server\n")
+    print(f"{'milestone':<40}{'median ms':>12}{'min ms':>10}")
+    rows = [("import mcp.server (floor)", floor)]
+    for server in servers:
+        name = os.path.relpath(server)
+        rows.append((f"{name}: initialize", [s[0] for s in samples[server]]))
+        rows.append((f"{name}: first tools/list", [s[1] for s in samples[server]]))
+    for label, values in rows:
+        print(f"{label:<40}{statistics.median(values) * 1e3:>12.1f}{min(values) * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
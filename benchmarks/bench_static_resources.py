@@ -0,0 +1,94 @@
+"""
+Static Resource Cache Benchmark
+===============================
+Repeated reads across the four built-in resource URIs:
+re-rendering the document on every read (the previous behaviour), serving
+the prebuilt cache entry, and etag revalidation returning notModified.
+The second table measures the same reads end to end over an in-memory
+client session.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp import types
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import server
+
+URIS = [
+    "mcp://test/static-text",
+    "mcp://test/json-data",
+    "mcp://test/markdown-doc",
+    "mcp://test/config",
+]
+READS = 50000
+SESSION_READS = 1000
+
+
+def rerender(uri):
+    """Build the contents from scratch on each read, as read_resource used to."""
+    mime_type = server.resource_catalog.get(uri).mimeType
+    if uri == "mcp://test/json-data":
+        text = json.dumps(json.loads(json.dumps(server.JSON_DATA)), indent=2)
+    elif uri == "mcp://test/config":
+        text = json.dumps(json.loads(json.dumps(server.CONFIG)), indent=2)
+    elif uri == "mcp://test/markdown-doc":
+        text = server.MARKDOWN_DOC
+    else:
+        text = server.STATIC_TEXT
+    return [ReadResourceContents(text, mime_type)]
+
+
+def time_reads(read):
+    start = time.perf_counter()
+    for i in range(READS):
+        read(URIS[i % len(URIS)])
+    return READS / (time.perf_counter() - start)
+
+
+def read_request(uri, etag=None):
+    params = types.ReadResourceRequestParams(uri=uri, _meta={"ifNoneMatch": etag} if etag else None)
+    return types.ClientRequest(types.ReadResourceRequest(params=params))
+
+
+async def session_reads():
+    async with create_connected_server_and_client_session(server.server) as session:
+        etags = {uri: (await session.read_resource(uri)).contents[0].meta["etag"] for uri in URIS}
+        results = {}
+        for mode in ("full body", "revalidated"):
+            received = 0
+            start = time.perf_counter()
+            for i in range(SESSION_READS):
+                uri = URIS[i % len(URIS)]
+                result = await session.send_request(
+                    read_request(uri, etags[uri] if mode == "revalidated" else None),
+                    types.ReadResourceResult,
+                )
+                received += len(result.contents[0].text)
+            results[mode] = (SESSION_READS / (time.perf_counter() - start), received / SESSION_READS)
+        return results
+
+
+def main():
+    etags = {uri: server.static_resources.get(uri).etag for uri in URIS}
+    print(f"Handler level, {READS:,} reads round-robin over {len(URIS)} URIs\n")
+    print(f"{'mode':<24} {'reads/s':>12}")
+    print(f"{'re-render per read':<24} {time_reads(rerender):>12,.0f}")
+    print(f"{'prebuilt cache':<24} {time_reads(server.static_resources.read):>12,.0f}")
+    print(f"{'etag revalidation':<24} {time_reads(lambda uri: server.static_resources.read(uri, etags[uri])):>12,.0f}")
+
+    print(f"\nIn-memory session, {SESSION_READS:,} reads\n")
+    print(f"{'mode':<24} {'reads/s':>12} {'avg body chars':>15}")
+    for mode, (rate, size) in asyncio.run(session_reads()).items():
+        print(f"{mode:<24} {rate:>12,.0f} {size:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Streaming format_json Benchmark
+===============================
+Peak RSS growth, time to first byte and total time of
+call_tool("format_json") on ~1 MB, 10 MB and 50 MB inputs, over an
+in-memory client session: buffered (one TextContent), stream=True without
+a progress token (the chunks come back as TextContent blocks in the
+result) and stream=True with one (each chunk goes out as a progress
+notification and the result is a summary). Time to first byte is when
+the client sees the first chunk. Each measurement runs in a fresh child
+process that reports peak RSS above the built input (Linux only).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+RECORD = {"id": 0, "name": "item-000000", "tags": ["alpha", "beta", "gamma"], "score": 0.5, "active": True}
+MODES = ("buffered", "stream", "progress")
+
+
+def make_payload(megabytes):
+    per_record = len(json.dumps(RECORD, indent=2)) + 8
+    count = max(1, megabytes * 1024 * 1024 // per_record)
+    return {"records": [dict(RECORD, id=i, name=f"item-{i:06d}") for i in range(count)]}
+
+
+def status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+async def call(session, mode, data, chunk_size):
+    """(seconds to first chunk, characters of JSON received) for one format_json call."""
+    arguments = {"data": data, "indent": 2}
+    if mode != "buffered":
+        arguments.update(stream=True, chunk_size=chunk_size)
+    start = time.perf_counter()
+    first = None
+    received = 0
+
+    async def on_progress(progress, total, message):
+        nonlocal first, received
+        first = first or time.perf_counter() - start
+        received += len(message)
+
+    result = await session.call_tool(
+        "format_json", arguments, progress_callback=on_progress if mode == "progress" else None
+    )
+    if mode != "progress":
+        first = time.perf_counter() - start
+        received = sum(len(block.text) for block in result.content)
+    return first, received
+
+
+async def run_child(megabytes, mode, chunk_size):
+    import server
+
+    data = make_payload(megabytes)
+    async with server.connect_in_memory() as session:
+        await call(session, mode, {"warm": [1]}, chunk_size)
+        reset_peak_rss()
+        baseline = status_kb("VmRSS:")
+        start = time.perf_counter()
+        first, received = await call(session, mode, data, chunk_size)
+        elapsed = time.perf_counter() - start
+        peak = status_kb("VmHWM:") - baseline
+    assert received == len("Formatted JSON:\n") + len(json.dumps(data, indent=2))
+    print(json.dumps({"ttfb": first, "elapsed": elapsed, "peak_kb": peak}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1,10,50", help="comma-separated input sizes in MB")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+    parser.add_argument("--child", nargs=2, metavar=("MB", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child(int(args.child[0]), args.child[1], args.chunk_size))
+        return
+
+    print(f"{'input':>7} {'mode':<10} {'TTFB (ms)':>10} {'total (s)':>10} {'peak RSS +MB':>13}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", str(size), mode, "--chunk-size", str(args.chunk_size)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(out.stdout)
+            print(
+                f"{size:>5}MB {mode:<10} {r['ttfb'] * 1000:>10.1f} {r['elapsed']:>10.2f} "
+                f"{r['peak_kb'] / 1024:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
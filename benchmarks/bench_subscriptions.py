@@ -0,0 +1,194 @@
+"""
+Resource Subscription Benchmark
+===============================
+N watchers of one changing resource, each its own Streamable HTTP session
+to a server subprocess: polling read_resource every --poll-interval
+seconds, versus subscribing and re-reading only on resources/updated. The
+resource is a file served with --resource-dir and rewritten every
+--change-interval seconds. Server CPU is read from /proc for the server
+process over the measurement window only; messages count JSON-RPC
+requests, responses and notifications; staleness is the time from a
+write until a watcher has read the new content.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+from mcp.types import ResourceUpdatedNotification
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "server.py")
+URI = "mcp://files/config.json"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Run:
+    def __init__(self, mode, args, directory):
+        self.mode = mode
+        self.args = args
+        self.path = os.path.join(directory, "config.json")
+        self.written = {}
+        self.messages = 0
+        self.staleness = []
+        self.connected = 0
+        self.start = asyncio.Event()
+        self.stop = asyncio.Event()
+
+    def write(self, version):
+        with open(self.path, "w") as f:
+            json.dump({"version": version, "settings": {"timeout": 30, "max_retries": 3}}, f)
+        self.written[version] = time.perf_counter()
+
+    async def read(self, session, seen):
+        result = await session.read_resource(URI)
+        self.messages += 2
+        version = json.loads(result.contents[0].text)["version"]
+        if version != seen[0] and version in self.written:
+            seen[0] = version
+            self.staleness.append(time.perf_counter() - self.written[version])
+
+    async def watcher(self, url, index, connect_limit):
+        rng = random.Random(index)
+        seen = [0]
+        tasks = set()
+
+        async def on_message(message):
+            if isinstance(getattr(message, "root", None), ResourceUpdatedNotification):
+                self.messages += 1
+                task = asyncio.create_task(self.read(session, seen))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        async with connect_limit:
+            client = streamable_http_client(url)
+            read_stream, write_stream, _ = await client.__aenter__()
+        try:
+            async with ClientSession(read_stream, write_stream, message_handler=on_message) as session:
+                async with connect_limit:
+                    await session.initialize()
+                    await self.read(session, seen)
+                    if self.mode == "subscribe":
+                        await session.subscribe_resource(URI)
+                self.connected += 1
+                await self.start.wait()
+                if self.mode == "poll":
+                    await asyncio.sleep(rng.random() * self.args.poll_interval)
+                    while not self.stop.is_set():
+                        await self.read(session, seen)
+                        await asyncio.sleep(self.args.poll_interval)
+                else:
+                    await self.stop.wait()
+                await asyncio.gather(*tasks)
+        finally:
+            await client.__aexit__(None, None, None)
+
+    async def execute(self):
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/mcp/"
+        self.write(0)
+        proc = subprocess.Popen(
+            [sys.executable, SERVER, "--transport", "http", "--port", str(port),
+             "--resource-dir", os.path.dirname(self.path),
+             "--watch-interval", str(self.args.watch_interval)],
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            await self.wait_for_port(port)
+            connect_limit = asyncio.Semaphore(self.args.connect_concurrency)
+            watchers = [
+                asyncio.create_task(self.watcher(url, i, connect_limit)) for i in range(self.args.watchers)
+            ]
+            while self.connected < self.args.watchers:
+                if any(task.done() for task in watchers):
+                    await next(task for task in watchers if task.done())
+                await asyncio.sleep(0.1)
+
+            self.messages = 0
+            self.staleness.clear()
+            cpu_before = cpu_seconds(proc.pid)
+            self.start.set()
+            window_start = time.perf_counter()
+            version = 0
+            while time.perf_counter() - window_start < self.args.duration:
+                await asyncio.sleep(self.args.change_interval)
+                version += 1
+                self.write(version)
+            # Let the last change reach everyone before closing the window.
+            await asyncio.sleep(min(self.args.poll_interval, self.args.change_interval))
+            elapsed = time.perf_counter() - window_start
+            cpu = cpu_seconds(proc.pid) - cpu_before
+            self.stop.set()
+            await asyncio.gather(*watchers)
+            return {
+                "cpu": cpu,
+                "elapsed": elapsed,
+                "messages": self.messages,
+                "changes": version,
+                "staleness": sorted(self.staleness),
+            }
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    @staticmethod
+    async def wait_for_port(port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--watchers", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measurement window in seconds")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between reads per polling watcher")
+    parser.add_argument("--change-interval", type=float, default=10.0, help="Seconds between resource writes")
+    parser.add_argument("--watch-interval", type=float, default=0.25, help="Server-side file check interval")
+    parser.add_argument("--connect-concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.watchers} watchers, {args.duration:.0f}s window, write every {args.change_interval:g}s, "
+          f"poll every {args.poll_interval:g}s\n")
+    print(f"{'mode':<11}{'server CPU s':>14}{'CPU %':>8}{'messages':>10}{'msgs/change':>13}"
+          f"{'stale p50 ms':>14}{'stale p95 ms':>14}")
+    for mode in ("poll", "subscribe"):
+        with tempfile.TemporaryDirectory() as directory:
+            result = await Run(mode, args, directory).execute()
+        staleness = result["staleness"]
+        p95 = staleness[int(len(staleness) * 0.95) - 1] if staleness else float("nan")
+        print(
+            f"{mode:<11}{result['cpu']:>14.2f}{result['cpu'] / result['elapsed']:>8.1%}"
+            f"{result['messages']:>10,}{result['messages'] / max(result['changes'], 1):>13,.0f}"
+            f"{statistics.median(staleness) * 1e3 if staleness else float('nan'):>14.0f}{p95 * 1e3:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
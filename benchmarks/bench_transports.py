@@ -0,0 +1,80 @@
+"""
+Stdio vs In-Memory Transport
+============================
+Session setup time and per-call `echo` latency for a client talking to a
+spawned `server.py` over stdio versus `server.connect_in_memory()`, which
+wires the ClientSession to the server object in the same event loop.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+import server
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "server.py")
+
+
+@contextlib.asynccontextmanager
+async def stdio_transport():
+    params = StdioServerParameters(command=sys.executable, args=[SERVER])
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+@contextlib.asynccontextmanager
+async def memory_transport():
+    async with server.connect_in_memory() as session:
+        yield session
+
+
+async def measure(transport, sessions, calls):
+    setups, latencies = [], []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        async with transport() as session:
+            setups.append(time.perf_counter() - start)
+            for i in range(calls):
+                start = time.perf_counter()
+                await session.call_tool("echo", {"message": f"call-{i}"})
+                latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "setup_ms": statistics.mean(setups) * 1e3,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "mean_us": statistics.mean(latencies) * 1e6,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=2000, help="echo calls per session")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.calls} echo calls\n")
+    print(f"{'transport':<12}{'setup ms':>12}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}")
+    results = {}
+    for name, transport in (("stdio", stdio_transport), ("in-memory", memory_transport)):
+        results[name] = r = await measure(transport, args.sessions, args.calls)
+        print(f"{name:<12}{r['setup_ms']:>12.1f}{r['mean_us']:>12.1f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}")
+    print(
+        f"\nin-memory: {results['stdio']['setup_ms'] / results['in-memory']['setup_ms']:.0f}x faster setup, "
+        f"{results['stdio']['mean_us'] / results['in-memory']['mean_us']:.1f}x lower mean call latency"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Argument Validation Benchmark
+=============================
+Compares the registry's precompiled validators with validating against the
+raw inputSchema dict on every call (jsonschema.validate), using the nested
+complex_schema payload.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import jsonschema
+
+import server
+
+CALLS = 20000
+RAW_CALLS = 500  # re-checks the schema on every call, so far slower
+
+PAYLOAD = {
+    "user": {
+        "name": "Jane Doe",
+        "age": 30,
+        "tags": ["developer", "python", "mcp"],
+        "metadata": {
+            "department": "Engineering",
+            "level": "Senior",
+            "location": "Remote"
+        }
+    },
+    "options": {
+        "verbose": True,
+        "format": "json"
+    }
+}
+
+
+def time_calls(func, calls):
+    """Return mean latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    schema = next(t for t in server.registry.tools() if t.name == "complex_schema").inputSchema
+
+    raw_us = time_calls(lambda: jsonschema.validate(instance=PAYLOAD, schema=schema), RAW_CALLS)
+    compiled_us = time_calls(lambda: server.registry.validate("complex_schema", PAYLOAD), CALLS)
+
+    print(f"{'mode':<28} {'per call (us)':>14}")
+    print(f"{'raw schema (per call)':<28} {raw_us:>14.2f}")
+    print(f"{'precompiled validator':<28} {compiled_us:>14.2f}")
+    print(f"\nSpeedup: {raw_us / compiled_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
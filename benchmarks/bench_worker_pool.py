@@ -0,0 +1,83 @@
+"""
+Worker Pool Latency Benchmark
+=============================
+Measures the latency of cheap `echo` calls while large `format_json` calls
+run at the same time, for each execution mode (inline, thread, process).
+With inline execution every echo queued behind a big json.dumps waits for
+it to finish; offloading keeps the event loop responsive.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server
+
+HEAVY_CALLS = 8
+HEAVY_CONCURRENCY = 2
+ECHO_INTERVAL = 0.002
+
+
+def make_payload(records=20000):
+    return {
+        f"record_{i}": {"id": i, "name": f"item-{i}", "tags": ["a", "b", "c"], "score": i * 0.5}
+        for i in range(records)
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def heavy_worker(payload, remaining):
+    while remaining:
+        remaining.pop()
+        await server.call_tool("format_json", {"data": payload, "indent": 2})
+
+
+async def echo_prober(latencies, done):
+    while not done.is_set():
+        start = time.perf_counter()
+        await server.call_tool("echo", {"message": "ping"})
+        latencies.append((time.perf_counter() - start) * 1000)
+        # Scheduling delay counts too: a blocked loop wakes the prober late.
+        sleep_start = time.perf_counter()
+        await asyncio.sleep(ECHO_INTERVAL)
+        latencies.append((time.perf_counter() - sleep_start - ECHO_INTERVAL) * 1000)
+
+
+async def run_mode(mode, payload):
+    server.configure_worker_pool(mode, max_workers=HEAVY_CONCURRENCY)
+    latencies = []
+    done = asyncio.Event()
+    remaining = list(range(HEAVY_CALLS))
+    prober = asyncio.create_task(echo_prober(latencies, done))
+    start = time.perf_counter()
+    await asyncio.gather(*(heavy_worker(payload, remaining) for _ in range(HEAVY_CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    server.worker_pool.shutdown()
+    return elapsed, latencies
+
+
+async def main():
+    payload = make_payload()
+    print(f"{HEAVY_CALLS} format_json calls on {len(payload):,} records, {HEAVY_CONCURRENCY} at a time\n")
+    print(f"{'mode':<8} {'heavy total (s)':>16} {'echo p50 (ms)':>14} {'echo p99 (ms)':>14} {'echo max (ms)':>14}")
+    for mode in server.EXECUTION_MODES:
+        elapsed, latencies = await run_mode(mode, payload)
+        print(
+            f"{mode:<8} {elapsed:>16.2f} {statistics.median(latencies):>14.2f} "
+            f"{percentile(latencies, 99):>14.2f} {max(latencies):>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Zygote Session Establishment Benchmark
+======================================
+Latency from spawning a stdio server command to its `initialize` reply,
+for a cold `server.py` versus `launcher.py` handing the session to a
+pre-forked `server.py --zygote` pool, with sessions opened at 1, 10 and
+100 per second. Latency counts from each session's scheduled start, so a
+configuration that cannot keep up with the rate shows it in the tail.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+SERVER = os.path.join(ROOT, "server.py")
+LAUNCHER = os.path.join(ROOT, "launcher.py")
+RATES = [1, 10, 100]
+
+INITIALIZE = json.dumps({
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench-zygote", "version": "0"},
+    },
+}) + "\n"
+
+
+async def establish(command, scheduled):
+    proc = await asyncio.create_subprocess_exec(
+        *command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    proc.stdin.write(INITIALIZE.encode())
+    await proc.stdin.drain()
+    reply = json.loads(await proc.stdout.readline())
+    latency = time.perf_counter() - scheduled
+    assert reply["id"] == 1
+    proc.stdin.close()
+    await proc.wait()
+    return latency
+
+
+async def run_rate(command, rate, sessions):
+    start = time.perf_counter() + 0.05
+    tasks = []
+    for i in range(sessions):
+        scheduled = start + i / rate
+        await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+        tasks.append(asyncio.create_task(establish(command, scheduled)))
+    return sorted(await asyncio.gather(*tasks))
+
+
+async def wait_for_socket(path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise RuntimeError("zygote did not start")
+        await asyncio.sleep(0.05)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions per rate")
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "zygote.sock")
+    zygote = subprocess.Popen(
+        [sys.executable, SERVER, "--zygote", socket_path, "--pool-size", str(args.pool_size)],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_socket(socket_path)
+        modes = [
+            ("cold spawn", [sys.executable, SERVER]),
+            (f"zygote (pool {args.pool_size})", [sys.executable, LAUNCHER, "--socket", socket_path]),
+        ]
+        print(f"{args.sessions} sessions per rate, latency from scheduled start to initialize reply\n")
+        print(f"{'mode':<20}{'sessions/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for rate in RATES:
+            for label, command in modes:
+                latencies = await run_rate(command, rate, args.sessions)
+                p95 = latencies[int(len(latencies) * 0.95) - 1]
+                print(
+                    f"{label:<20}{rate:>11}{statistics.median(latencies) * 1e3:>10.1f}"
+                    f"{p95 * 1e3:>10.1f}{latencies[-1] * 1e3:>10.1f}"
+                )
+    finally:
+        zygote.terminate()
+        zygote.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,18 +3,66 @@ MCP Scanner Test Script
 =======================
 Automated testing script for validating MCP scanner functionality.
 Use this to verify that a scanner correctly discovers and parses all server capabilities.
+
+Run with --benchmark to drive concurrent load against the server instead and
+report throughput and latency percentiles per operation type.
+With --fuzz the load is every tool the server lists, called with random
+valid arguments generated from its inputSchema.
 """
 
+import argparse
 import asyncio
+import copy
 import json
+import math
+import os
+import random
+import string
+import time
+from contextlib import asynccontextmanager
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import PaginatedRequestParams
+
+
+@asynccontextmanager
+async def open_session(url=None, in_process=False, server_params=None):
+    """
+    Initialized session over stdio (spawning mcp-test-server, or the command in
+    server_params), Streamable HTTP, or in-process memory streams to the
+    installed server module.
+    """
+    if in_process:
+        import server
+
+        async with server.connect_in_memory() as session:
+            yield session
+    elif url:
+        from mcp.client.streamable_http import streamable_http_client
+
+        async with streamable_http_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+    else:
+        server_params = server_params or StdioServerParameters(
+            command="mcp-test-server",
+            args=[],
+        )
+        async with stdio_client(server_params) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
 
 
 class ScannerTest:
     """Test harness for MCP scanner validation."""
     
-    def __init__(self):
+    def __init__(self, url=None, in_process=False, server_params=None, verbose=True):
+        self.url = url
+        self.in_process = in_process
+        self.server_params = server_params
+        self.verbose = verbose
         self.results = {
             "tools": {"expected": 6, "found": 0, "passed": False, "details": []},
             "resources": {"expected": 4, "found": 0, "passed": False, "details": []},
@@ -25,29 +73,36 @@ class ScannerTest:
     
     async def run_all_tests(self):
         """Run complete test suite."""
-        server_params = StdioServerParameters(
-            command="mcp-test-server",
-            args=[],
-        )
-        
         print("🔍 Starting MCP Scanner Tests...\n")
         
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                
-                await self.test_tool_discovery(session)
-                await self.test_resource_discovery(session)
-                await self.test_prompt_discovery(session)
-                await self.test_tool_schemas(session)
-                await self.test_resource_reading(session)
+        async with open_session(self.url, self.in_process, self.server_params) as session:
+            await self.run_checks(session)
         
         self.print_results()
         return self.all_tests_passed()
     
+    async def run_checks(self, session, concurrent=False):
+        """Run the five checks on one session, in order or all at once."""
+        checks = [
+            self.test_tool_discovery,
+            self.test_resource_discovery,
+            self.test_prompt_discovery,
+            self.test_tool_schemas,
+            self.test_resource_reading,
+        ]
+        if concurrent:
+            await asyncio.gather(*(check(session) for check in checks))
+        else:
+            for check in checks:
+                await check(session)
+    
+    def log(self, *args):
+        if self.verbose:
+            print(*args)
+    
     async def test_tool_discovery(self, session):
         """Test that all tools are discovered."""
-        print("📋 Test 1: Tool Discovery")
+        self.log("📋 Test 1: Tool Discovery")
         
         expected_tools = {
             "echo", "add_numbers", "format_json", 
@@ -63,19 +118,19 @@ class ScannerTest:
         self.results["tools"]["passed"] = found_tools == expected_tools
         
         if self.results["tools"]["passed"]:
-            print("  ✅ All tools discovered correctly")
+            self.log("  ✅ All tools discovered correctly")
         else:
             missing = expected_tools - found_tools
             extra = found_tools - expected_tools
             if missing:
-                print(f"  ❌ Missing tools: {missing}")
+                self.log(f"  ❌ Missing tools: {missing}")
             if extra:
-                print(f"  ⚠️  Extra tools: {extra}")
-        print()
+                self.log(f"  ⚠️  Extra tools: {extra}")
+        self.log()
     
     async def test_resource_discovery(self, session):
         """Test that all resources are discovered."""
-        print("📦 Test 2: Resource Discovery")
+        self.log("📦 Test 2: Resource Discovery")
         
         expected_resources = {
             "mcp://test/static-text",
@@ -86,26 +141,26 @@ class ScannerTest:
         
         resources_response = await session.list_resources()
         resources = resources_response.resources
-        found_resources = {resource.uri for resource in resources}
+        found_resources = {str(resource.uri) for resource in resources}
         
         self.results["resources"]["found"] = len(found_resources)
         self.results["resources"]["details"] = list(found_resources)
         self.results["resources"]["passed"] = found_resources == expected_resources
         
         if self.results["resources"]["passed"]:
-            print("  ✅ All resources discovered correctly")
+            self.log("  ✅ All resources discovered correctly")
         else:
             missing = expected_resources - found_resources
             extra = found_resources - expected_resources
             if missing:
-                print(f"  ❌ Missing resources: {missing}")
+                self.log(f"  ❌ Missing resources: {missing}")
             if extra:
-                print(f"  ⚠️  Extra resources: {extra}")
-        print()
+                self.log(f"  ⚠️  Extra resources: {extra}")
+        self.log()
     
     async def test_prompt_discovery(self, session):
         """Test that all prompts are discovered."""
-        print("💬 Test 3: Prompt Discovery")
+        self.log("💬 Test 3: Prompt Discovery")
         
         expected_prompts = {"test-prompt", "debug-prompt"}
         
@@ -118,19 +173,19 @@ class ScannerTest:
         self.results["prompts"]["passed"] = found_prompts == expected_prompts
         
         if self.results["prompts"]["passed"]:
-            print("  ✅ All prompts discovered correctly")
+            self.log("  ✅ All prompts discovered correctly")
         else:
             missing = expected_prompts - found_prompts
             extra = found_prompts - expected_prompts
             if missing:
-                print(f"  ❌ Missing prompts: {missing}")
+                self.log(f"  ❌ Missing prompts: {missing}")
             if extra:
-                print(f"  ⚠️  Extra prompts: {extra}")
-        print()
+                self.log(f"  ⚠️  Extra prompts: {extra}")
+        self.log()
     
     async def test_tool_schemas(self, session):
         """Test that tool schemas are parsed correctly."""
-        print("🔍 Test 4: Tool Schema Parsing")
+        self.log("🔍 Test 4: Tool Schema Parsing")
         
         tools_response = await session.list_tools()
         tools = tools_response.tools
@@ -173,16 +228,16 @@ class ScannerTest:
         self.results["tool_schemas"]["passed"] = len(issues) == 0
         
         if self.results["tool_schemas"]["passed"]:
-            print("  ✅ Tool schemas parsed correctly")
+            self.log("  ✅ Tool schemas parsed correctly")
         else:
-            print(f"  ❌ Schema issues found:")
+            self.log(f"  ❌ Schema issues found:")
             for issue in issues:
-                print(f"     - {issue}")
-        print()
+                self.log(f"     - {issue}")
+        self.log()
     
     async def test_resource_reading(self, session):
         """Test that resources can be read."""
-        print("📖 Test 5: Resource Reading")
+        self.log("📖 Test 5: Resource Reading")
         
         issues = []
         
@@ -194,31 +249,34 @@ class ScannerTest:
             "mcp://test/config"
         ]
         
-        for uri in test_uris:
+        async def read(uri):
             try:
                 result = await session.read_resource(uri)
                 if not result.contents or len(result.contents) == 0:
-                    issues.append(f"{uri}: No content returned")
+                    return f"{uri}: No content returned"
                 elif uri == "mcp://test/json-data":
                     # Verify it's valid JSON
                     try:
                         content = result.contents[0].text
                         json.loads(content)
                     except json.JSONDecodeError:
-                        issues.append(f"{uri}: Invalid JSON content")
+                        return f"{uri}: Invalid JSON content"
             except Exception as e:
-                issues.append(f"{uri}: Error reading - {str(e)}")
+                return f"{uri}: Error reading - {str(e)}"
+        
+        # Reads are independent, so they are issued together.
+        issues = [issue for issue in await asyncio.gather(*map(read, test_uris)) if issue]
         
         self.results["resource_reading"]["issues"] = issues
         self.results["resource_reading"]["passed"] = len(issues) == 0
         
         if self.results["resource_reading"]["passed"]:
-            print("  ✅ All resources readable")
+            self.log("  ✅ All resources readable")
         else:
-            print(f"  ❌ Resource reading issues:")
+            self.log(f"  ❌ Resource reading issues:")
             for issue in issues:
-                print(f"     - {issue}")
-        print()
+                self.log(f"     - {issue}")
+        self.log()
     
     def print_results(self):
         """Print test results summary."""
@@ -272,9 +330,596 @@ class ScannerTest:
         ])
 
 
+OPERATIONS = ("discovery", "tool_call", "resource_read", "prompt")
+
+DEFAULT_MIX = {"discovery": 1, "tool_call": 4, "resource_read": 2, "prompt": 1}
+
+RESOURCE_URIS = [
+    "mcp://test/static-text",
+    "mcp://test/json-data",
+    "mcp://test/markdown-doc",
+    "mcp://test/config"
+]
+
+TOOL_CALLS = [
+    ("echo", {"message": "benchmark"}),
+    ("add_numbers", {"a": 42, "b": 8}),
+    ("timestamp", {"format": "iso"}),
+    ("format_json", {"data": {"name": "Test", "values": [1, 2, 3], "active": True}}),
+    ("list_operations", {"items": ["zebra", "apple", "mango", "banana"], "operation": "sort"}),
+]
+
+PROMPT_CALLS = [
+    ("test-prompt", {"topic": "benchmarks"}),
+    ("debug-prompt", {"code": "print('hello')", "language": "python"}),
+]
+
+
+def parse_mix(spec):
+    """Parse "discovery=1,tool_call=4" into operation weights."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return None
+    rank = max(1, int(round(pct / 100 * len(samples))))
+    return samples[min(rank, len(samples)) - 1]
+
+
+class ScannerBenchmark:
+    """Load generator built on the same session setup as ScannerTest."""
+
+    def __init__(self, sessions=4, duration=10.0, rate=None, mix=None, url=None, seed=0,
+                 output="scanner_benchmark_results.json", in_process=False):
+        self.sessions = sessions
+        self.duration = duration
+        self.rate = rate
+        self.mix = mix or DEFAULT_MIX
+        self.url = url
+        self.in_process = in_process
+        self.seed = seed
+        self.output = output
+        self.window = [None, None]
+        self.operations = OPERATIONS
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.errors = {op: 0 for op in OPERATIONS}
+        self.results = {
+            "config": {
+                "sessions": sessions,
+                "duration_s": duration,
+                "target_rate": rate,
+                "mix": self.mix,
+                "transport": "in-process" if in_process else "http" if url else "stdio",
+            },
+            "operations": {},
+            "total": {},
+        }
+
+    async def run_benchmark(self):
+        """Run all sessions for the configured duration and summarize."""
+        print(f"⏱️  Benchmarking {self.sessions} sessions for {self.duration:.0f}s "
+              f"(target rate: {self.rate or 'unlimited'} req/s)...\n")
+        await asyncio.gather(*(self.run_session(i) for i in range(self.sessions)))
+        # Measure from the first connected session to the last finished one,
+        # so process startup and initialize are not counted as load time.
+        self.summarize(self.window[1] - self.window[0])
+        self.print_results()
+        return sum(self.errors.values()) == 0
+
+    async def run_session(self, index):
+        rng = random.Random(self.seed + index)
+        operations = list(self.mix)
+        weights = [self.mix[op] for op in operations]
+        # Each session carries an equal share of the target rate.
+        interval = self.sessions / self.rate if self.rate else None
+
+        async with open_session(self.url, self.in_process) as session:
+            connected = time.perf_counter()
+            self.window[0] = min(self.window[0] or connected, connected)
+            deadline = connected + self.duration
+            next_send = connected + rng.random() * (interval or 0)
+            while True:
+                now = time.perf_counter()
+                if interval:
+                    if next_send >= deadline:
+                        break
+                    if next_send > now:
+                        await asyncio.sleep(next_send - now)
+                    # Latency counts from the scheduled send time, so a
+                    # server that falls behind is not hidden by queueing.
+                    sent = next_send
+                    next_send += interval
+                else:
+                    if now >= deadline:
+                        break
+                    sent = now
+                op = rng.choices(operations, weights)[0]
+                try:
+                    await self.perform(op, session, rng)
+                except Exception:
+                    self.errors[op] += 1
+                    continue
+                self.latencies[op].append((time.perf_counter() - sent) * 1000)
+            self.window[1] = max(self.window[1] or 0.0, time.perf_counter())
+
+    async def perform(self, op, session, rng):
+        await getattr(self, f"op_{op}")(session, rng)
+
+    async def op_discovery(self, session, rng):
+        await rng.choice([session.list_tools, session.list_resources, session.list_prompts])()
+
+    async def op_tool_call(self, session, rng):
+        name, arguments = rng.choice(TOOL_CALLS)
+        result = await session.call_tool(name, arguments)
+        if result.isError:
+            raise RuntimeError(result.content[0].text)
+
+    async def op_resource_read(self, session, rng):
+        await session.read_resource(rng.choice(RESOURCE_URIS))
+
+    async def op_prompt(self, session, rng):
+        name, arguments = rng.choice(PROMPT_CALLS)
+        await session.get_prompt(name, arguments)
+
+    def summarize(self, elapsed):
+        total_count = 0
+        all_samples = []
+        for op in self.operations:
+            samples = sorted(self.latencies[op])
+            total_count += len(samples)
+            all_samples.extend(samples)
+            self.results["operations"][op] = self.latency_stats(samples, self.errors[op], elapsed)
+        self.results["total"] = self.latency_stats(sorted(all_samples), sum(self.errors.values()), elapsed)
+
+    @staticmethod
+    def latency_stats(samples, errors, elapsed):
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+
+        return {
+            "count": len(samples),
+            "errors": errors,
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0,
+            "p50_ms": rounded(percentile(samples, 50)),
+            "p95_ms": rounded(percentile(samples, 95)),
+            "p99_ms": rounded(percentile(samples, 99)),
+            "max_ms": rounded(samples[-1] if samples else None),
+        }
+
+    def print_results(self):
+        """Print the benchmark summary and export it to JSON."""
+        print("=" * 60)
+        print("BENCHMARK RESULTS SUMMARY")
+        print("=" * 60)
+        print(f"\n{'operation':<15} {'count':>7} {'err':>5} {'req/s':>9} "
+              f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+        rows = list(self.results["operations"].items()) + [("total", self.results["total"])]
+        for op, stats in rows:
+            if not stats["count"] and not stats["errors"]:
+                continue
+            print(f"{op:<15} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps']:>9.1f} "
+                  + " ".join(f"{stats[key] if stats[key] is not None else '-':>8}"
+                             for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")))
+        print("\n" + "=" * 60)
+
+        with open(self.output, "w") as f:
+            json.dump(self.results, f, indent=2)
+        print(f"📄 Detailed results saved to: {self.output}")
+
+
+# Value ranges for generated arguments, as (low, high, distribution): string
+# and array lengths, extra keys on free-form objects, and number values.
+# "log" draws log-uniformly, so most values are small with occasional large ones.
+DEFAULT_FUZZ_SIZES = {
+    "string": (0, 32, "uniform"),
+    "array": (0, 16, "uniform"),
+    "object": (0, 4, "uniform"),
+    "number": (-1000, 1000, "uniform"),
+}
+FUZZ_DISTRIBUTIONS = ("uniform", "log")
+FUZZ_ALPHABET = string.ascii_letters + string.digits + " _-"
+# Nesting limit for values with no schema (e.g. additionalProperties: true).
+MAX_FUZZ_DEPTH = 3
+
+
+def parse_sizes(spec):
+    """Parse "string=0:256,array=0:10000:log" into DEFAULT_FUZZ_SIZES overrides."""
+    sizes = dict(DEFAULT_FUZZ_SIZES)
+    for part in spec.split(","):
+        name, _, bounds = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_FUZZ_SIZES:
+            raise ValueError(f"Unknown size '{name}', expected one of {tuple(DEFAULT_FUZZ_SIZES)}")
+        low, high, *distribution = bounds.split(":")
+        distribution = distribution[0] if distribution else "uniform"
+        if distribution not in FUZZ_DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}', expected one of {FUZZ_DISTRIBUTIONS}")
+        convert = float if name == "number" else int
+        sizes[name] = (convert(low), convert(high), distribution)
+    return sizes
+
+
+def size_sampler(low, high, distribution, integer=True):
+    """rng -> value in [low, high] drawn from the named distribution."""
+    if high < low:
+        high = low
+    if distribution == "log":
+        span = math.log(high - low + 1)
+
+        def sample(rng):
+            value = low + math.exp(rng.random() * span) - 1
+            return min(int(value), high) if integer else value
+    elif integer:
+        def sample(rng):
+            return rng.randint(low, high)
+    else:
+        def sample(rng):
+            return rng.uniform(low, high)
+    return sample
+
+
+def compile_generator(schema, sizes=None, depth=0):
+    """
+    rng -> random instance of a JSON schema. The schema is walked once into
+    nested closures, so generating an instance does no schema lookups.
+    Handles type (and type lists), const, enum, defaults, numeric and length
+    bounds, nested properties/items and additionalProperties. Required
+    properties are always present; optional ones are omitted, sent with
+    their default or sent with a random value. An object schema with no
+    properties and no additionalProperties (e.g. format_json's `data`)
+    is treated as free-form.
+    """
+    sizes = sizes or DEFAULT_FUZZ_SIZES
+    if schema is True or not isinstance(schema, dict):
+        return any_value_generator(sizes, depth)
+    if "const" in schema:
+        const = schema["const"]
+        return lambda rng: const
+    if "enum" in schema:
+        choices = list(schema["enum"])
+        return lambda rng: rng.choice(choices)
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        options = [compile_generator({**schema, "type": option}, sizes, depth) for option in kind]
+        return lambda rng: rng.choice(options)(rng)
+    if kind is None:
+        kind = "object" if "properties" in schema else "array" if "items" in schema else None
+    if kind is None:
+        return any_value_generator(sizes, depth)
+
+    if kind == "null":
+        return lambda rng: None
+    if kind == "boolean":
+        return lambda rng: rng.random() < 0.5
+    if kind in ("integer", "number"):
+        low, high, distribution = sizes["number"]
+        if "minimum" in schema:
+            low = schema["minimum"]
+        if "exclusiveMinimum" in schema:
+            low = schema["exclusiveMinimum"] + (1 if kind == "integer" else 1e-9)
+        if "maximum" in schema:
+            high = schema["maximum"]
+        if "exclusiveMaximum" in schema:
+            high = schema["exclusiveMaximum"] - (1 if kind == "integer" else 1e-9)
+        high = max(high, low)
+        if kind == "integer":
+            return size_sampler(math.ceil(low), math.floor(high), distribution)
+        return size_sampler(low, high, distribution, integer=False)
+    if kind == "string":
+        low, high, distribution = sizes["string"]
+        length = size_sampler(
+            max(low, schema.get("minLength", 0)), min(high, schema.get("maxLength", high)), distribution
+        )
+        return lambda rng: "".join(rng.choices(FUZZ_ALPHABET, k=length(rng)))
+    if kind == "array":
+        low, high, distribution = sizes["array"]
+        length = size_sampler(
+            max(low, schema.get("minItems", 0)), min(high, schema.get("maxItems", high)), distribution
+        )
+        item = compile_generator(schema.get("items", True), sizes, depth + 1)
+        return lambda rng: [item(rng) for _ in range(length(rng))]
+    if kind == "object":
+        return object_generator(schema, sizes, depth)
+    raise ValueError(f"Unsupported schema type: {kind}")
+
+
+def object_generator(schema, sizes, depth):
+    required = set(schema.get("required", []))
+    fields = []
+    for name, subschema in schema.get("properties", {}).items():
+        has_default = isinstance(subschema, dict) and "default" in subschema
+        default = subschema["default"] if has_default else None
+        fields.append((name, name in required, has_default, default, compile_generator(subschema, sizes, depth + 1)))
+
+    extra = schema.get("additionalProperties", None if "properties" in schema else True)
+    extra_value = compile_generator(extra, sizes, depth + 1) if extra not in (None, False) else None
+    extra_count = size_sampler(*sizes["object"])
+    name_length = size_sampler(1, 12, "uniform")
+
+    def generate(rng):
+        instance = {}
+        for name, is_required, has_default, default, value in fields:
+            if is_required:
+                instance[name] = value(rng)
+                continue
+            roll = rng.random()
+            if roll < 1 / 3:
+                continue
+            instance[name] = copy.deepcopy(default) if has_default and roll < 2 / 3 else value(rng)
+        if extra_value is not None:
+            for _ in range(extra_count(rng)):
+                key = "x_" + "".join(rng.choices(string.ascii_lowercase, k=name_length(rng)))
+                instance.setdefault(key, extra_value(rng))
+        return instance
+
+    return generate
+
+
+def any_value_generator(sizes, depth):
+    """Schema-less JSON values: scalars, plus arrays and objects up to MAX_FUZZ_DEPTH."""
+    scalars = [compile_generator({"type": kind}, sizes, depth) for kind in ("null", "boolean", "integer", "string")]
+    if depth >= MAX_FUZZ_DEPTH:
+        return lambda rng: rng.choice(scalars)(rng)
+    containers = [
+        compile_generator({"type": "array", "items": True}, sizes, depth + 1),
+        compile_generator({"type": "object", "additionalProperties": True}, sizes, depth + 1),
+    ]
+    choices = scalars + containers
+    return lambda rng: rng.choice(choices)(rng)
+
+
+class ScannerFuzzer(ScannerBenchmark):
+    """
+    ScannerBenchmark whose operations are the server's own tools, each called
+    with random valid arguments generated from its inputSchema. Records
+    latency, errors (with the first error text per tool) and response size.
+    """
+
+    def __init__(self, sizes=None, **kwargs):
+        super().__init__(**kwargs)
+        self.sizes = sizes or DEFAULT_FUZZ_SIZES
+        self.generators = {}
+        self.response_chars = {}
+        self.error_samples = {}
+        self.results["config"]["fuzz_sizes"] = self.sizes
+
+    async def run_benchmark(self):
+        async with open_session(self.url, self.in_process) as session:
+            tools = []
+            cursor = None
+            while True:
+                page = await session.list_tools(params=PaginatedRequestParams(cursor=cursor))
+                tools.extend(page.tools)
+                cursor = page.nextCursor
+                if not cursor:
+                    break
+        self.generators = {tool.name: compile_generator(tool.inputSchema, self.sizes) for tool in tools}
+        self.operations = tuple(self.generators)
+        self.mix = self.results["config"]["mix"] = {name: 1 for name in self.operations}
+        self.latencies = {name: [] for name in self.operations}
+        self.errors = {name: 0 for name in self.operations}
+        self.response_chars = {name: [] for name in self.operations}
+        return await super().run_benchmark()
+
+    async def perform(self, op, session, rng):
+        result = await session.call_tool(op, self.generators[op](rng))
+        self.response_chars[op].append(sum(len(getattr(content, "text", "")) for content in result.content))
+        if result.isError:
+            text = result.content[0].text if result.content else ""
+            self.error_samples.setdefault(op, text[:200])
+            raise RuntimeError(text)
+
+    def summarize(self, elapsed):
+        super().summarize(elapsed)
+        for op, stats in self.results["operations"].items():
+            sizes = sorted(self.response_chars[op])
+            stats["response_chars_p50"] = percentile(sizes, 50)
+            stats["response_chars_max"] = sizes[-1] if sizes else None
+            stats["first_error"] = self.error_samples.get(op)
+
+    def print_results(self):
+        super().print_results()
+        print(f"\n{'tool':<15} {'p50 chars':>10} {'max chars':>10}  first error")
+        for op, stats in self.results["operations"].items():
+            error = (stats["first_error"] or "").splitlines()[0][:60] if stats["first_error"] else ""
+            print(f"{op:<15} {stats['response_chars_p50'] or 0:>10} {stats['response_chars_max'] or 0:>10}  {error}")
+
+
+DEFAULT_CONFIGS = ["mcp.json", "mcp.yaml", ".mcp/config.json"]
+
+
+def load_server_configs(paths):
+    """
+    Server definitions from mcp.json / mcp.yaml / .mcp/config.json style
+    files (an "mcpServers" or "servers" mapping of name -> command, args,
+    env). Each entry is keyed "<file>:<name>", so the same name declared in
+    several files is scanned once per file. Relative paths in args resolve
+    against the project directory: the file's own directory, or its parent
+    for files inside .mcp/. YAML files need PyYAML (the `yaml` extra) and
+    are skipped with a message when it is not installed.
+    """
+    configs = []
+    for path in paths:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml  # only needed for YAML configs
+            except ImportError:
+                print(f"⚠️  Skipping {path}: reading YAML configs needs PyYAML "
+                      "(pip install 'mcp-test-server[yaml]')")
+                continue
+            with open(path) as f:
+                data = yaml.safe_load(f) or {}
+        else:
+            with open(path) as f:
+                data = json.load(f)
+        directory = os.path.dirname(os.path.abspath(path))
+        if os.path.basename(directory) == ".mcp":
+            directory = os.path.dirname(directory)
+        servers = data.get("mcpServers") or data.get("servers") or {}
+        for name, entry in servers.items():
+            configs.append({
+                "id": f"{path}:{name}",
+                "params": StdioServerParameters(
+                    command=entry["command"],
+                    args=[str(arg) for arg in entry.get("args") or []],
+                    env={k: str(v) for k, v in entry["env"].items()} if entry.get("env") else None,
+                    cwd=directory,
+                ),
+            })
+    return configs
+
+
+class ScanRunner:
+    """
+    Runs ScannerTest against many server definitions: up to `parallelism`
+    servers are launched at once, and the checks on each session run
+    concurrently. Results are merged into one report with per-server timing.
+    """
+
+    def __init__(self, configs, parallelism=8, timeout=60.0, output="scanner_scan_results.json"):
+        self.configs = configs
+        self.parallelism = parallelism
+        self.timeout = timeout
+        self.output = output
+        self.report = {"servers": {}, "summary": {}}
+
+    async def run(self):
+        print(f"🔍 Scanning {len(self.configs)} servers, {self.parallelism} at a time...\n")
+        limit = asyncio.Semaphore(self.parallelism)
+        start = time.perf_counter()
+        await asyncio.gather(*(self.scan(config, limit) for config in self.configs))
+        passed = sum(entry["passed"] for entry in self.report["servers"].values())
+        self.report["summary"] = {
+            "servers": len(self.configs),
+            "passed": passed,
+            "failed": len(self.configs) - passed,
+            "parallelism": self.parallelism,
+            "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        self.print_results()
+        return passed == len(self.configs)
+
+    async def scan(self, config, limit):
+        params = config["params"]
+        entry = {
+            "command": " ".join([params.command, *params.args]),
+            "passed": False,
+            "error": None,
+            "timing_ms": {},
+            "results": None,
+        }
+        self.report["servers"][config["id"]] = entry
+        async with limit:
+            tester = ScannerTest(server_params=params, verbose=False)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.check(tester, entry, start), self.timeout)
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            entry["timing_ms"]["total"] = round((time.perf_counter() - start) * 1000, 1)
+        entry["results"] = tester.results
+        entry["passed"] = entry["error"] is None and tester.all_tests_passed()
+
+    async def check(self, tester, entry, start):
+        async with open_session(server_params=tester.server_params) as session:
+            connected = time.perf_counter()
+            entry["timing_ms"]["connect"] = round((connected - start) * 1000, 1)
+            await tester.run_checks(session, concurrent=True)
+            entry["timing_ms"]["checks"] = round((time.perf_counter() - connected) * 1000, 1)
+
+    def print_results(self):
+        """Print the merged scan report and export it to JSON."""
+        print("=" * 60)
+        print("SCAN RESULTS SUMMARY")
+        print("=" * 60)
+        print(f"\n{'server':<32} {'result':<6} {'connect':>9} {'checks':>8} {'total':>8}  (ms)")
+        for server_id, entry in self.report["servers"].items():
+            timing = entry["timing_ms"]
+            print(f"{server_id:<32} {'PASS' if entry['passed'] else 'FAIL':<6} "
+                  + " ".join(f"{timing.get(key, '-'):>{width}}"
+                             for key, width in (("connect", 9), ("checks", 8), ("total", 8))))
+            if entry["error"]:
+                print(f"  ❌ {entry['error']}")
+        summary = self.report["summary"]
+        print(f"\nServers Passed: {summary['passed']}/{summary['servers']} in {summary['wall_ms']} ms")
+        print("\n" + "=" * 60)
+
+        with open(self.output, "w") as f:
+            json.dump(self.report, f, indent=2)
+        print(f"📄 Detailed results saved to: {self.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MCP scanner test and benchmark harness")
+    parser.add_argument("--benchmark", action="store_true", help="Run the load benchmark instead of the checks")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run each session")
+    parser.add_argument("--rate", type=float, default=None, help="Target total requests/sec (default: as fast as possible)")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=None,
+        help="Operation weights, e.g. discovery=1,tool_call=4,resource_read=2,prompt=1",
+    )
+    parser.add_argument(
+        "--fuzz", action="store_true",
+        help="Benchmark every listed tool with random valid arguments generated from its inputSchema",
+    )
+    parser.add_argument(
+        "--fuzz-sizes", type=parse_sizes, default=None,
+        help="Generated value ranges, e.g. string=0:256,array=0:10000:log,object=0:8,number=-1e6:1e6",
+    )
+    parser.add_argument("--url", default=None, help="Streamable HTTP endpoint instead of spawning over stdio")
+    parser.add_argument(
+        "--in-process", action="store_true",
+        help="Connect to the server module over in-memory streams (no subprocess)",
+    )
+    parser.add_argument(
+        "--scan-configs", nargs="*", metavar="CONFIG", default=None,
+        help=f"Scan every server declared in these config files (default: {' '.join(DEFAULT_CONFIGS)})",
+    )
+    parser.add_argument("--parallel", type=int, default=8, help="Servers scanned at once with --scan-configs")
+    parser.add_argument("--server-timeout", type=float, default=60.0, help="Seconds allowed per scanned server")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the operation mix")
+    parser.add_argument("--output", default="scanner_benchmark_results.json", help="Benchmark results file")
+    return parser.parse_args()
+
+
 async def main():
     """Run scanner tests."""
-    tester = ScannerTest()
+    args = parse_args()
+    if args.scan_configs is not None:
+        paths = args.scan_configs or [path for path in DEFAULT_CONFIGS if os.path.exists(path)]
+        runner = ScanRunner(load_server_configs(paths), args.parallel, args.server_timeout)
+        success = await runner.run()
+        return 0 if success else 1
+    if args.benchmark or args.fuzz:
+        options = dict(
+            sessions=args.sessions,
+            duration=args.duration,
+            rate=args.rate,
+            mix=args.mix,
+            url=args.url,
+            seed=args.seed,
+            output=args.output,
+            in_process=args.in_process,
+        )
+        if args.fuzz:
+            bench = ScannerFuzzer(sizes=args.fuzz_sizes, **options)
+        else:
+            bench = ScannerBenchmark(**options)
+        success = await bench.run_benchmark()
+        return 0 if success else 1
+
+    tester = ScannerTest(url=args.url, in_process=args.in_process)
     success = await tester.run_all_tests()
     
     if success:
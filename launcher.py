@@ -0,0 +1,92 @@
+"""
+Zygote Launcher
+===============
+Thin stdio launcher for `mcp-test-server --zygote [SOCKET]`. Configure MCP
+clients to run `mcp-test-server-launch` instead of `mcp-test-server`: it
+imports only the standard library, passes its stdin/stdout to a warmed
+worker over the zygote's Unix socket and exits with the worker's status.
+With no zygote listening, or one run by another user, it falls back to a
+cold `mcp-test-server`.
+"""
+
+import argparse
+import os
+import socket
+import struct
+import sys
+
+SOCKET_ENV = "MCP_TEST_SERVER_SOCKET"
+SOCKET_NAME = "mcp-test-server.sock"
+
+
+def default_socket():
+    """
+    $XDG_RUNTIME_DIR/mcp-test-server.sock, or the same name inside a
+    per-user directory under $TMPDIR (/tmp) when no runtime dir is set.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    tmp = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(tmp, f"mcp-test-server-{os.getuid()}", SOCKET_NAME)
+
+
+def private_directory(path):
+    """Create `path` mode 0700, or check an existing one is ours and closed to others."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not os.path.isdir(path) or os.path.islink(path) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be a directory owned by this user with mode 0700")
+    return path
+
+
+def peer_uid(sock, path):
+    """User id of the process listening on a connected Unix socket."""
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]
+    return os.stat(path).st_uid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="mcp-test-server-launch",
+        description="Hand this stdio session to a pre-forked mcp-test-server worker",
+    )
+    parser.add_argument(
+        "--socket", default=os.environ.get(SOCKET_ENV) or default_socket(),
+        help=f"Zygote socket path (default: ${SOCKET_ENV}, else {SOCKET_NAME} in $XDG_RUNTIME_DIR "
+             "or a per-user directory under /tmp)",
+    )
+    args, server_args = parser.parse_known_args(argv)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(args.socket)
+        if peer_uid(sock, args.socket) != os.getuid():
+            print(f"mcp-test-server-launch: {args.socket} is served by another user; starting a cold server",
+                  file=sys.stderr)
+            raise OSError
+    except OSError:
+        sock.close()
+        os.execvp("mcp-test-server", ["mcp-test-server", *server_args])
+
+    if server_args:
+        # Workers were configured when the zygote started; per-session options cannot reach them.
+        print(f"mcp-test-server-launch: ignoring {' '.join(server_args)}; zygote workers use the "
+              "options the zygote was started with", file=sys.stderr)
+    with sock:
+        socket.send_fds(sock, [b"S"], [sys.stdin.fileno(), sys.stdout.fileno()])
+        # The worker now owns the session; keep no copies of the pipes open.
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, sys.stdin.fileno())
+        os.dup2(devnull, sys.stdout.fileno())
+        status = sock.recv(1)
+    return status[0] if status else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,408 +1,3178 @@
 from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.types import (
+    BlobResourceContents,
+    CallToolResult,
+    GetPromptResult,
+    ImageContent,
+    ListPromptsResult,
+    ListResourcesRequest,
+    ListResourcesResult,
+    ListToolsRequest,
+    ListToolsResult,
+    Prompt,
+    PromptArgument,
+    PromptMessage,
+    ReadResourceRequest,
+    ReadResourceResult,
+    ServerResult,
+    TextResourceContents,
     Tool,
     TextContent,
     Resource,
-    ImageContent,
-    EmbeddedResource,
+    ResourceUpdatedNotification,
+    ResourceUpdatedNotificationParams,
+    ServerNotification,
+    SubscribeRequest,
 )
+import argparse
 import asyncio
+import base64
+import binascii
+import bisect
+import contextlib
+import hashlib
+import heapq
+import itertools
+import mimetypes
+import os
+import pickle
+import re
+import socket
+import string
 import sys
+import tempfile
 import json
+import time
+import weakref
+import zlib
+from array import array
+from collections import Counter, OrderedDict, namedtuple
 from datetime import datetime
+from types import MappingProxyType
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import jsonschema
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder: pip install mcp-test-server[fast]
+    orjson = None
+
+class MCPTestServer(Server):
+    """
+    Low-level Server that advertises resources.subscribe once a subscribe
+    handler exists, and whose read_resource passes pre-encoded blobs through.
+    """
+
+    def get_capabilities(self, notification_options, experimental_capabilities):
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None and SubscribeRequest in self.request_handlers:
+            capabilities.resources.subscribe = True
+        return capabilities
 
-server = Server("mcp-test-server")
+    def read_resource(self):
+        """
+        Like Server.read_resource, but contents may also carry an EncodedBlob
+        (base64 text the provider encoded itself), which becomes the blob
+        as-is instead of being decoded and encoded again.
+        """
+        def decorator(func):
+            async def handler(request):
+                uri = request.params.uri
+                contents = await func(uri)
+                return ServerResult(ReadResourceResult(
+                    contents=[resource_contents(uri, item) for item in contents]
+                ))
+
+            self.request_handlers[ReadResourceRequest] = handler
+            return func
+        return decorator
+
+
+server = MCPTestServer("mcp-test-server")
 
 # --------------------
-# Tools
+# Serialization
 # --------------------
-@server.list_tools()
-async def list_tools():
+class StdlibJsonBackend:
+    """Reference encoder: json.dumps with default options."""
+
+    name = "stdlib"
+
+    def dumps(self, obj, indent=2):
+        return json.dumps(obj, indent=indent)
+
+
+class OrjsonJsonBackend:
     """
-    Comprehensive list of tools for testing MCP scanner capabilities.
-    Includes various input types and complexities to test scanner robustness.
+    orjson-backed encoder that only answers when its bytes would match
+    json.dumps exactly. orjson has a single indented layout (2 spaces) and
+    differs from the stdlib on non-ASCII text, U+007F, exponent-form floats
+    and NaN/Infinity (written as null), so any output that might contain
+    one of those falls back to StdlibJsonBackend.
     """
-    return [
-        Tool(
-            name="echo",
-            description="Echo back the provided input - tests basic string handling",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "message": {"type": "string", "description": "Message to echo back"}
-                },
-                "required": ["message"]
-            }
-        ),
-        Tool(
-            name="add_numbers",
-            description="Add two numbers together - tests numeric parameter handling",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "a": {"type": "number", "description": "First number"},
-                    "b": {"type": "number", "description": "Second number"}
-                },
-                "required": ["a", "b"]
-            }
-        ),
-        Tool(
-            name="format_json",
-            description="Format and validate JSON input - tests object handling",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "data": {"type": "object", "description": "JSON object to format"},
-                    "indent": {"type": "number", "description": "Indentation spaces", "default": 2}
-                },
-                "required": ["data"]
-            }
-        ),
-        Tool(
-            name="list_operations",
-            description="Perform operations on a list - tests array handling",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "items": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of items to process"
-                    },
-                    "operation": {
-                        "type": "string",
-                        "enum": ["sort", "reverse", "count", "join"],
-                        "description": "Operation to perform"
-                    },
-                    "separator": {
-                        "type": "string",
-                        "description": "Separator for join operation",
-                        "default": ", "
-                    }
-                },
-                "required": ["items", "operation"]
-            }
-        ),
-        Tool(
-            name="complex_schema",
-            description="Tool with complex nested schema - tests advanced schema parsing",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "user": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                            "age": {"type": "number"},
-                            "tags": {"type": "array", "items": {"type": "string"}},
-                            "metadata": {
-                                "type": "object",
-                                "additionalProperties": True
-                            }
-                        },
-                        "required": ["name"]
-                    },
-                    "options": {
-                        "type": "object",
-                        "properties": {
-                            "verbose": {"type": "boolean", "default": False},
-                            "format": {"type": "string", "enum": ["json", "yaml", "xml"]}
-                        }
-                    }
-                },
-                "required": ["user"]
-            }
-        ),
-        Tool(
-            name="timestamp",
-            description="Get current timestamp - tests tools without required parameters",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "format": {
-                        "type": "string",
-                        "enum": ["iso", "unix", "readable"],
-                        "default": "iso",
-                        "description": "Output format"
-                    }
-                }
-            }
-        ),
-    ]
 
+    name = "orjson"
+    # Mapping every digit to 0 turns the exponent check into a plain
+    # substring search ("0e"); strings that happen to match only cost a
+    # fallback, never a wrong answer.
+    _digits_to_zero = bytes.maketrans(b"123456789", b"000000000")
 
-@server.call_tool()
-async def call_tool(name, arguments):
-    """Handle tool calls with various implementations."""
-    
-    if name == "echo":
-        return [
-            TextContent(
-                type="text",
-                text=f"ECHO: {arguments['message']}"
-            )
-        ]
-    
-    elif name == "add_numbers":
-        result = arguments['a'] + arguments['b']
-        return [
-            TextContent(
-                type="text",
-                text=f"Result: {arguments['a']} + {arguments['b']} = {result}"
-            )
-        ]
-    
-    elif name == "format_json":
-        indent = arguments.get('indent', 2)
-        formatted = json.dumps(arguments['data'], indent=indent)
-        return [
-            TextContent(
-                type="text",
-                text=f"Formatted JSON:\n{formatted}"
+    def __init__(self):
+        self._fallback = StdlibJsonBackend()
+
+    def dumps(self, obj, indent=2):
+        if not (type(indent) is int and indent == 2):
+            return self._fallback.dumps(obj, indent)
+        try:
+            out = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except (TypeError, orjson.JSONEncodeError):
+            # Non-str keys, ints beyond 64 bits, unsupported types.
+            return self._fallback.dumps(obj, indent)
+        if (
+            not out.isascii()
+            or b"\x7f" in out
+            or b"0.0000" in out
+            or b"0e" in out.translate(self._digits_to_zero)
+            or (b"null" in out and _has_non_finite(obj))
+        ):
+            return self._fallback.dumps(obj, indent)
+        return out.decode("ascii")
+
+
+def _has_non_finite(obj):
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if item != item or item in (float("inf"), float("-inf")):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+JSON_BACKENDS = ("auto", "stdlib", "orjson")
+
+json_backend = OrjsonJsonBackend() if orjson is not None else StdlibJsonBackend()
+
+
+def configure_json_backend(name="auto"):
+    """Select the encoder used for all server serialization."""
+    global json_backend
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON backend 'orjson' requested but orjson is not installed")
+    if name == "stdlib" or orjson is None:
+        json_backend = StdlibJsonBackend()
+    else:
+        json_backend = OrjsonJsonBackend()
+    return json_backend
+
+
+def dumps(obj, indent=2):
+    """Serialize obj to text, byte-identical to json.dumps(obj, indent=indent)."""
+    return json_backend.dumps(obj, indent)
+
+
+# --------------------
+# Catalogs
+# --------------------
+class Catalog:
+    """
+    Ordered key -> definition mapping behind a list_* endpoint.
+    The list result is built once and reused until the catalog changes;
+    every change bumps `version`, which is sent to clients in the result's
+    _meta so they know when to re-fetch.
+
+    With a page_size set, listings are served in pages. Keys are kept in an
+    insertion-ordered list plus a key -> position index, so resuming from a
+    cursor (the last key of the previous page) is a dict lookup and a page
+    is a slice of page_size entries; pages are memoized per version too.
+    Removal leaves a tombstone in the key list, which is compacted once
+    tombstones make up half of it, so removing n keys costs O(n) overall.
+    """
+
+    _REMOVED = object()
+
+    def __init__(self, result_cls, field, page_size=None):
+        self._result_cls = result_cls
+        self._field = field
+        self.page_size = page_size
+        self._items = {}
+        self._keys = []
+        self._positions = {}
+        self._tombstones = 0
+        self.version = 1
+        self._cached_version = None
+        self._result = None
+        self._pages = {}
+        self._pages_version = None
+
+    def add(self, key, item):
+        if key not in self._items:
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+        self._items[key] = item
+        self.version += 1
+
+    def remove(self, key):
+        if self._items.pop(key, None) is not None:
+            self._keys[self._positions.pop(key)] = self._REMOVED
+            self._tombstones += 1
+            if self._tombstones * 2 >= len(self._keys):
+                self._keys = list(self._items)
+                self._positions = {k: i for i, k in enumerate(self._keys)}
+                self._tombstones = 0
+            self.version += 1
+
+    def get(self, key):
+        return self._items.get(key)
+
+    def items(self):
+        return list(self._items.values())
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def _refresh(self):
+        if self._cached_version != self.version:
+            self._result = self._result_cls(
+                **{self._field: list(self._items.values())},
+                _meta={"version": self.version},
             )
-        ]
-    
-    elif name == "list_operations":
-        items = arguments['items']
-        operation = arguments['operation']
-        
-        if operation == "sort":
-            result = sorted(items)
-            text = f"Sorted: {result}"
-        elif operation == "reverse":
-            result = list(reversed(items))
-            text = f"Reversed: {result}"
-        elif operation == "count":
-            text = f"Count: {len(items)}"
-        elif operation == "join":
-            separator = arguments.get('separator', ', ')
-            text = f"Joined: {separator.join(items)}"
+            self._cached_version = self.version
+
+    def result(self):
+        """The memoized List*Result for the current version."""
+        self._refresh()
+        return self._result
+
+    @staticmethod
+    def encode_cursor(key):
+        return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+    def _resume(self, cursor):
+        try:
+            key = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        except (ValueError, UnicodeError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        position = self._positions.get(key)
+        if position is None:
+            raise ValueError(f"Stale cursor, re-list from the start: {cursor}")
+        return position + 1
+
+    def page(self, cursor=None, page_size=None):
+        """
+        One page of the listing starting after `cursor`. Without a page
+        size (or when everything fits) this is the memoized full result.
+        """
+        page_size = page_size or self.page_size
+        if page_size is None or (cursor is None and len(self._items) <= page_size):
+            return self.result()
+        if self._pages_version != self.version:
+            self._pages = {}
+            self._pages_version = self.version
+        start = 0 if cursor is None else self._resume(cursor)
+        cached = self._pages.get((start, page_size))
+        if cached is not None:
+            return cached
+        keys, end = self._live_keys(start, page_size)
+        more = end < len(self._keys)
+        page = self._result_cls(
+            **{self._field: [self._items[key] for key in keys]},
+            nextCursor=self.encode_cursor(keys[-1]) if more and keys else None,
+            _meta={"version": self.version},
+        )
+        self._pages[(start, page_size)] = page
+        return page
+
+    def _live_keys(self, start, count):
+        """Up to `count` keys from position `start` on, skipping tombstones, and the position of the next live key."""
+        if not self._tombstones:
+            return self._keys[start:start + count], min(start + count, len(self._keys))
+        keys = []
+        position = start
+        while position < len(self._keys) and len(keys) < count:
+            key = self._keys[position]
+            if key is not self._REMOVED:
+                keys.append(key)
+            position += 1
+        while position < len(self._keys) and self._keys[position] is self._REMOVED:
+            position += 1
+        return keys, position
+
+
+# --------------------
+# Worker Pool
+# --------------------
+EXECUTION_MODES = ("inline", "thread", "process")
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the worker pool's pending-job limit is reached."""
+
+
+class WorkerPool:
+    """
+    Runs CPU-heavy tool work off the event loop.
+
+    mode="inline" calls the function directly (the historical behaviour);
+    "thread" and "process" hand it to a bounded executor. At most
+    `max_workers` jobs run at once and at most `max_pending` more may wait
+    for a slot; beyond that new jobs are rejected with PoolSaturatedError
+    so a flood of large calls cannot queue unbounded work.
+    """
+
+    def __init__(self, mode="inline", max_workers=4, max_pending=64):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._slots = None
+        self._waiting = 0
+
+    def _start(self):
+        # Imported on first use: the executors pull in multiprocessing, which
+        # the default inline mode never needs.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="mcp-worker")
         else:
-            text = f"Unknown operation: {operation}"
-        
-        return [TextContent(type="text", text=text)]
-    
-    elif name == "complex_schema":
-        user = arguments['user']
-        options = arguments.get('options', {})
-        
-        response = {
-            "processed_user": user,
-            "options_applied": options,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        return [
-            TextContent(
-                type="text",
-                text=f"Processed complex input:\n{json.dumps(response, indent=2)}"
-            )
-        ]
-    
-    elif name == "timestamp":
-        format_type = arguments.get('format', 'iso')
-        now = datetime.now()
-        
-        if format_type == "iso":
-            timestamp = now.isoformat()
-        elif format_type == "unix":
-            timestamp = str(int(now.timestamp()))
-        elif format_type == "readable":
-            timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+            self._executor = ProcessPoolExecutor(self.max_workers)
+        self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, func, *args):
+        """Run func(*args) according to the pool's mode; func must be picklable for "process"."""
+        if self.mode == "inline":
+            return func(*args)
+        if self._executor is None:
+            self._start()
+        if self._slots.locked():
+            if self._waiting >= self.max_pending:
+                raise PoolSaturatedError(
+                    f"Worker pool saturated ({self.max_workers} running, {self._waiting} pending)"
+                )
+            self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
         else:
-            timestamp = now.isoformat()
-        
-        return [
-            TextContent(
-                type="text",
-                text=f"Current timestamp ({format_type}): {timestamp}"
-            )
-        ]
-    
-    raise ValueError(f"Unknown tool: {name}")
+            await self._slots.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+
+worker_pool = WorkerPool()
+
+
+def configure_worker_pool(mode="inline", max_workers=4, max_pending=64):
+    """Replace the shared worker pool used by CPU-heavy tools."""
+    global worker_pool
+    worker_pool.shutdown()
+    worker_pool = WorkerPool(mode, max_workers, max_pending)
+    return worker_pool
 
 
 # --------------------
-# Resources
+# Metrics
 # --------------------
-@server.list_resources()
-async def list_resources():
+# Upper bounds in seconds; a final +Inf bucket catches everything slower.
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METRIC_FAMILIES = {
+    # kind: (Prometheus metric prefix, label name, snapshot key)
+    "tool": ("mcp_tool_call", "tool", "tools"),
+    "resource": ("mcp_resource_read", "uri", "resources"),
+    "prompt": ("mcp_prompt_get", "prompt", "prompts"),
+}
+OVERFLOW_SERIES = "__other__"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with request and error counters."""
+
+    __slots__ = ("counts", "count", "errors", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+
+    def observe(self, seconds, ok=True):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if not ok:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Upper bound (seconds) of the bucket holding the q-quantile; None if it is +Inf."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+
+class Metrics:
     """
-    Provide various resources for testing scanner's resource discovery.
+    Per-tool, per-resource and per-prompt latency histograms.
+
+    Recording is one bisect over the bucket bounds plus a few integer adds,
+    so handlers observe every request unconditionally. Series per kind are
+    capped at `max_series`; later names (unknown tools, ad hoc URIs) share
+    the "__other__" series so label cardinality stays bounded.
     """
-    return [
-        Resource(
-            uri="mcp://test/static-text",
-            name="static-text-resource",
-            description="Simple static text resource for basic testing",
-            mimeType="text/plain"
-        ),
-        Resource(
-            uri="mcp://test/json-data",
-            name="json-data-resource",
-            description="JSON data resource for structured content testing",
-            mimeType="application/json"
-        ),
-        Resource(
-            uri="mcp://test/markdown-doc",
-            name="markdown-documentation",
-            description="Markdown formatted documentation resource",
-            mimeType="text/markdown"
-        ),
-        Resource(
-            uri="mcp://test/config",
-            name="configuration",
-            description="Sample configuration resource",
-            mimeType="application/json"
-        ),
-    ]
 
+    def __init__(self, max_series=1000):
+        self.max_series = max_series
+        self.started = time.time()
+        self._series = {kind: {} for kind in METRIC_FAMILIES}
 
-@server.read_resource()
-async def read_resource(uri):
-    """Provide resource content based on URI."""
-    
-    if uri == "mcp://test/static-text":
-        return "This is a static text resource exposed via MCP.\nIt can contain multiple lines.\nUseful for testing basic resource reading capabilities."
-    
-    elif uri == "mcp://test/json-data":
-        data = {
-            "version": "1.0",
-            "server": "mcp-test-server",
-            "capabilities": ["tools", "resources", "prompts"],
-            "test_data": {
-                "numbers": [1, 2, 3, 4, 5],
-                "strings": ["alpha", "beta", "gamma"],
-                "nested": {
-                    "key1": "value1",
-                    "key2": "value2"
+    def observe(self, kind, name, seconds, ok=True):
+        series = self._series[kind]
+        histogram = series.get(name)
+        if histogram is None:
+            if len(series) >= self.max_series:
+                name = OVERFLOW_SERIES
+            histogram = series.setdefault(name, Histogram())
+        histogram.observe(seconds, ok)
+
+    def get(self, kind, name):
+        return self._series[kind].get(name)
+
+    def snapshot(self):
+        """JSON-ready view: counters, latency sum and bucket counts per series."""
+        result = {
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "buckets_ms": [bound * 1000 for bound in LATENCY_BUCKETS],
+        }
+        for kind, (_, _, key) in METRIC_FAMILIES.items():
+            result[key] = {
+                name: {
+                    "count": h.count,
+                    "errors": h.errors,
+                    "sum_ms": round(h.sum * 1000, 3),
+                    "p50_ms": _bound_ms(h.quantile(0.5)),
+                    "p99_ms": _bound_ms(h.quantile(0.99)),
+                    "counts": h.counts,
                 }
+                for name, h in self._series[kind].items()
             }
-        }
-        return json.dumps(data, indent=2)
-    
-    elif uri == "mcp://test/markdown-doc":
-        return """# MCP Test Resource
+        return result
 
-## Overview
-This is a markdown-formatted resource for testing.
+    def prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        bounds = [_prometheus_float(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        for kind, (prefix, label, _) in METRIC_FAMILIES.items():
+            series = self._series[kind]
+            lines.append(f"# HELP {prefix}_duration_seconds Latency of {kind} requests.")
+            lines.append(f"# TYPE {prefix}_duration_seconds histogram")
+            for name, h in series.items():
+                value = _prometheus_label(name)
+                cumulative = 0
+                for bound, n in zip(bounds, h.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_duration_seconds_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_duration_seconds_sum{{{label}="{value}"}} {_prometheus_float(h.sum)}')
+                lines.append(f'{prefix}_duration_seconds_count{{{label}="{value}"}} {h.count}')
+            lines.append(f"# HELP {prefix}_errors_total Failed {kind} requests.")
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for name, h in series.items():
+                lines.append(f'{prefix}_errors_total{{{label}="{_prometheus_label(name)}"}} {h.errors}')
+        return "\n".join(lines) + "\n"
 
-## Features
-- **Text formatting**: Test markdown parsing
-- **Lists**: Support for ordered and unordered lists
-- **Code blocks**: ```python
-print("Hello, MCP!")
-```
 
-## Tables
-| Feature | Status |
-|---------|--------|
-| Tools   | ✓      |
-| Resources | ✓    |
-| Prompts | ✓      |
+def _bound_ms(seconds):
+    return None if seconds is None else seconds * 1000
 
-## Links
-[MCP Documentation](https://spec.modelcontextprotocol.io/)
-"""
-    
-    elif uri == "mcp://test/config":
-        config = {
-            "server_name": "mcp-test-server",
-            "version": "0.1.0",
-            "endpoints": {
-                "tools": True,
-                "resources": True,
-                "prompts": True
-            },
-            "settings": {
-                "debug": False,
-                "timeout": 30,
-                "max_retries": 3
-            }
+
+def _prometheus_float(value):
+    return repr(float(value))
+
+
+def _prometheus_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+async def handle_metrics_request(reader, writer):
+    """Minimal HTTP/1.0 responder for GET /metrics in Prometheus text format."""
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()).strip():
+            pass
+        parts = request_line.split()
+        if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+            status, body = "200 OK", metrics.prometheus().encode()
+        else:
+            status, body = "404 Not Found", b"Not Found\n"
+        writer.write(
+            f"HTTP/1.0 {status}\r\n"
+            f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_with_metrics(coro, port=None, host="127.0.0.1"):
+    """Await coro, exposing /metrics on host:port alongside it when port is set."""
+    if port is None:
+        return await coro
+    endpoint = await asyncio.start_server(handle_metrics_request, host, port)
+    async with endpoint:
+        return await coro
+
+
+# --------------------
+# Result Cache
+# --------------------
+class ResultCache:
+    """
+    LRU cache of tool results keyed by a hash of the tool name and its
+    canonical (key-sorted) arguments.
+
+    Entries are evicted least-recently-used first once their combined text
+    and base64 data size would exceed max_bytes; with a ttl (seconds) they also expire.
+    Results larger than max_bytes on their own are never stored.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(name, arguments):
+        canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.blake2b(f"{name}\0{canonical}".encode(), digest_size=16).digest()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        result, size, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        size = sum(self._block_size(block) for block in result) + 64
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        while self.size + size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (result, size, expires)
+        self.size += size
+
+    @staticmethod
+    def _block_size(block):
+        # Text blocks carry .text; image and audio blocks carry base64 .data.
+        return len(getattr(block, "text", None) or getattr(block, "data", None) or "")
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
         }
-        return json.dumps(config, indent=2)
-    
-    raise ValueError(f"Unknown resource URI: {uri}")
+
+
+def configure_result_cache(max_bytes=None, ttl=None):
+    """Cache results of cacheable tools up to max_bytes of text (None disables)."""
+    registry.cache = ResultCache(max_bytes, ttl) if max_bytes else None
+    return registry.cache
 
 
 # --------------------
-# Prompts (Optional)
+# Tool Registry
 # --------------------
-@server.list_prompts()
-async def list_prompts():
-    """Provide sample prompts for testing prompt capabilities."""
-    from mcp.types import Prompt, PromptArgument
-    
-    return [
-        Prompt(
-            name="test-prompt",
-            description="A simple test prompt",
-            arguments=[
-                PromptArgument(
-                    name="topic",
-                    description="Topic to discuss",
-                    required=True
-                )
-            ]
-        ),
-        Prompt(
-            name="debug-prompt",
-            description="Debug assistance prompt",
-            arguments=[
-                PromptArgument(
-                    name="code",
-                    description="Code to debug",
-                    required=True
-                ),
-                PromptArgument(
-                    name="language",
-                    description="Programming language",
-                    required=False
-                )
-            ]
-        ),
-    ]
+class ToolInputError(ValueError):
+    """Raised when tool arguments fail inputSchema validation."""
 
+    def __init__(self, tool_name, errors):
+        self.tool_name = tool_name
+        self.errors = errors
+        details = "; ".join(f"{e['path']}: {e['message']}" for e in errors)
+        super().__init__(f"Invalid arguments for tool '{tool_name}': {details}")
 
-@server.get_prompt()
-async def get_prompt(name, arguments):
-    """Return prompt content based on name and arguments."""
-    from mcp.types import PromptMessage
-    
-    if name == "test-prompt":
-        topic = arguments.get("topic", "general")
-        return PromptMessage(
-            role="user",
-            content=TextContent(
-                type="text",
-                text=f"Please provide information about: {topic}"
-            )
-        )
-    
-    elif name == "debug-prompt":
-        code = arguments.get("code", "")
-        language = arguments.get("language", "unknown")
-        return PromptMessage(
-            role="user",
-            content=TextContent(
-                type="text",
-                text=f"Debug the following {language} code:\n\n{code}\n\nProvide analysis and suggestions."
+    def to_dict(self):
+        return {
+            "error": "invalid_arguments",
+            "tool": self.tool_name,
+            "errors": self.errors,
+        }
+
+
+STRING_ITEMS = {"type": "string"}
+
+
+def _string_items(items_keyword):
+    """
+    `items` keyword with a fast path for arrays of plain strings, the shape
+    of list_operations' million-entry inputs: one type check per element
+    instead of a walk through the keyword machinery (about 10 us each).
+    Anything else, including the first non-string, takes the stock path,
+    so errors are reported exactly as before.
+    """
+    def items(validator, items_schema, instance, schema):
+        if (items_schema == STRING_ITEMS and "prefixItems" not in schema and type(instance) is list
+                and set(map(type, instance)) <= {str}):
+            return
+        yield from items_keyword(validator, items_schema, instance, schema)
+    return items
+
+
+def compile_validator(schema):
+    """Check a JSON Schema once and return a reusable validator for it."""
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    validator_cls = jsonschema.validators.extend(
+        validator_cls, {"items": _string_items(validator_cls.VALIDATORS["items"])}
+    )
+    return validator_cls(schema)
+
+
+class ToolRegistry:
+    """
+    Name -> (Tool, handler) mapping shared by list_tools and call_tool.
+    Tools register themselves with the @registry.tool(...) decorator, so
+    dispatch is a single dict lookup no matter how many tools exist.
+
+    Tools registered with cacheable=True (pure functions of their
+    arguments) are served from `cache` when one is configured.
+    """
+
+    def __init__(self):
+        self.catalog = Catalog(ListToolsResult, "tools")
+        self.cache = None
+        self._handlers = {}
+        self._validators = {}
+        self._compiled = {}
+        self._cacheable = set()
+
+    def tool(self, name, description, input_schema, cacheable=False):
+        """
+        Decorator registering an async handler taking the arguments dict.
+        Used for the module's own tools at import time, so their schemas
+        are compiled lazily on first call to keep startup short.
+        """
+        def decorator(func):
+            self.register(
+                Tool(name=name, description=description, inputSchema=input_schema),
+                func,
+                cacheable,
+                lazy=True,
             )
-        )
-    
-    raise ValueError(f"Unknown prompt: {name}")
+            return func
+        return decorator
+
+    def register(self, tool, handler, cacheable=False, lazy=False):
+        """
+        Register (or replace) a tool definition and its handler.
+        The inputSchema is compiled into a validator here, once, so an
+        invalid schema fails at registration rather than on first call;
+        lazy=True defers that to the tool's first validation.
+        """
+        validator = None if lazy else self._compile(tool.inputSchema)
+        self._handlers[tool.name] = handler
+        if validator is None:
+            self._validators.pop(tool.name, None)
+        else:
+            self._validators[tool.name] = validator
+        if cacheable:
+            self._cacheable.add(tool.name)
+        else:
+            self._cacheable.discard(tool.name)
+        self.catalog.add(tool.name, tool)
+
+    def unregister(self, name):
+        """Remove a tool; unknown names are ignored."""
+        self._handlers.pop(name, None)
+        self._validators.pop(name, None)
+        self._cacheable.discard(name)
+        self.catalog.remove(name)
+
+    def tools(self):
+        """Tool definitions in registration order."""
+        return self.catalog.items()
+
+    def __contains__(self, name):
+        return name in self._handlers
+
+    def __len__(self):
+        return len(self._handlers)
+
+    def _compile(self, schema):
+        # Tools with identical schemas share one compiled validator.
+        schema_key = json.dumps(schema, sort_keys=True)
+        validator = self._compiled.get(schema_key)
+        if validator is None:
+            validator = self._compiled[schema_key] = compile_validator(schema)
+        return validator
+
+    def precompile(self):
+        """Compile every lazily registered schema now (e.g. before forking workers)."""
+        for tool in self.tools():
+            if tool.name not in self._validators:
+                self._validators[tool.name] = self._compile(tool.inputSchema)
+
+    def validate(self, name, arguments):
+        """Raise ToolInputError listing every schema violation in `arguments`."""
+        validator = self._validators.get(name)
+        if validator is None:
+            validator = self._validators[name] = self._compile(self.catalog.get(name).inputSchema)
+        errors = sorted(validator.iter_errors(arguments), key=lambda e: list(e.absolute_path))
+        if errors:
+            raise ToolInputError(name, [
+                {
+                    "path": "/" + "/".join(str(part) for part in error.absolute_path),
+                    "message": error.message,
+                    "validator": error.validator,
+                }
+                for error in errors
+            ])
+
+    async def dispatch(self, name, arguments):
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        arguments = arguments or {}
+        # Progress notifications are side effects a cached result would skip.
+        if self.cache is None or name not in self._cacheable or current_progress_token() is not None:
+            self.validate(name, arguments)
+            return await handler(arguments)
+        # Only results of validated arguments are stored, so a hit skips validation.
+        key = self.cache.key(name, arguments)
+        result = self.cache.get(key)
+        if result is None:
+            self.validate(name, arguments)
+            result = await handler(arguments)
+            self.cache.put(key, result)
+        return result
+
+
+registry = ToolRegistry()
 
 
 # --------------------
-# Entry Point
+# External Sort
 # --------------------
-async def run():
-    async with server.run_stdio():
-        await asyncio.Event().wait()
+SORT_KEYS = ("lexical", "natural", "numeric")
+DEFAULT_SORT_MEMORY = 64 * 1024 * 1024
+SPILL_BLOCK_ITEMS = 4096
+_DIGIT_RUNS = re.compile(r"([0-9]+)")
 
 
-def main():
-    asyncio.run(run())
+def natural_key(item):
+    """"file10" after "file9": digit runs compare as integers, the text between them as strings."""
+    parts = _DIGIT_RUNS.split(item)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+def numeric_key(item):
+    """Numbers by value first, then everything float() rejects (and NaN) as text."""
+    try:
+        value = float(item)
+    except ValueError:
+        return (1, 0.0, item)
+    if value != value:
+        return (1, 0.0, item)
+    return (0, value, "")
+
+
+SORT_KEY_FUNCTIONS = {"lexical": None, "natural": natural_key, "numeric": numeric_key}
+
+
+def _spill_run(run, directory):
+    """Write one sorted run to an anonymous temp file in pickled blocks."""
+    f = tempfile.TemporaryFile(dir=directory)
+    for start in range(0, len(run), SPILL_BLOCK_ITEMS):
+        pickle.dump(run[start:start + SPILL_BLOCK_ITEMS], f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _read_run(f):
+    while True:
+        try:
+            block = pickle.load(f)
+        except EOFError:
+            return
+        yield from block
+
+
+def external_sort(items, key=None, memory_budget=DEFAULT_SORT_MEMORY, tmpdir=None):
+    """
+    Yield `items` in sorted order, in the same order sorted(items, key=key)
+    would produce.
+
+    Items are gathered into a run until their approximate in-memory size
+    exceeds memory_budget; each full run is sorted and spilled to a temp
+    file, and the runs are then k-way merged, holding one block per run.
+    Input that fits the budget is sorted in memory without touching disk.
+    `key` is computed once per item and spilled with it, never recomputed
+    during the merge.
+    """
+    runs = []
+    run = []
+    size = 0
+    try:
+        for item in items:
+            if key is None:
+                run.append(item)
+                size += sys.getsizeof(item) + 8
+            else:
+                item_key = key(item)
+                run.append((item_key, item))
+                # The pair tuple and its list slot add ~72 bytes per item.
+                size += sys.getsizeof(item) + sys.getsizeof(item_key) + 72
+            if size >= memory_budget:
+                run.sort(key=None if key is None else _pair_key)
+                runs.append(_spill_run(run, tmpdir))
+                run = []
+                size = 0
+
+        run.sort(key=None if key is None else _pair_key)
+        if not runs:
+            yield from (run if key is None else (item for _, item in run))
+            return
+        if run:
+            runs.append(_spill_run(run, tmpdir))
+        del run
+        merged = heapq.merge(*(_read_run(f) for f in runs), key=None if key is None else _pair_key)
+        yield from (merged if key is None else (item for _, item in merged))
+    finally:
+        for f in runs:
+            f.close()
+
+
+def _pair_key(pair):
+    return pair[0]
+
+
+sort_memory_budget = DEFAULT_SORT_MEMORY
+
+
+def configure_sort_memory(memory_budget):
+    """Set the approximate bytes list_operations may hold before spilling sorted runs to disk."""
+    global sort_memory_budget
+    sort_memory_budget = memory_budget
+
+
+def iter_sorted_text(items, sort_key="lexical", memory_budget=DEFAULT_SORT_MEMORY):
+    """
+    Pieces of f"Sorted: {sorted(items, key=...)}", produced without building
+    the text in one piece. `items` is the tool's argument list, already
+    resident, so only the ordering costs memory: a plain sort orders
+    references in memory, while a key function's tuples go through
+    external_sort as (key, index) pairs, spilling keys past memory_budget
+    and never copying the strings themselves.
+    """
+    key = SORT_KEY_FUNCTIONS[sort_key]
+    if key is None:
+        ordered = sorted(items)
+    else:
+        ordered = (items[i] for i in external_sort(range(len(items)), lambda i: key(items[i]), memory_budget))
+    yield "Sorted: ["
+    first = True
+    for item in ordered:
+        if first:
+            first = False
+            yield repr(item)
+        else:
+            yield ", " + repr(item)
+    yield "]"
+
+
+# --------------------
+# Tools
+# --------------------
+@registry.tool(
+    name="echo",
+    description="Echo back the provided input - tests basic string handling",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "message": {"type": "string", "description": "Message to echo back"}
+        },
+        "required": ["message"]
+    }
+)
+async def echo(arguments):
+    return [
+        TextContent(
+            type="text",
+            text=f"ECHO: {arguments['message']}"
+        )
+    ]
+
+
+@registry.tool(
+    name="add_numbers",
+    description="Add two numbers together - tests numeric parameter handling",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "a": {"type": "number", "description": "First number"},
+            "b": {"type": "number", "description": "Second number"}
+        },
+        "required": ["a", "b"]
+    },
+    cacheable=True,
+)
+async def add_numbers(arguments):
+    result = arguments['a'] + arguments['b']
+    return [
+        TextContent(
+            type="text",
+            text=f"Result: {arguments['a']} + {arguments['b']} = {result}"
+        )
+    ]
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Smallest chunk_size accepted: without a progress token every chunk is its
+# own TextContent block, so tiny chunks would multiply the response size.
+MIN_CHUNK_SIZE = 1024
+
+
+@registry.tool(
+    name="format_json",
+    description="Format and validate JSON input - tests object handling",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "data": {"type": "object", "description": "JSON object to format"},
+            "indent": {"type": "number", "description": "Indentation spaces", "default": 2},
+            "stream": {
+                "type": "boolean",
+                "description": "Encode incrementally and return the output in bounded-size chunks",
+                "default": False
+            },
+            "chunk_size": {
+                "type": "integer",
+                "minimum": MIN_CHUNK_SIZE,
+                "description": "Maximum characters per chunk when streaming",
+                "default": DEFAULT_CHUNK_SIZE
+            }
+        },
+        "required": ["data"]
+    },
+    cacheable=True,
+)
+async def format_json(arguments):
+    indent = arguments.get('indent', 2)
+    if arguments.get('stream', False):
+        return await stream_format_json(
+            arguments['data'], indent, arguments.get('chunk_size', DEFAULT_CHUNK_SIZE)
+        )
+    text = await worker_pool.run(render_format_json, arguments['data'], indent)
+    return [
+        TextContent(
+            type="text",
+            text=text
+        )
+    ]
+
+
+def render_format_json(data, indent):
+    return f"Formatted JSON:\n{dumps(data, indent=indent)}"
+
+
+def iter_json_chunks(data, indent, chunk_size, prefix=""):
+    """
+    Yield `prefix` + the JSON encoding of `data` as strings of at most
+    chunk_size characters, encoding incrementally so the full document is
+    never held in memory. The chunks concatenate to exactly
+    prefix + json.dumps(data, indent=indent). Always uses the stdlib
+    encoder, which is the only one that can encode incrementally.
+    """
+    return iter_chunks(json.JSONEncoder(indent=indent).iterencode(data), chunk_size, prefix)
+
+
+def iter_chunks(pieces, chunk_size, prefix=""):
+    """Regroup an iterable of strings into chunks of exactly chunk_size characters (the last may be shorter)."""
+    buffer = [prefix]
+    size = len(prefix)
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            pending = "".join(buffer)
+            cut = len(pending) - len(pending) % chunk_size
+            for start in range(0, cut, chunk_size):
+                yield pending[start:start + chunk_size]
+            buffer = [pending[cut:]]
+            size = len(buffer[0])
+    if size:
+        yield "".join(buffer)
+
+
+def current_progress_token():
+    """The progressToken of the request being handled, if the client sent one."""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    return ctx.meta.progressToken if ctx.meta else None
+
+
+async def stream_format_json(data, indent, chunk_size):
+    """
+    Streaming mode of format_json.
+
+    When the client asked for progress, every chunk goes out immediately as
+    the `message` of a progress notification and the result is a short
+    summary, so memory use is bounded by chunk_size. Otherwise the chunks
+    are returned as separate TextContent blocks.
+    """
+    chunks = iter_json_chunks(data, indent, chunk_size, prefix="Formatted JSON:\n")
+    return await send_chunks(chunks, "Formatted JSON")
+
+
+async def send_chunks(chunks, label):
+    """
+    Deliver text chunks as progress notifications when the client sent a
+    progressToken, returning a one-line summary; otherwise return them as
+    separate TextContent blocks.
+    """
+    token = current_progress_token()
+    if token is None:
+        return [TextContent(type="text", text=chunk) for chunk in chunks]
+
+    ctx = server.request_context
+    sent = 0
+    count = 0
+    for chunk in chunks:
+        sent += len(chunk)
+        count += 1
+        await ctx.session.send_progress_notification(
+            token, sent, message=chunk, related_request_id=ctx.request_id
+        )
+    return [
+        TextContent(
+            type="text",
+            text=f"{label} streamed in {count} chunks ({sent} characters)"
+        )
+    ]
+
+
+LIST_OPERATIONS = ["sort", "reverse", "count", "join", "top_k", "bottom_k", "distinct", "distinct_count", "frequency"]
+DEFAULT_LIST_RESULT = 10
+MAX_LIST_RESULT = 10000
+
+
+@registry.tool(
+    name="list_operations",
+    description="Perform operations on a list - tests array handling",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of items to process"
+            },
+            "operation": {
+                "type": "string",
+                "enum": LIST_OPERATIONS,
+                "description": "Operation to perform"
+            },
+            "separator": {
+                "type": "string",
+                "description": "Separator for join operation",
+                "default": ", "
+            },
+            "k": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": MAX_LIST_RESULT,
+                "description": "Result size for top_k, bottom_k, distinct and frequency",
+                "default": DEFAULT_LIST_RESULT
+            },
+            "sort_key": {
+                "type": "string",
+                "enum": list(SORT_KEYS),
+                "description": "Ordering for sort: plain string order, natural (file9 < file10) or numeric",
+                "default": "lexical"
+            },
+            "stream": {
+                "type": "boolean",
+                "description": "Return sort output in bounded-size chunks",
+                "default": False
+            },
+            "chunk_size": {
+                "type": "integer",
+                "minimum": MIN_CHUNK_SIZE,
+                "description": "Maximum characters per chunk when streaming",
+                "default": DEFAULT_CHUNK_SIZE
+            }
+        },
+        "required": ["items", "operation"]
+    },
+    cacheable=True,
+)
+async def list_operations(arguments):
+    sort_key = arguments.get('sort_key', "lexical")
+    if arguments['operation'] == "sort" and arguments.get('stream', False):
+        chunks = iter_chunks(
+            iter_sorted_text(arguments['items'], sort_key, sort_memory_budget),
+            arguments.get('chunk_size', DEFAULT_CHUNK_SIZE),
+        )
+        return await send_chunks(chunks, "Sorted list")
+    text = await worker_pool.run(
+        render_list_operation,
+        arguments['items'],
+        arguments['operation'],
+        arguments.get('separator', ', '),
+        arguments.get('k', DEFAULT_LIST_RESULT),
+        sort_key,
+    )
+    return [TextContent(type="text", text=text)]
+
+
+def render_list_operation(items, operation, separator, k=DEFAULT_LIST_RESULT, sort_key="lexical"):
+    """
+    The selection operations make one pass over items and return at most k
+    entries: top_k/bottom_k keep a k-sized heap (O(n log k), matching
+    sorted(items)[:k]), distinct/distinct_count/frequency hash each item once.
+    """
+    if operation == "sort":
+        text = f"Sorted: {sorted(items, key=SORT_KEY_FUNCTIONS[sort_key])}"
+    elif operation == "reverse":
+        result = list(reversed(items))
+        text = f"Reversed: {result}"
+    elif operation == "count":
+        text = f"Count: {len(items)}"
+    elif operation == "join":
+        text = f"Joined: {separator.join(items)}"
+    elif operation == "top_k":
+        text = f"Top {k}: {heapq.nlargest(k, items)}"
+    elif operation == "bottom_k":
+        text = f"Bottom {k}: {heapq.nsmallest(k, items)}"
+    elif operation == "distinct":
+        unique = dict.fromkeys(items)
+        first = list(itertools.islice(unique, k))
+        text = f"Distinct ({len(unique)} total, first {len(first)}): {first}"
+    elif operation == "distinct_count":
+        text = f"Distinct count: {len(set(items))}"
+    elif operation == "frequency":
+        counts = Counter(items)
+        text = f"Frequency ({len(counts)} distinct, top {min(k, len(counts))}): {dict(counts.most_common(k))}"
+    else:
+        text = f"Unknown operation: {operation}"
+    return text
+
+
+@registry.tool(
+    name="complex_schema",
+    description="Tool with complex nested schema - tests advanced schema parsing",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "user": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "age": {"type": "number"},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                    "metadata": {
+                        "type": "object",
+                        "additionalProperties": True
+                    }
+                },
+                "required": ["name"]
+            },
+            "options": {
+                "type": "object",
+                "properties": {
+                    "verbose": {"type": "boolean", "default": False},
+                    "format": {"type": "string", "enum": ["json", "yaml", "xml"]}
+                }
+            }
+        },
+        "required": ["user"]
+    }
+)
+async def complex_schema(arguments):
+    user = arguments['user']
+    options = arguments.get('options', {})
+
+    response = {
+        "processed_user": user,
+        "options_applied": options,
+        "timestamp": datetime.now().isoformat()
+    }
+
+    return [
+        TextContent(
+            type="text",
+            text=await worker_pool.run(render_complex_schema, response)
+        )
+    ]
+
+
+def render_complex_schema(response):
+    return f"Processed complex input:\n{dumps(response, indent=2)}"
+
+
+@registry.tool(
+    name="timestamp",
+    description="Get current timestamp - tests tools without required parameters",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "format": {
+                "type": "string",
+                "enum": ["iso", "unix", "readable"],
+                "default": "iso",
+                "description": "Output format"
+            }
+        }
+    }
+)
+async def timestamp(arguments):
+    format_type = arguments.get('format', 'iso')
+    now = datetime.now()
+
+    if format_type == "iso":
+        value = now.isoformat()
+    elif format_type == "unix":
+        value = str(int(now.timestamp()))
+    elif format_type == "readable":
+        value = now.strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        value = now.isoformat()
+
+    return [
+        TextContent(
+            type="text",
+            text=f"Current timestamp ({format_type}): {value}"
+        )
+    ]
+
+
+def request_cursor(request):
+    """The pagination cursor of a list request (None for the SDK's internal refresh)."""
+    if request is None or request.params is None:
+        return None
+    return request.params.cursor
+
+
+@server.list_tools()
+async def list_tools(request: ListToolsRequest):
+    """
+    Comprehensive list of tools for testing MCP scanner capabilities.
+    Includes various input types and complexities to test scanner robustness.
+    The SDK's internal refresh (request None), which looks up a called
+    tool's definition, gets every tool rather than the first page.
+    """
+    if request is None:
+        return registry.catalog.result()
+    return registry.catalog.page(request_cursor(request))
+
+
+# Arguments are checked against the registry's precompiled validators, so the
+# SDK's per-call jsonschema.validate() on the raw schema is switched off.
+@server.call_tool(validate_input=False)
+async def call_tool(name, arguments):
+    """Handle tool calls by dispatching through the tool registry."""
+    start = time.perf_counter()
+    ok = False
+    try:
+        result = await registry.dispatch(name, arguments)
+        ok = True
+        return result
+    except ToolInputError as e:
+        return CallToolResult(
+            content=[TextContent(type="text", text=str(e))],
+            structuredContent=e.to_dict(),
+            isError=True,
+        )
+    finally:
+        metrics.observe("tool", name, time.perf_counter() - start, ok)
+
+
+# --------------------
+# Batch Calls
+# --------------------
+MAX_BATCH_CALLS = 1000
+BATCH_CONCURRENCY = 32
+
+BATCH_TOOL = Tool(
+    name="batch_call",
+    description="Run many tool calls in one request; results come back in order with per-entry errors",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "calls": {
+                "type": "array",
+                "minItems": 1,
+                "maxItems": MAX_BATCH_CALLS,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Tool to call"},
+                        "arguments": {"type": "object", "description": "Arguments for the tool", "default": {}}
+                    },
+                    "required": ["name"]
+                },
+                "description": "Tool calls to run; independent entries run concurrently"
+            }
+        },
+        "required": ["calls"]
+    },
+)
+
+
+async def run_batch_entry(entry, slots):
+    """One batch entry through call_tool; any failure is reported in the entry, not raised."""
+    name = entry["name"]
+    try:
+        if name == BATCH_TOOL.name:
+            raise ValueError("batch_call cannot be nested")
+        async with slots:
+            result = await call_tool(name, entry.get("arguments", {}))
+    except Exception as e:
+        return {"name": name, "isError": True, "content": [{"type": "text", "text": str(e)}]}
+
+    if isinstance(result, CallToolResult):
+        payload = {"name": name, "isError": result.isError, "content": result.content}
+        if result.structuredContent is not None:
+            payload["structuredContent"] = result.structuredContent
+    else:
+        payload = {"name": name, "isError": False, "content": result}
+    payload["content"] = [block.model_dump(mode="json", exclude_none=True) for block in payload["content"]]
+    return payload
+
+
+async def batch_call(arguments):
+    """
+    Dispatch every entry through the regular call_tool path (validation,
+    error conversion, metrics), at most BATCH_CONCURRENCY at a time, and
+    return the per-entry results in request order.
+    """
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    results = await asyncio.gather(*(run_batch_entry(entry, slots) for entry in arguments["calls"]))
+    errors = sum(result["isError"] for result in results)
+    payload = {"results": results, "errors": errors}
+    return CallToolResult(
+        content=[TextContent(type="text", text=dumps(payload))],
+        structuredContent=payload,
+        isError=False,
+    )
+
+
+def configure_batch_tool(enabled):
+    """Register or remove batch_call; it is opt-in so the default tool set stays at the six fixtures."""
+    if enabled:
+        registry.register(BATCH_TOOL, batch_call)
+    else:
+        registry.unregister(BATCH_TOOL.name)
+
+
+# --------------------
+# Binary Content
+# --------------------
+MAX_IMAGE_SIDE = 4096
+
+EncodedBlob = namedtuple("EncodedBlob", "base64")
+
+
+def encode_base64(buffer):
+    """
+    Base64 text of a bytes-like object (bytes, mmap, memoryview slice). The
+    input is only viewed, never copied: binascii reads straight from the
+    buffer, so the full-size allocations are the encoded bytes and the str
+    made from them. Encoding in bounded chunks into a preallocated buffer
+    measured the same peak and a third slower, as the finished text has to
+    exist in one piece either way.
+    """
+    with memoryview(buffer) as view:
+        return binascii.b2a_base64(view, newline=False).decode("ascii")
+
+
+def resource_contents(uri, item):
+    """TextResourceContents or BlobResourceContents for one ReadResourceContents."""
+    meta = {"_meta": item.meta} if item.meta is not None else {}
+    content = item.content
+    if isinstance(content, str):
+        return TextResourceContents(uri=uri, text=content, mimeType=item.mime_type or "text/plain", **meta)
+    blob = content.base64 if isinstance(content, EncodedBlob) else encode_base64(content)
+    return BlobResourceContents(
+        uri=uri, blob=blob, mimeType=item.mime_type or "application/octet-stream", **meta
+    )
+
+
+def png_chunk(kind, data):
+    return len(data).to_bytes(4, "big") + kind + data + zlib.crc32(kind + data).to_bytes(4, "big")
+
+
+def png_test_pattern(width, height):
+    """RGB gradient PNG (red across, green down), built with zlib only."""
+    row = bytearray(1 + 3 * width)
+    row[1::3] = bytes(x * 255 // max(width - 1, 1) for x in range(width))
+    row[3::3] = b"\x80" * width
+    scanlines = bytearray()
+    for y in range(height):
+        row[2::3] = bytes((y * 255 // max(height - 1, 1),)) * width
+        scanlines += row
+    header = width.to_bytes(4, "big") + height.to_bytes(4, "big") + bytes((8, 2, 0, 0, 0))
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        png_chunk(b"IHDR", header),
+        png_chunk(b"IDAT", zlib.compress(scanlines, 6)),
+        png_chunk(b"IEND", b""),
+    ))
+
+
+IMAGE_TOOL = Tool(
+    name="generate_image",
+    description="Return a generated PNG test pattern as image content",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "width": {"type": "integer", "minimum": 1, "maximum": MAX_IMAGE_SIDE, "default": 64},
+            "height": {"type": "integer", "minimum": 1, "maximum": MAX_IMAGE_SIDE, "default": 64},
+        },
+    },
+)
+
+
+async def generate_image(arguments):
+    png = await worker_pool.run(png_test_pattern, arguments.get("width", 64), arguments.get("height", 64))
+    return [ImageContent(type="image", data=encode_base64(png), mimeType="image/png")]
+
+
+def configure_image_tool(enabled):
+    """Register or remove generate_image; opt-in like batch_call, so the fixture tool set is unchanged."""
+    if enabled:
+        registry.register(IMAGE_TOOL, generate_image, cacheable=True)
+    else:
+        registry.unregister(IMAGE_TOOL.name)
+
+
+# --------------------
+# Resources
+# --------------------
+resource_catalog = Catalog(ListResourcesResult, "resources")
+# Readable but deliberately not listed, so the advertised scanner surface
+# stays at the four fixture resources.
+METRICS_URI = "mcp://test/metrics"
+
+for _resource in [
+    Resource(
+        uri="mcp://test/static-text",
+        name="static-text-resource",
+        description="Simple static text resource for basic testing",
+        mimeType="text/plain"
+    ),
+    Resource(
+        uri="mcp://test/json-data",
+        name="json-data-resource",
+        description="JSON data resource for structured content testing",
+        mimeType="application/json"
+    ),
+    Resource(
+        uri="mcp://test/markdown-doc",
+        name="markdown-documentation",
+        description="Markdown formatted documentation resource",
+        mimeType="text/markdown"
+    ),
+    Resource(
+        uri="mcp://test/config",
+        name="configuration",
+        description="Sample configuration resource",
+        mimeType="application/json"
+    ),
+]:
+    resource_catalog.add(str(_resource.uri), _resource)
+
+
+# Cursors for the file provider's pages; catalog cursors are bare base64.
+FILE_CURSOR_PREFIX = "files:"
+
+
+@server.list_resources()
+async def list_resources(request: ListResourcesRequest):
+    """
+    Provide various resources for testing scanner's resource discovery.
+    Catalog resources are paged first, then any files served by the file
+    resource provider.
+    """
+    cursor = request_cursor(request)
+    if file_resources is None:
+        return resource_catalog.page(cursor)
+
+    if cursor is None or not cursor.startswith(FILE_CURSOR_PREFIX):
+        page = resource_catalog.page(cursor)
+        if page.nextCursor:
+            return page
+        # Catalog exhausted: the first page of files follows on the same page.
+        files, next_files = file_resources.list_page(None)
+        resources = page.resources + files
+    else:
+        resources, next_files = file_resources.list_page(cursor[len(FILE_CURSOR_PREFIX):])
+    next_cursor = FILE_CURSOR_PREFIX + next_files if next_files else None
+    return ListResourcesResult(
+        resources=resources, nextCursor=next_cursor, _meta={"version": resource_catalog.version}
+    )
+
+
+STATIC_TEXT = "This is a static text resource exposed via MCP.\nIt can contain multiple lines.\nUseful for testing basic resource reading capabilities."
+
+JSON_DATA = {
+    "version": "1.0",
+    "server": "mcp-test-server",
+    "capabilities": ["tools", "resources", "prompts"],
+    "test_data": {
+        "numbers": [1, 2, 3, 4, 5],
+        "strings": ["alpha", "beta", "gamma"],
+        "nested": {
+            "key1": "value1",
+            "key2": "value2"
+        }
+    }
+}
+
+MARKDOWN_DOC = """# MCP Test Resource
+
+## Overview
+This is a markdown-formatted resource for testing.
+
+## Features
+- **Text formatting**: Test markdown parsing
+- **Lists**: Support for ordered and unordered lists
+- **Code blocks**: ```python
+print("Hello, MCP!")
+```
+
+## Tables
+| Feature | Status |
+|---------|--------|
+| Tools   | ✓      |
+| Resources | ✓    |
+| Prompts | ✓      |
+
+## Links
+[MCP Documentation](https://spec.modelcontextprotocol.io/)
+"""
+
+CONFIG = {
+    "server_name": "mcp-test-server",
+    "version": "0.1.0",
+    "endpoints": {
+        "tools": True,
+        "resources": True,
+        "prompts": True
+    },
+    "settings": {
+        "debug": False,
+        "timeout": 30,
+        "max_retries": 3
+    }
+}
+
+
+StaticResource = namedtuple("StaticResource", "text mime_type etag contents not_modified")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class StaticResourceCache:
+    """
+    Static resources rendered once into an immutable URI -> entry mapping.
+
+    Each entry carries the SHA-256 of its text as an etag, returned in the
+    contents' _meta. A client that already holds that etag can send it as
+    _meta.ifNoneMatch on resources/read and gets an empty reply marked
+    notModified instead of the body. Both replies are prebuilt.
+    """
+
+    def __init__(self, documents):
+        self._entries = MappingProxyType({
+            uri: self._entry(text, mime_type) for uri, (text, mime_type) in documents.items()
+        })
+
+    @staticmethod
+    def _entry(text, mime_type):
+        etag = content_hash(text)
+        return StaticResource(
+            text=text,
+            mime_type=mime_type,
+            etag=etag,
+            contents=(ReadResourceContents(text, mime_type, {"etag": etag}),),
+            not_modified=(
+                ReadResourceContents("", mime_type, {"etag": etag, "notModified": True}),
+            ),
+        )
+
+    def get(self, uri):
+        return self._entries.get(uri)
+
+    def __contains__(self, uri):
+        return uri in self._entries
+
+    def update(self, uri, text):
+        """
+        Replace the text of an existing entry. The mapping is swapped, not
+        mutated, so a reader never sees a half-built entry.
+        """
+        entry = self._entries.get(uri)
+        if entry is None:
+            raise ValueError(f"Unknown resource URI: {uri}")
+        self._entries = MappingProxyType({**self._entries, uri: self._entry(text, entry.mime_type)})
+
+    def read(self, uri, if_none_match=None):
+        """Contents for uri, or the notModified reply when the etag matches."""
+        entry = self._entries[uri]
+        if if_none_match is not None and if_none_match == entry.etag:
+            return entry.not_modified
+        return entry.contents
+
+
+static_resources = StaticResourceCache({
+    uri: (text, resource_catalog.get(uri).mimeType)
+    for uri, text in [
+        ("mcp://test/static-text", STATIC_TEXT),
+        ("mcp://test/json-data", dumps(JSON_DATA, indent=2)),
+        ("mcp://test/markdown-doc", MARKDOWN_DOC),
+        ("mcp://test/config", dumps(CONFIG, indent=2)),
+    ]
+})
+
+
+class LineIndex:
+    """
+    Sparse newline index over a file: the number of newlines before each
+    fixed-size block. Built in one pass of bounded buffered reads, it turns
+    "byte offset of line N" into a bisect plus a search of one block.
+    """
+
+    def __init__(self, f, size, block_size=256 * 1024):
+        self.block_size = block_size
+        self.size = size
+        self.newlines_before = array("Q", [0])
+        last = b""
+        f.seek(0)
+        while chunk := f.read(block_size):
+            self.newlines_before.append(self.newlines_before[-1] + chunk.count(b"\n"))
+            last = chunk[-1:]
+        trailing = 1 if size and last != b"\n" else 0
+        self.total_lines = self.newlines_before[-1] + trailing
+
+    def line_offset(self, mm, line):
+        """Byte offset where 1-based `line` starts (size if past the end)."""
+        if line <= 1:
+            return 0
+        target = line - 1
+        if target > self.newlines_before[-1]:
+            return self.size
+        block = bisect.bisect_left(self.newlines_before, target) - 1
+        start = block * self.block_size
+        chunk = mm[start:start + self.block_size]
+        # Everything after the n-th newline of the block is the last piece.
+        tail = chunk.split(b"\n", target - self.newlines_before[block])[-1]
+        return start + len(chunk) - len(tail)
+
+
+class FileResourceProvider:
+    """
+    Serves the files under a directory as mcp://files/<relative path>
+    resources without loading them into memory.
+
+    Reads go through mmap and copy only the requested window. A URI may
+    carry ?bytes=START-END (0-based, inclusive) or ?lines=START-END
+    (1-based, inclusive); without one the first page is returned. Every
+    read is capped at max_read_bytes and its _meta gives the served range
+    plus a `next` URI while more of the file remains. Listing walks the
+    tree lazily in sorted order and resumes from an opaque cursor, so no
+    full file list is ever built. The sorted entries of the most recently
+    listed directories are kept until a directory's mtime changes, so each
+    page costs a binary search per directory on the cursor's path rather
+    than a fresh scan and sort.
+    """
+
+    scheme = "mcp"
+    host = "files"
+    listing_cache_dirs = 64
+
+    def __init__(self, root, page_size=100, max_read_bytes=1 << 20):
+        self.root = os.path.realpath(root)
+        self.page_size = page_size
+        self.max_read_bytes = max_read_bytes
+        self._line_indexes = {}
+        self._listings = OrderedDict()
+
+    # Listing
+
+    def uri_for(self, relpath):
+        return f"{self.scheme}://{self.host}/{quote(relpath)}"
+
+    def owns(self, uri):
+        return uri.startswith(f"{self.scheme}://{self.host}/")
+
+    def iter_files(self, after=None):
+        """Yield relative file paths in sorted order, strictly after `after`."""
+        after_parts = after.split("/") if after else None
+        yield from self._walk(self.root, (), after_parts)
+
+    def _walk(self, directory, prefix, after_parts):
+        depth = len(prefix)
+        names, kinds = self._listing(directory)
+        cursor_name = None
+        start = 0
+        if after_parts is not None and depth < len(after_parts):
+            # Skip the entries (and whole subtrees) that sort before the cursor.
+            cursor_name = after_parts[depth]
+            start = bisect.bisect_left(names, cursor_name)
+        for position in range(start, len(names)):
+            name, kind = names[position], kinds[position]
+            on_cursor_path = name == cursor_name
+            if kind == "dir":
+                yield from self._walk(
+                    os.path.join(directory, name), prefix + (name,), after_parts if on_cursor_path else None
+                )
+            elif kind == "file" and not on_cursor_path:
+                yield "/".join(prefix + (name,))
+
+    def _listing(self, directory):
+        """(sorted names, kinds) of a directory's entries, cached until its mtime changes."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return (), ()
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            self._listings.move_to_end(directory)
+            return cached[1]
+        try:
+            with os.scandir(directory) as entries:
+                listing = sorted(
+                    (entry.name, "dir" if entry.is_dir(follow_symlinks=False) else "file" if entry.is_file() else None)
+                    for entry in entries
+                )
+        except OSError:
+            return (), ()
+        names = [name for name, _ in listing]
+        kinds = [kind for _, kind in listing]
+        self._listings[directory] = (mtime, (names, kinds))
+        if len(self._listings) > self.listing_cache_dirs:
+            self._listings.popitem(last=False)
+        return names, kinds
+
+    def list_page(self, cursor=None):
+        """(resources, next_cursor) for one page of files."""
+        after = self._decode_cursor(cursor) if cursor else None
+        resources = []
+        for relpath in self.iter_files(after):
+            if len(resources) == self.page_size:
+                return resources, self._encode_cursor(resources[-1].name)
+            path = os.path.join(self.root, relpath)
+            resources.append(Resource(
+                uri=self.uri_for(relpath),
+                name=relpath,
+                mimeType=self._mime_type(path),
+                size=os.path.getsize(path),
+            ))
+        return resources, None
+
+    @staticmethod
+    def _encode_cursor(relpath):
+        return base64.urlsafe_b64encode(relpath.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        except (ValueError, UnicodeError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    # Reading
+
+    # Common corpus formats mimetypes does not know about.
+    extra_mime_types = {".log": "text/plain", ".jsonl": "application/jsonl", ".ndjson": "application/jsonl"}
+
+    @classmethod
+    def _mime_type(cls, path):
+        guessed = mimetypes.guess_type(path)[0]
+        if guessed is None:
+            guessed = cls.extra_mime_types.get(os.path.splitext(path)[1].lower())
+        return guessed or "application/octet-stream"
+
+    @staticmethod
+    def _is_text(mime_type):
+        return mime_type.startswith("text/") or mime_type in (
+            "application/json", "application/jsonl", "application/xml"
+        )
+
+    def resolve(self, uri):
+        """Map a URI to (path, query) inside root; rejects traversal."""
+        parts = urlsplit(uri)
+        relpath = unquote(parts.path).lstrip("/")
+        path = os.path.realpath(os.path.join(self.root, relpath))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            raise ValueError(f"Unknown resource URI: {uri}")
+        return path, parse_qs(parts.query)
+
+    def read(self, uri):
+        import mmap
+
+        path, query = self.resolve(uri)
+        mime_type = self._mime_type(path)
+        base_uri = uri.split("?", 1)[0]
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if size == 0:
+                data, meta = b"", {"size": 0, "range": "bytes=0-0"}
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if "lines" in query:
+                        index = self._line_index(path, f, size)
+                        data, meta = self._read_lines(index, mm, size, query["lines"][0], base_uri)
+                    else:
+                        start, stop, meta = self._byte_window(size, query.get("bytes", ["0-"])[0], base_uri)
+                        if not self._is_text(mime_type):
+                            # Encode straight from the mapping; the window is never copied as bytes.
+                            blob = EncodedBlob(encode_base64(memoryview(mm)[start:stop]))
+                            return [ReadResourceContents(blob, mime_type, meta)]
+                        data = mm[start:stop]
+        content = data.decode("utf-8", errors="replace") if self._is_text(mime_type) else data
+        return [ReadResourceContents(content, mime_type, meta)]
+
+    @staticmethod
+    def _parse_range(spec, default_end):
+        start, _, end = spec.partition("-")
+        try:
+            start = int(start)
+            end = int(end) if end else default_end
+        except ValueError:
+            raise ValueError(f"Invalid range: {spec}")
+        if start < 0 or end < start:
+            raise ValueError(f"Invalid range: {spec}")
+        return start, end
+
+    def _byte_window(self, size, spec, base_uri):
+        """(start, stop, meta) of a bytes=START-END request, capped at max_read_bytes."""
+        start, end = self._parse_range(spec, size - 1)
+        start = min(start, size)
+        stop = min(end + 1, size, start + self.max_read_bytes)
+        meta = {"size": size, "range": f"bytes={start}-{max(start, stop - 1)}"}
+        if stop < min(end + 1, size):
+            meta["next"] = f"{base_uri}?bytes={stop}-{end if end < size - 1 else ''}"
+        return start, stop, meta
+
+    def _line_index(self, path, f, size):
+        stat = os.stat(f.fileno())
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._line_indexes.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, LineIndex(f, size))
+            self._line_indexes[path] = cached
+        return cached[1]
+
+    def _read_lines(self, index, mm, size, spec, base_uri):
+        first, last = self._parse_range(spec, index.total_lines)
+        first = max(first, 1)
+        last = min(last, index.total_lines)
+        start = index.line_offset(mm, first)
+        stop = index.line_offset(mm, last + 1)
+        line_rest = None
+        if stop - start > self.max_read_bytes:
+            # Cut at the last whole line that fits.
+            cut = mm.rfind(b"\n", start, start + self.max_read_bytes)
+            if cut >= 0:
+                stop = cut + 1
+            else:
+                # The first line alone exceeds the cap: serve its head and point at the rest by bytes.
+                line_stop = index.line_offset(mm, first + 1)
+                stop = start + self.max_read_bytes
+                line_rest = f"{base_uri}?bytes={stop}-{line_stop - 1}"
+        data = mm[start:stop]
+        served = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+        served_last = first + served - 1
+        meta = {"size": size, "lines": index.total_lines, "range": f"lines={first}-{served_last}"}
+        if line_rest is not None:
+            meta["line_rest"] = line_rest
+        if served_last < last:
+            meta["next"] = f"{base_uri}?lines={served_last + 1}-{last}"
+        return data, meta
+
+
+file_resources = None
+
+
+def configure_file_resources(root, page_size=100, max_read_bytes=1 << 20):
+    """Serve the files under `root` as mcp://files/ resources (None disables)."""
+    global file_resources
+    file_resources = (
+        FileResourceProvider(root, page_size, max_read_bytes) if root is not None else None
+    )
+    return file_resources
+
+
+def requested_etag():
+    """The ifNoneMatch etag sent in the current request's _meta, if any."""
+    try:
+        meta = server.request_context.meta
+    except LookupError:
+        return None
+    return getattr(meta, "ifNoneMatch", None) if meta else None
+
+
+@server.read_resource()
+async def read_resource(uri):
+    """Provide resource content based on URI."""
+    uri = str(uri)
+    start = time.perf_counter()
+    ok = False
+    try:
+        contents = resolve_resource(uri)
+        ok = True
+        return contents
+    finally:
+        # Range queries on file resources share their file's series.
+        metrics.observe("resource", uri.partition("?")[0], time.perf_counter() - start, ok)
+
+
+def resolve_resource(uri):
+    if uri in static_resources:
+        return static_resources.read(uri, requested_etag())
+    if file_resources is not None and file_resources.owns(uri):
+        return file_resources.read(uri)
+    if uri == METRICS_URI:
+        snapshot = metrics.snapshot()
+        if registry.cache is not None:
+            snapshot["result_cache"] = registry.cache.stats()
+        return [ReadResourceContents(dumps(snapshot), "application/json")]
+    if uri.startswith(SYNTHETIC_RESOURCE_PREFIX) and uri in resource_catalog:
+        return [ReadResourceContents(f"Synthetic resource {uri[len(SYNTHETIC_RESOURCE_PREFIX):]}", "text/plain")]
+
+    raise ValueError(f"Unknown resource URI: {uri}")
+
+
+def update_resource(uri, text):
+    """Replace a static resource's text and notify its subscribers if the content changed."""
+    static_resources.update(uri, text)
+    subscriptions.changed(uri)
+
+
+# --------------------
+# Resource Subscriptions
+# --------------------
+DEFAULT_SUBSCRIPTION_DEBOUNCE = 0.05
+DEFAULT_WATCH_INTERVAL = 1.0
+
+
+def resource_hash(uri):
+    """Content hash of a resource: the etag for static ones, the whole file for file resources."""
+    entry = static_resources.get(uri)
+    if entry is not None:
+        return entry.etag
+    digest = hashlib.sha256()
+    if file_resources is not None and file_resources.owns(uri):
+        path, _ = file_resources.resolve(uri)
+        with open(path, "rb") as f:
+            while block := f.read(1 << 20):
+                digest.update(block)
+        return digest.hexdigest()
+    for contents in resolve_resource(uri):
+        content = contents.content
+        digest.update(content.encode("utf-8") if isinstance(content, str) else content)
+    return digest.hexdigest()
+
+
+class ResourceSubscriptions:
+    """
+    URI -> subscribed sessions, with change detection and fan-out.
+
+    changed(uri) only marks a subscribed URI dirty. The first change opens a
+    `debounce`-second window; when it closes the content is hashed once and,
+    if the hash differs from the one subscribers last heard about, a single
+    resources/updated notification is built and sent to every subscriber
+    concurrently. A burst of writes costs each subscriber at most one
+    notification per window, and writes that restore the previous content
+    cost none. Subscribed file resources are watched by stat every
+    watch_interval seconds and hashed, in a thread, only when size or mtime
+    moves.
+
+    Sessions are held weakly and dropped when a send to them fails, so
+    disconnected clients do not accumulate.
+    """
+
+    def __init__(self, debounce=DEFAULT_SUBSCRIPTION_DEBOUNCE, watch_interval=DEFAULT_WATCH_INTERVAL):
+        self.debounce = debounce
+        self.watch_interval = watch_interval
+        self.notifications = 0
+        self._subscribers = {}
+        self._hashes = {}
+        self._pending = {}
+        self._stats = {}
+        self._tasks = set()
+        self._watcher = None
+
+    async def subscribe(self, uri, session):
+        """Add session to uri's subscribers; unknown URIs raise ValueError."""
+        sessions = self._subscribers.get(uri)
+        if sessions is None:
+            digest = await self._hash(uri)
+            sessions = self._subscribers.get(uri)
+        if sessions is None:
+            self._hashes[uri] = digest
+            sessions = self._subscribers[uri] = weakref.WeakSet()
+            if file_resources is not None and file_resources.owns(uri):
+                self._stats[uri] = self._stat(uri)
+                self._ensure_watcher()
+        sessions.add(session)
+
+    def unsubscribe(self, uri, session):
+        sessions = self._subscribers.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            self._forget(uri)
+
+    def subscribers(self, uri):
+        return len(self._subscribers.get(uri, ()))
+
+    def changed(self, uri):
+        """Note that uri may have changed; subscribers hear about it after the debounce window."""
+        if uri not in self._subscribers or uri in self._pending:
+            return
+        loop = asyncio.get_running_loop()
+        self._pending[uri] = loop.call_later(self.debounce, self._spawn_flush, uri)
+
+    async def flush(self, uri):
+        """
+        Hash uri now and notify its subscribers if the content differs from
+        the last notification. A resource that can no longer be read (a
+        deleted file) counts as changed, and again when it comes back.
+        """
+        self._pending.pop(uri, None)
+        if not self._subscribers.get(uri):
+            return
+        try:
+            digest = await self._hash(uri)
+        except (OSError, ValueError):
+            digest = None
+        sessions = self._subscribers.get(uri)
+        if not sessions or digest == self._hashes.get(uri):
+            return
+        self._hashes[uri] = digest
+        notification = ServerNotification(
+            ResourceUpdatedNotification(params=ResourceUpdatedNotificationParams(uri=uri))
+        )
+        await asyncio.gather(*(self._send(session, notification) for session in list(sessions)))
+
+    async def _send(self, session, notification):
+        try:
+            await session.send_notification(notification)
+        except Exception:
+            # The client went away; stop sending to it anywhere.
+            for uri in list(self._subscribers):
+                self.unsubscribe(uri, session)
+        else:
+            self.notifications += 1
+
+    @staticmethod
+    async def _hash(uri):
+        """resource_hash(uri); file resources are read and hashed off the event loop."""
+        if file_resources is not None and file_resources.owns(uri):
+            return await asyncio.to_thread(resource_hash, uri)
+        return resource_hash(uri)
+
+    def _spawn_flush(self, uri):
+        task = asyncio.ensure_future(self.flush(uri))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _forget(self, uri):
+        del self._subscribers[uri]
+        self._hashes.pop(uri, None)
+        self._stats.pop(uri, None)
+        handle = self._pending.pop(uri, None)
+        if handle is not None:
+            handle.cancel()
+
+    @staticmethod
+    def _stat(uri):
+        try:
+            stat = os.stat(file_resources.resolve(uri)[0])
+        except (OSError, ValueError):
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _ensure_watcher(self):
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.ensure_future(self._watch())
+
+    async def _watch(self):
+        while self._stats:
+            await asyncio.sleep(self.watch_interval)
+            for uri, previous in list(self._stats.items()):
+                if not self._subscribers.get(uri):
+                    self._forget(uri)
+                    continue
+                current = self._stat(uri)
+                if current != previous:
+                    self._stats[uri] = current
+                    self.changed(uri)
+
+
+subscriptions = ResourceSubscriptions()
+
+
+def configure_subscriptions(debounce=DEFAULT_SUBSCRIPTION_DEBOUNCE, watch_interval=DEFAULT_WATCH_INTERVAL):
+    """Set the notification debounce window and the file-resource watch interval (seconds)."""
+    subscriptions.debounce = debounce
+    subscriptions.watch_interval = watch_interval
+    return subscriptions
+
+
+@server.subscribe_resource()
+async def subscribe_resource(uri):
+    """Send resources/updated to this session whenever uri's content changes."""
+    await subscriptions.subscribe(str(uri), server.request_context.session)
+
+
+@server.unsubscribe_resource()
+async def unsubscribe_resource(uri):
+    subscriptions.unsubscribe(str(uri), server.request_context.session)
+
+
+# --------------------
+# Prompts (Optional)
+# --------------------
+PROMPT_CACHE_ENTRIES = 1024
+# Argument sets longer than this (total characters) are rendered every time:
+# keeping them alive in the cache would pin multi-megabyte inputs.
+PROMPT_CACHE_MAX_CHARS = 4096
+
+
+class PromptArgumentError(ValueError):
+    """Arguments that do not match a prompt's declared PromptArguments."""
+
+
+class PromptTemplate:
+    """
+    A prompt definition plus its message text, parsed once into literal
+    pieces and placeholder slots. Rendering fills the slots of a copy of the
+    piece list and joins it, so each argument value is copied exactly once,
+    into the final text.
+    """
+
+    __slots__ = ("prompt", "defaults", "_pieces", "_slots", "_required", "_declared")
+
+    def __init__(self, prompt, text, defaults=None):
+        self.prompt = prompt
+        self.defaults = dict(defaults or {})
+        declared = {argument.name for argument in prompt.arguments or []}
+        self._declared = frozenset(declared)
+        self._required = tuple(
+            argument.name for argument in prompt.arguments or [] if argument.required
+        )
+        self._pieces = []
+        self._slots = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if literal:
+                self._pieces.append(literal)
+            if field is None:
+                continue
+            if spec or conversion or field not in declared:
+                raise ValueError(f"Invalid placeholder {{{field}}} in prompt {prompt.name}")
+            if field not in self._required and field not in self.defaults:
+                raise ValueError(f"Optional argument {field} of prompt {prompt.name} needs a default")
+            self._slots.append((len(self._pieces), field))
+            self._pieces.append(None)
+
+    def validate(self, arguments):
+        """Raise PromptArgumentError for missing, undeclared or non-string arguments."""
+        if (
+            self._declared.issuperset(arguments)
+            and all(name in arguments for name in self._required)
+            and all(type(value) is str for value in arguments.values())
+        ):
+            return
+        missing = [name for name in self._required if name not in arguments]
+        unknown = sorted(name for name in arguments if name not in self._declared)
+        invalid = sorted(name for name, value in arguments.items() if not isinstance(value, str))
+        problems = []
+        if missing:
+            problems.append(f"missing required {', '.join(missing)}")
+        if unknown:
+            problems.append(f"unknown {', '.join(unknown)}")
+        if invalid:
+            problems.append(f"non-string {', '.join(invalid)}")
+        if problems:
+            raise PromptArgumentError(f"Invalid arguments for prompt {self.prompt.name}: {'; '.join(problems)}")
+
+    def render(self, arguments):
+        pieces = self._pieces.copy()
+        for index, field in self._slots:
+            value = arguments.get(field)
+            pieces[index] = self.defaults[field] if value is None else value
+        return "".join(pieces)
+
+
+class PromptRegistry:
+    """
+    Name -> PromptTemplate mapping shared by list_prompts and get_prompt, so
+    the advertised arguments and the rendering come from one definition.
+    Renders of small argument sets are kept in a bounded LRU.
+    """
+
+    def __init__(self, cache_entries=PROMPT_CACHE_ENTRIES):
+        self.catalog = Catalog(ListPromptsResult, "prompts")
+        self.cache_entries = cache_entries
+        self._templates = {}
+        self._cache = OrderedDict()
+
+    def register(self, prompt, text, defaults=None):
+        """Register (or replace) a prompt; its text is compiled here, once."""
+        self._templates[prompt.name] = PromptTemplate(prompt, text, defaults)
+        self._cache.clear()
+        self.catalog.add(prompt.name, prompt)
+
+    def unregister(self, name):
+        """Remove a prompt; unknown names are ignored."""
+        if self._templates.pop(name, None) is not None:
+            self._cache.clear()
+        self.catalog.remove(name)
+
+    def prompts(self):
+        return self.catalog.items()
+
+    def __contains__(self, name):
+        return name in self._templates
+
+    def render(self, name, arguments):
+        template = self._templates.get(name)
+        if template is None:
+            raise ValueError(f"Unknown prompt: {name}")
+        arguments = arguments or {}
+        key = self._cache_key(name, arguments)
+        if key is not None:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                return result
+        template.validate(arguments)
+        result = GetPromptResult(messages=[
+            PromptMessage(role="user", content=TextContent(type="text", text=template.render(arguments)))
+        ])
+        if key is not None:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def _cache_key(self, name, arguments):
+        # Only small, all-string argument sets are cached; large ones are never hashed.
+        if not self.cache_entries:
+            return None
+        total = 0
+        for value in arguments.values():
+            if not isinstance(value, str):
+                return None
+            total += len(value)
+            if total > PROMPT_CACHE_MAX_CHARS:
+                return None
+        return (name, *sorted(arguments.items()))
+
+
+prompt_registry = PromptRegistry()
+
+prompt_registry.register(
+    Prompt(
+        name="test-prompt",
+        description="A simple test prompt",
+        arguments=[
+            PromptArgument(
+                name="topic",
+                description="Topic to discuss",
+                required=True
+            )
+        ]
+    ),
+    "Please provide information about: {topic}",
+)
+prompt_registry.register(
+    Prompt(
+        name="debug-prompt",
+        description="Debug assistance prompt",
+        arguments=[
+            PromptArgument(
+                name="code",
+                description="Code to debug",
+                required=True
+            ),
+            PromptArgument(
+                name="language",
+                description="Programming language",
+                required=False
+            )
+        ]
+    ),
+    "Debug the following {language} code:\n\n{code}\n\nProvide analysis and suggestions.",
+    defaults={"language": "unknown"},
+)
+
+
+@server.list_prompts()
+async def list_prompts():
+    """Provide sample prompts for testing prompt capabilities."""
+    return prompt_registry.catalog.result()
+
+
+@server.get_prompt()
+async def get_prompt(name, arguments):
+    """Return prompt content based on name and arguments."""
+    start = time.perf_counter()
+    ok = False
+    try:
+        result = render_prompt(name, arguments)
+        ok = True
+        return result
+    finally:
+        metrics.observe("prompt", name, time.perf_counter() - start, ok)
+
+
+def render_prompt(name, arguments):
+    return prompt_registry.render(name, arguments)
+
+
+# --------------------
+# Synthetic Catalogs
+# --------------------
+SYNTHETIC_RESOURCE_PREFIX = "mcp://test/synthetic/"
+
+SYNTHETIC_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "message": {"type": "string", "description": "Message to echo back"}
+    }
+}
+
+
+async def synthetic_tool(arguments):
+    return [TextContent(type="text", text=f"SYNTHETIC: {arguments.get('message', '')}")]
+
+
+def populate_synthetic_catalog(tools=0, resources=0):
+    """
+    Register `tools` synthetic_<n> tools and `resources` synthetic resources
+    to emulate servers with very large catalogs. All synthetic tools share
+    one schema (and so one compiled validator).
+    """
+    for i in range(tools):
+        registry.register(
+            Tool(
+                name=f"synthetic_{i:06d}",
+                description=f"Synthetic tool {i} for large-catalog scanner testing",
+                inputSchema=SYNTHETIC_TOOL_SCHEMA,
+            ),
+            synthetic_tool,
+        )
+    for i in range(resources):
+        uri = f"{SYNTHETIC_RESOURCE_PREFIX}{i:06d}"
+        resource_catalog.add(uri, Resource(
+            uri=uri,
+            name=f"synthetic-resource-{i:06d}",
+            description=f"Synthetic resource {i} for large-catalog scanner testing",
+            mimeType="text/plain",
+        ))
+
+
+def configure_page_size(page_size):
+    """Page list_tools and list_resources responses (None returns everything at once)."""
+    registry.catalog.page_size = page_size
+    resource_catalog.page_size = page_size
+
+
+# --------------------
+# Zygote Pool
+# --------------------
+# Seconds a supervisor waits before replacing a worker that failed within
+# this long of starting, so a crash on startup cannot become a fork loop.
+RESTART_BACKOFF = 1.0
+
+
+def warm_up():
+    """Exercise one in-process session so workers fork with every lazy path already loaded."""
+    import mcp.server.stdio  # loaded here so forked workers inherit it
+
+    registry.precompile()
+
+    async def session():
+        async with connect_in_memory() as client:
+            await client.list_tools()
+            await client.list_resources()
+            await client.list_prompts()
+            await client.call_tool("echo", {"message": "warm"})
+            await client.read_resource("mcp://test/static-text")
+
+    asyncio.run(session())
+
+
+def serve_handoff(listener):
+    """
+    Worker body: accept one launcher connection, receive the launcher's
+    stdin/stdout descriptors over it and serve a full stdio session on them.
+    Reports the exit status back to the launcher, which exits with it.
+    """
+    import anyio
+    from io import TextIOWrapper
+
+    conn, _ = listener.accept()
+    listener.close()
+    status = 1
+    try:
+        _, fds, _, _ = socket.recv_fds(conn, 1, 2)
+        if len(fds) != 2:
+            raise RuntimeError(f"Expected stdin and stdout descriptors, got {len(fds)}")
+        stdin = anyio.wrap_file(TextIOWrapper(os.fdopen(fds[0], "rb"), encoding="utf-8", errors="replace"))
+        stdout = anyio.wrap_file(TextIOWrapper(os.fdopen(fds[1], "wb"), encoding="utf-8"))
+        asyncio.run(run(stdin, stdout))
+        status = 0
+    finally:
+        try:
+            conn.sendall(bytes([status]))
+        except OSError:
+            pass
+        conn.close()
+
+
+def run_zygote(socket_path=None, pool_size=4):
+    """
+    Supervisor for zygote mode.
+
+    The server is imported and warmed once, then `pool_size` workers are
+    forked, each blocked in accept() on a Unix socket. A launcher
+    (mcp-test-server-launch) connects and hands its stdin/stdout to
+    whichever worker the kernel wakes; that worker serves the session and
+    exits, and the supervisor forks a replacement. Session setup therefore
+    costs a socket round trip instead of interpreter startup and imports.
+    A worker that fails within RESTART_BACKOFF seconds of starting is
+    replaced only after that delay.
+
+    Without `socket_path` the socket goes where the launcher looks by
+    default, creating its per-user directory if needed. The socket itself
+    is created mode 0600.
+    """
+    import signal
+    from launcher import default_socket, private_directory
+
+    if not hasattr(os, "fork"):
+        raise SystemExit("Zygote mode needs os.fork (POSIX only)")
+    if socket_path is None:
+        socket_path = default_socket()
+        try:
+            private_directory(os.path.dirname(socket_path))
+        except PermissionError as e:
+            raise SystemExit(f"Zygote socket directory rejected: {e}")
+    warm_up()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(umask)
+    listener.listen(max(pool_size, 16))
+
+    workers = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 1
+            try:
+                serve_handoff(listener)
+                code = 0
+            finally:
+                os._exit(code)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Zygote pool of {pool_size} listening on {socket_path}", file=sys.stderr, flush=True)
+    try:
+        for _ in range(pool_size):
+            spawn()
+        while not stopping:
+            pid, status = os.wait()
+            if pid not in workers:
+                continue
+            started = workers.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if code and time.monotonic() - started < RESTART_BACKOFF:
+                print(f"Zygote worker (pid {pid}) exited with status {code}; restarting in {RESTART_BACKOFF:g}s",
+                      file=sys.stderr, flush=True)
+                time.sleep(RESTART_BACKOFF)
+            if not stopping:
+                spawn()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in workers:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+# --------------------
+# Sharded HTTP Workers
+# --------------------
+SESSION_HEADER = b"mcp-session-id"
+MAX_PEEK_BYTES = 16384
+PEEK_TIMEOUT = 5.0
+
+
+def shard_of(session_id):
+    """Worker index encoded in a sharded session id ("<index>.<id>"), or None."""
+    index, dot, _ = session_id.partition(".")
+    return int(index) if dot and index.isascii() and index.isdecimal() else None
+
+
+def peek_session_id(head):
+    """Mcp-Session-Id header of the request whose head (request line and headers) is given, or None."""
+    for line in head.split(b"\r\n\r\n", 1)[0].split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == SESSION_HEADER:
+            return value.strip().decode("latin-1")
+    return None
+
+
+def session_affinity(app, index):
+    """
+    ASGI wrapper that prefixes the session ids a worker issues with its
+    index and strips the prefix from incoming requests, so the session
+    manager sees its own ids while the router can tell which worker owns
+    any session from the header alone.
+    """
+    tag = f"{index}.".encode()
+
+    def rewrite(headers, change):
+        return [(name, change(value) if name.lower() == SESSION_HEADER else value) for name, value in headers]
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+
+        async def tagged_send(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=rewrite(message.get("headers", []), lambda value: tag + value))
+            await send(message)
+
+        scope = dict(scope, headers=rewrite(scope["headers"], lambda value: value.removeprefix(tag)))
+        await app(scope, receive, tagged_send)
+
+    return wrapped
+
+
+async def peek_request_head(sock, timeout=PEEK_TIMEOUT):
+    """
+    Bytes at the front of a freshly accepted connection, read with MSG_PEEK
+    until the first request's headers are complete, so the connection can
+    still be handed on untouched.
+    """
+    loop = asyncio.get_running_loop()
+    readable = loop.create_future()
+    loop.add_reader(sock, lambda: readable.done() or readable.set_result(None))
+    try:
+        await asyncio.wait_for(readable, timeout)
+    finally:
+        loop.remove_reader(sock)
+    deadline = loop.time() + timeout
+    delay = 0.001
+    while True:
+        head = sock.recv(MAX_PEEK_BYTES, socket.MSG_PEEK)
+        # Already-read data keeps the socket readable, so wait out a partial head by polling.
+        if not head or b"\r\n\r\n" in head or len(head) >= MAX_PEEK_BYTES or loop.time() > deadline:
+            return head
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+
+def _http_worker_class():
+    import uvicorn
+
+    class ShardServer(uvicorn.Server):
+        """
+        uvicorn serving connections its router adopts instead of accepting
+        on a listener of its own. The router takes connections from the
+        shared listener and from this worker's inbox; a new connection
+        whose first request names a session of another worker is passed
+        to that worker's inbox (SCM_RIGHTS) before anything is read.
+
+        uvicorn runs through its public serve() with no listening sockets;
+        the one internal it depends on is the protocol factory signature
+        in create_protocol, which is why pyproject.toml bounds uvicorn.
+        """
+
+        def __init__(self, config, index, listener, inboxes, route=True):
+            super().__init__(config)
+            self.index = index
+            self.listener = listener
+            self.inboxes = inboxes
+            self.route = route
+            self.handoffs = set()
+
+        def create_protocol(self):
+            return self.config.http_protocol_class(
+                config=self.config, server_state=self.server_state, app_state=self.lifespan.state
+            )
+
+        async def serve_sharded(self):
+            """serve() with the routers running between startup and the first exit request."""
+            serving = asyncio.create_task(self.serve(sockets=[]))
+            while not self.started and not serving.done():
+                await asyncio.sleep(0.01)
+            if serving.done():
+                return await serving
+            routers = [asyncio.create_task(self.accept()), asyncio.create_task(self.receive())]
+            try:
+                while not self.should_exit and not serving.done():
+                    await asyncio.sleep(0.1)
+            finally:
+                for task in [*routers, *self.handoffs]:
+                    task.cancel()
+                await asyncio.gather(*routers, *self.handoffs, return_exceptions=True)
+            await serving
+
+        async def adopt(self, conn):
+            # asyncio only disables Nagle itself for sockets created with IPPROTO_TCP, and
+            # socket.create_server's are not; without it uvicorn's split header/body writes
+            # stall on delayed ACKs (~40 ms per response).
+            if conn.family in (socket.AF_INET, socket.AF_INET6):
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            loop = asyncio.get_running_loop()
+            await loop.connect_accepted_socket(self.create_protocol, conn)
+
+        async def dispatch(self, conn):
+            try:
+                owner = None
+                if self.route:
+                    session_id = peek_session_id(await peek_request_head(conn))
+                    owner = shard_of(session_id) if session_id else None
+                if owner is not None and owner != self.index and owner < len(self.inboxes):
+                    socket.send_fds(self.inboxes[owner][1], [b"c"], [conn.fileno()])
+                    conn.close()
+                else:
+                    await self.adopt(conn)
+            except Exception:
+                # Whatever went wrong, never leave the client waiting on a connection nobody serves.
+                conn.close()
+            except BaseException:
+                conn.close()
+                raise
+
+        async def accept(self):
+            loop = asyncio.get_running_loop()
+            while True:
+                conn, _ = await loop.sock_accept(self.listener)
+                conn.setblocking(False)
+                task = asyncio.create_task(self.dispatch(conn))
+                self.handoffs.add(task)
+                task.add_done_callback(self.handoffs.discard)
+
+        async def receive(self):
+            loop = asyncio.get_running_loop()
+            inbox = self.inboxes[self.index][0]
+            while True:
+                readable = loop.create_future()
+                loop.add_reader(inbox, lambda: readable.done() or readable.set_result(None))
+                try:
+                    await readable
+                finally:
+                    loop.remove_reader(inbox)
+                try:
+                    _, fds, _, _ = socket.recv_fds(inbox, 1, 1)
+                except BlockingIOError:
+                    continue
+                for fd in fds:
+                    conn = socket.socket(fileno=fd)
+                    conn.setblocking(False)
+                    await self.adopt(conn)
+
+    return ShardServer
+
+
+def serve_http_worker(index, listener, inboxes, keep_alive=75, json_response=False, stateless=False,
+                      metrics_port=None):
+    """Worker body: one event loop serving its share of the HTTP sessions."""
+    import uvicorn
+
+    config = uvicorn.Config(
+        session_affinity(create_http_app(json_response=json_response, stateless=stateless), index),
+        timeout_keep_alive=keep_alive,
+        log_level="warning",
+    )
+    worker = _http_worker_class()(config, index, listener, inboxes, route=not stateless)
+    try:
+        asyncio.run(serve_with_metrics(
+            worker.serve_sharded(), None if metrics_port is None else metrics_port + index
+        ))
+    finally:
+        worker_pool.shutdown()
+
+
+def run_http_workers(workers, host="127.0.0.1", port=8000, **worker_options):
+    """
+    Supervisor for sharded HTTP mode.
+
+    One listening socket is bound here and `workers` processes are forked
+    to accept on it (pre-fork model), each running its own event loop, so
+    sessions spread over as many cores as there are workers. Session ids
+    carry the index of the worker that created them and a worker routes a
+    connection for someone else's session to its owner, keeping every
+    request of a session on one process. A worker that exits is restarted
+    under the same index; the listener and the inboxes outlive it, so
+    queued connections are not lost, but its sessions are and their
+    clients get 404 and re-initialize.
+    """
+    import signal
+
+    if not hasattr(os, "fork"):
+        raise SystemExit("Sharded HTTP workers need os.fork (POSIX only)")
+    listener = socket.create_server((host, port), backlog=2048)
+    listener.setblocking(False)
+    inboxes = []
+    for _ in range(workers):
+        receiving, sending = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiving.setblocking(False)
+        inboxes.append((receiving, sending))
+
+    children = {}
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 1
+            try:
+                serve_http_worker(index, listener, inboxes, **worker_options)
+                code = 0
+            finally:
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+        print(f"HTTP worker {index} started (pid {pid})", file=sys.stderr, flush=True)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    bound_host, bound_port = listener.getsockname()[:2]
+    print(f"{workers} HTTP workers serving http://{bound_host}:{bound_port}/mcp", file=sys.stderr, flush=True)
+    try:
+        for index in range(workers):
+            spawn(index)
+        while True:
+            pid, status = os.wait()
+            if pid not in children:
+                continue
+            index, started = children.pop(pid)
+            print(f"HTTP worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; "
+                  "restarting", file=sys.stderr, flush=True)
+            if time.monotonic() - started < RESTART_BACKOFF:
+                time.sleep(RESTART_BACKOFF)
+            spawn(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        listener.close()
+        for receiving, sending in inboxes:
+            receiving.close()
+            sending.close()
+
+
+# --------------------
+# Entry Point
+# --------------------
+TRANSPORTS = ("stdio", "http")
+
+
+async def run(stdin=None, stdout=None):
+    """Serve a single client over stdin/stdout (or the given async text files)."""
+    from mcp.server.stdio import stdio_server
+
+    async with stdio_server(stdin, stdout) as (read_stream, write_stream):
+        await server.run(read_stream, write_stream, server.create_initialization_options())
+
+
+@contextlib.asynccontextmanager
+async def connect_in_memory(**session_kwargs):
+    """
+    Initialized ClientSession wired to this server through paired in-memory
+    streams. The server runs as a task on the caller's event loop, so there
+    is no subprocess to spawn and no pipe to frame JSON over; session_kwargs
+    go to ClientSession (e.g. message_handler).
+    """
+    import anyio
+    from mcp import ClientSession
+
+    client_write, server_read = anyio.create_memory_object_stream(16)
+    server_write, client_read = anyio.create_memory_object_stream(16)
+    async with client_write, server_read, server_write, client_read:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(server.run, server_read, server_write, server.create_initialization_options())
+            try:
+                async with ClientSession(client_read, client_write, **session_kwargs) as session:
+                    await session.initialize()
+                    yield session
+            finally:
+                tg.cancel_scope.cancel()
+
+
+def create_http_app(json_response=False, stateless=False):
+    """
+    ASGI app serving the Streamable HTTP transport at /mcp.
+    One process handles any number of concurrent client sessions; responses
+    are streamed as SSE unless json_response is set.
+    """
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+
+    session_manager = StreamableHTTPSessionManager(
+        app=server,
+        json_response=json_response,
+        stateless=stateless,
+    )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with session_manager.run():
+            yield
+
+    return Starlette(
+        routes=[Mount("/mcp", app=session_manager.handle_request)],
+        lifespan=lifespan,
+    )
+
+
+async def run_http(host="127.0.0.1", port=8000, keep_alive=75, json_response=False, stateless=False):
+    """Serve many clients over Streamable HTTP with persistent (keep-alive) connections."""
+    import uvicorn
+
+    config = uvicorn.Config(
+        create_http_app(json_response=json_response, stateless=stateless),
+        host=host,
+        port=port,
+        timeout_keep_alive=keep_alive,
+        log_level="warning",
+    )
+    await uvicorn.Server(config).serve()
+
+
+def parse_importtime(report):
+    """`python -X importtime` stderr as a list of (module, self_us, cumulative_us)."""
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def print_startup_profile(top=12):
+    """Re-import this module in a fresh interpreter and report where cold start goes."""
+    import subprocess
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+    modules = parse_importtime(proc.stderr)
+    packages = Counter()
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    total = sum(packages.values())
+    body = next((self_us for name, self_us, _ in modules if name == "server"), None)
+
+    async def first_response():
+        start = time.perf_counter()
+        async with connect_in_memory() as session:
+            initialized = time.perf_counter() - start
+            await session.list_tools()
+            return initialized, time.perf_counter() - start
+
+    initialized, listed = asyncio.run(first_response())
+
+    print("Startup profile: python -X importtime -c 'import server'\n")
+    print(f"  process wall time     {wall * 1e3:9.1f} ms")
+    print(f"  imports (self total)  {total / 1e3:9.1f} ms")
+    if body is not None:
+        print(f"  server module body    {body / 1e3:9.1f} ms")
+    print(f"  initialize (in-proc)  {initialized * 1e3:9.1f} ms")
+    print(f"  + first tools/list    {listed * 1e3:9.1f} ms\n")
+    print(f"  {'package':<28}{'self ms':>10}{'share':>8}")
+    for name, self_us in packages.most_common(top):
+        print(f"  {name:<28}{self_us / 1e3:>10.1f}{self_us / total:>8.0%}")
+    print(f"\n  {'module':<40}{'self ms':>10}{'cumul ms':>10}")
+    for name, self_us, cumulative_us in heapq.nlargest(top, modules, key=lambda m: m[1]):
+        print(f"  {name:<40}{self_us / 1e3:>10.1f}{cumulative_us / 1e3:>10.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="mcp-test-server",
+        description="Comprehensive MCP server for testing MCP scanners",
+    )
+    parser.add_argument(
+        "--transport", choices=TRANSPORTS, default="stdio",
+        help="stdio serves one client per process; http serves many over Streamable HTTP",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=8000, help="HTTP port")
+    parser.add_argument(
+        "--keep-alive", type=int, default=75,
+        help="Seconds an idle HTTP connection is kept open for reuse",
+    )
+    parser.add_argument(
+        "--json-response", action="store_true",
+        help="Answer HTTP requests with plain JSON instead of SSE streams",
+    )
+    parser.add_argument(
+        "--stateless", action="store_true",
+        help="Do not track HTTP sessions; every request is self-contained",
+    )
+    parser.add_argument(
+        "--http-workers", type=int, default=0,
+        help="Serve HTTP from this many supervised worker processes sharing the port (0: this process)",
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=None,
+        help="Page list_tools/list_resources with this many entries per page (default: no paging)",
+    )
+    parser.add_argument(
+        "--synthetic-tools", type=int, default=0,
+        help="Register this many synthetic tools to emulate a large catalog",
+    )
+    parser.add_argument(
+        "--synthetic-resources", type=int, default=0,
+        help="Register this many synthetic resources to emulate a large catalog",
+    )
+    parser.add_argument(
+        "--resource-dir", default=None,
+        help="Serve the files under this directory as mcp://files/ resources",
+    )
+    parser.add_argument(
+        "--resource-page-size", type=int, default=100,
+        help="Files per list_resources page when --resource-dir is set",
+    )
+    parser.add_argument(
+        "--max-read-bytes", type=int, default=1 << 20,
+        help="Largest window returned by one file resource read",
+    )
+    parser.add_argument(
+        "--subscription-debounce-ms", type=float, default=DEFAULT_SUBSCRIPTION_DEBOUNCE * 1000,
+        help="Coalesce resource changes within this window into one resources/updated notification",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=DEFAULT_WATCH_INTERVAL,
+        help="Seconds between change checks of subscribed file resources",
+    )
+    parser.add_argument(
+        "--json-backend", choices=JSON_BACKENDS, default="auto",
+        help="JSON encoder; auto uses orjson when installed and falls back to the stdlib",
+    )
+    parser.add_argument(
+        "--execution", choices=EXECUTION_MODES, default="inline",
+        help="Where CPU-heavy tools (format_json, list_operations, complex_schema) run",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Maximum concurrent jobs in the worker pool",
+    )
+    parser.add_argument(
+        "--max-pending", type=int, default=64,
+        help="Jobs allowed to wait for a worker before new ones are rejected",
+    )
+    parser.add_argument(
+        "--sort-memory-mb", type=int, default=DEFAULT_SORT_MEMORY >> 20,
+        help="Memory a streamed natural/numeric list_operations sort may use for keys before spilling them to temp files",
+    )
+    parser.add_argument(
+        "--result-cache-mb", type=int, default=0,
+        help="Cache results of deterministic tools (add_numbers, format_json, list_operations); 0 disables",
+    )
+    parser.add_argument(
+        "--result-cache-ttl", type=float, default=None,
+        help="Seconds a cached tool result stays valid (default: until evicted)",
+    )
+    parser.add_argument(
+        "--batch-tool", action="store_true",
+        help="Register batch_call, which runs many tool calls in one request",
+    )
+    parser.add_argument(
+        "--image-tool", action="store_true",
+        help="Register generate_image, which returns a PNG test pattern as image content",
+    )
+    parser.add_argument(
+        "--zygote", metavar="SOCKET", nargs="?", const="", default=None,
+        help="Run a pre-forked pool of warmed servers that mcp-test-server-launch hands sessions to "
+             "(default socket: mcp-test-server.sock in $XDG_RUNTIME_DIR or a per-user 0700 directory under /tmp)",
+    )
+    parser.add_argument(
+        "--pool-size", type=int, default=4,
+        help="Warm workers kept ready in zygote mode",
+    )
+    parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="Print an import-time breakdown of cold start and exit",
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve Prometheus text-format metrics at http://127.0.0.1:PORT/metrics",
+    )
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.startup_profile:
+        print_startup_profile()
+        return
+    configure_json_backend(args.json_backend)
+    configure_file_resources(args.resource_dir, args.resource_page_size, args.max_read_bytes)
+    configure_subscriptions(args.subscription_debounce_ms / 1000, args.watch_interval)
+    configure_page_size(args.page_size)
+    populate_synthetic_catalog(args.synthetic_tools, args.synthetic_resources)
+    configure_worker_pool(args.execution, args.workers, args.max_pending)
+    configure_sort_memory(args.sort_memory_mb << 20)
+    configure_batch_tool(args.batch_tool)
+    configure_image_tool(args.image_tool)
+    configure_result_cache(args.result_cache_mb << 20, args.result_cache_ttl)
+    if args.zygote is not None:
+        run_zygote(args.zygote or None, args.pool_size)
+        return
+    if args.transport == "http" and args.http_workers > 0:
+        run_http_workers(
+            args.http_workers,
+            host=args.host,
+            port=args.port,
+            keep_alive=args.keep_alive,
+            json_response=args.json_response,
+            stateless=args.stateless,
+            metrics_port=args.metrics_port,
+        )
+        return
+    try:
+        if args.transport == "http":
+            transport = run_http(
+                host=args.host,
+                port=args.port,
+                keep_alive=args.keep_alive,
+                json_response=args.json_response,
+                stateless=args.stateless,
+            )
+        else:
+            transport = run()
+        asyncio.run(serve_with_metrics(transport, args.metrics_port))
+    finally:
+        worker_pool.shutdown()
 
 
 if __name__ == "__main__":
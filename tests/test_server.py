@@ -3,14 +3,49 @@ Unit tests for MCP Test Server
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
+import base64
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import jsonschema
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import (
+    ListResourcesRequest, ListToolsRequest, ListToolsResult, Prompt, PromptArgument, ResourceUpdatedNotification,
+    TextContent, Tool,
+)
 
+import launcher
+import server
 
-@pytest.fixture
-async def mcp_session():
-    """Fixture to create an MCP session."""
+LIST_TOOLS = ListToolsRequest(method="tools/list")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def scanner():
+    """examples/scanner_test.py, imported as a module."""
+    spec = importlib.util.spec_from_file_location(
+        "scanner_test", os.path.join(ROOT, "examples", "scanner_test.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.asynccontextmanager
+async def stdio_session():
+    """Session against a spawned mcp-test-server process."""
     server_params = StdioServerParameters(
         command="mcp-test-server",
         args=[],
@@ -22,7 +57,31 @@ async def mcp_session():
             yield session
 
 
-@pytest.mark.asyncio
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def mcp_session():
+    """
+    One in-process MCP session shared by the whole run. The session is held
+    open by its own task so the transport's cancel scopes are entered and
+    exited in the same task, whichever tasks run fixture setup and teardown.
+    """
+    ready = asyncio.get_running_loop().create_future()
+    release = asyncio.Event()
+
+    async def hold():
+        async with server.connect_in_memory() as session:
+            ready.set_result(session)
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.wait({ready, holder}, return_when=asyncio.FIRST_COMPLETED)
+    if not ready.done():
+        holder.result()
+    yield ready.result()
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_tool_discovery(mcp_session):
     """Test that all expected tools are discovered."""
     response = await mcp_session.list_tools()
@@ -36,7 +95,7 @@ async def test_tool_discovery(mcp_session):
     assert tool_names == expected_tools
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_echo_tool(mcp_session):
     """Test the echo tool."""
     result = await mcp_session.call_tool("echo", {"message": "test"})
@@ -44,7 +103,7 @@ async def test_echo_tool(mcp_session):
     assert "test" in result.content[0].text
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_add_numbers_tool(mcp_session):
     """Test the add_numbers tool."""
     result = await mcp_session.call_tool("add_numbers", {"a": 5, "b": 3})
@@ -52,11 +111,11 @@ async def test_add_numbers_tool(mcp_session):
     assert "8" in result.content[0].text
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_resource_discovery(mcp_session):
     """Test that all expected resources are discovered."""
     response = await mcp_session.list_resources()
-    resource_uris = {resource.uri for resource in response.resources}
+    resource_uris = {str(resource.uri) for resource in response.resources}
     
     expected_resources = {
         "mcp://test/static-text",
@@ -68,7 +127,7 @@ async def test_resource_discovery(mcp_session):
     assert resource_uris == expected_resources
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_resource_reading(mcp_session):
     """Test reading a resource."""
     result = await mcp_session.read_resource("mcp://test/static-text")
@@ -76,7 +135,7 @@ async def test_resource_reading(mcp_session):
     assert len(result.contents[0].text) > 0
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_prompt_discovery(mcp_session):
     """Test that all expected prompts are discovered."""
     response = await mcp_session.list_prompts()
@@ -87,5 +146,906 @@ async def test_prompt_discovery(mcp_session):
     assert prompt_names == expected_prompts
 
 
+@pytest.mark.asyncio
+async def test_registry_drives_list_tools():
+    """list_tools is built from the same registry call_tool dispatches on."""
+    tools = (await server.list_tools(LIST_TOOLS)).tools
+    assert [tool.name for tool in tools] == [tool.name for tool in server.registry.tools()]
+    assert all(tool.name in server.registry for tool in tools)
+
+
+@pytest.mark.asyncio
+async def test_registry_register_and_unknown_tool():
+    """Registered tools dispatch by name; unknown names raise ValueError."""
+    registry = server.ToolRegistry()
+
+    async def handler(arguments):
+        return [TextContent(type="text", text=arguments["value"])]
+
+    registry.register(
+        Tool(name="probe", description="probe", inputSchema={"type": "object"}),
+        handler,
+    )
+    result = await registry.dispatch("probe", {"value": "hit"})
+    assert result[0].text == "hit"
+
+    registry.unregister("probe")
+    with pytest.raises(ValueError, match="Unknown tool: probe"):
+        await registry.dispatch("probe", {})
+
+
+@pytest.mark.asyncio
+async def test_invalid_arguments_rejected_before_dispatch():
+    """Bad input returns a structured error instead of a handler KeyError."""
+    result = await server.call_tool("add_numbers", {"a": "five"})
+    assert result.isError
+    errors = result.structuredContent["errors"]
+    assert {error["validator"] for error in errors} == {"type", "required"}
+    assert {error["path"] for error in errors} == {"/", "/a"}
+
+
+def test_string_array_fast_path_keeps_element_errors():
+    """Long all-string arrays skip per-element validation; any other element is still reported by index."""
+    server.registry.validate("list_operations", {"items": ["x"] * 100000, "operation": "count"})
+    server.registry.validate("list_operations", {"items": [], "operation": "count"})
+    with pytest.raises(server.ToolInputError) as excinfo:
+        server.registry.validate("list_operations", {"items": ["a", 3, "b", None, True], "operation": "count"})
+    assert [error["path"] for error in excinfo.value.errors] == ["/items/1", "/items/3", "/items/4"]
+
+
+def test_invalid_schema_rejected_at_registration():
+    """Schemas are compiled when the tool is registered."""
+    registry = server.ToolRegistry()
+
+    async def handler(arguments):
+        return []
+
+    with pytest.raises(jsonschema.SchemaError):
+        registry.register(
+            Tool(name="broken", description="broken", inputSchema={"type": 12}),
+            handler,
+        )
+    assert "broken" not in registry
+
+
+@pytest.mark.asyncio
+async def test_discovery_results_memoized_until_catalog_changes():
+    """list_* results are reused until a change bumps the version stamp."""
+    first = await server.list_tools(LIST_TOOLS)
+    assert await server.list_tools(LIST_TOOLS) is first
+    version = first.meta["version"]
+
+    async def handler(arguments):
+        return []
+
+    server.registry.register(
+        Tool(name="transient", description="transient", inputSchema={"type": "object"}),
+        handler,
+    )
+    try:
+        changed = await server.list_tools(LIST_TOOLS)
+        assert changed is not first
+        assert changed.meta["version"] > version
+        assert "transient" in {tool.name for tool in changed.tools}
+    finally:
+        server.registry.unregister("transient")
+
+    assert (await server.list_tools(LIST_TOOLS)).meta["version"] > changed.meta["version"]
+
+
+@pytest.mark.asyncio
+async def test_thread_execution_matches_inline():
+    """Offloaded CPU-heavy tools return the same text as inline execution."""
+    arguments = {"items": ["zebra", "apple", "mango"], "operation": "sort"}
+    inline = await server.call_tool("list_operations", arguments)
+    server.configure_worker_pool("thread", max_workers=2)
+    try:
+        offloaded = await server.call_tool("list_operations", arguments)
+    finally:
+        server.configure_worker_pool("inline")
+    assert offloaded[0].text == inline[0].text
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_rejects_when_saturated():
+    """Jobs beyond max_workers + max_pending are rejected, not queued."""
+    pool = server.WorkerPool("thread", max_workers=1, max_pending=0)
+    try:
+        running = asyncio.create_task(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(server.PoolSaturatedError):
+            await pool.run(time.sleep, 0)
+        await running
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_format_json_streaming_chunks():
+    """Streamed chunks are bounded and reassemble to the buffered output."""
+    data = {"records": [{"id": i, "name": f"item-{i}"} for i in range(200)]}
+    buffered = await server.call_tool("format_json", {"data": data})
+    streamed = await server.call_tool(
+        "format_json", {"data": data, "stream": True, "chunk_size": server.MIN_CHUNK_SIZE}
+    )
+    assert len(streamed) > 1
+    assert all(len(block.text) <= server.MIN_CHUNK_SIZE for block in streamed)
+    assert "".join(block.text for block in streamed) == buffered[0].text
+
+    for tool, arguments in (("format_json", {"data": data}), ("list_operations", {"items": [], "operation": "sort"})):
+        result = await server.call_tool(tool, {**arguments, "stream": True, "chunk_size": 1})
+        assert result.isError and result.structuredContent["errors"][0]["validator"] == "minimum"
+
+
+@pytest.mark.parametrize("payload", [
+    {"records": [{"id": 1, "score": 0.5, "tags": [], "meta": {}}]},
+    {"text": "caf\u00e9 \x7f", "tiny": 1e-05, "huge": 1e16},
+    {"nan": float("nan"), "none": None},
+    {1: "int key", "big": 2 ** 70},
+])
+@pytest.mark.parametrize("indent", [2, 4, None])
+def test_json_backends_byte_identical(payload, indent):
+    """Every backend produces exactly what json.dumps does."""
+    expected = json.dumps(payload, indent=indent)
+    assert server.StdlibJsonBackend().dumps(payload, indent) == expected
+    if server.orjson is not None:
+        assert server.OrjsonJsonBackend().dumps(payload, indent) == expected
+
+
+@pytest.mark.asyncio
+async def test_static_resource_etag_revalidation():
+    """Static reads carry an etag; presenting it returns a notModified reply."""
+    contents = await server.read_resource("mcp://test/json-data")
+    etag = contents[0].meta["etag"]
+    assert json.loads(contents[0].content)["server"] == "mcp-test-server"
+    assert contents[0].mime_type == "application/json"
+
+    unchanged = server.static_resources.read("mcp://test/json-data", etag)
+    assert unchanged[0].content == ""
+    assert unchanged[0].meta == {"etag": etag, "notModified": True}
+    assert server.static_resources.read("mcp://test/json-data", "stale") is contents
+
+
+def test_file_resources_ranges(tmp_path):
+    """Byte and line ranges read only the window and point at the next one."""
+    (tmp_path / "app.log").write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    provider = server.FileResourceProvider(tmp_path, max_read_bytes=32)
+
+    first = provider.read("mcp://files/app.log?bytes=0-")[0]
+    assert first.content == "line 1\nline 2\nline 3\nline 4\nline"
+    assert first.meta["next"] == "mcp://files/app.log?bytes=32-"
+
+    lines = provider.read("mcp://files/app.log?lines=10-12")[0]
+    assert lines.content == "line 10\nline 11\nline 12\n"
+    assert lines.meta["lines"] == 100
+
+    capped = provider.read("mcp://files/app.log?lines=50-60")[0]
+    assert capped.content == "line 50\nline 51\nline 52\nline 53\n"
+    assert capped.meta["next"] == "mcp://files/app.log?lines=54-60"
+
+    with pytest.raises(ValueError):
+        provider.read("mcp://files/../outside.txt")
+
+
+def test_file_resources_cap_overlong_lines(tmp_path):
+    """A line longer than max_read_bytes is served up to the cap, with the rest reachable by bytes."""
+    (tmp_path / "wide.log").write_text("short\n" + "x" * 100 + "\nafter\n")
+    provider = server.FileResourceProvider(tmp_path, max_read_bytes=32)
+    head = provider.read("mcp://files/wide.log?lines=2-3")[0]
+    assert head.content == "x" * 32
+    assert head.meta["range"] == "lines=2-2" and head.meta["next"] == "mcp://files/wide.log?lines=3-3"
+    rest = provider.read(head.meta["line_rest"])[0]
+    assert head.meta["line_rest"] == "mcp://files/wide.log?bytes=38-106"
+    assert rest.content == "x" * 32 and rest.meta["next"] == "mcp://files/wide.log?bytes=70-106"
+
+
+def test_file_listing_reuses_sorted_directories(tmp_path, monkeypatch):
+    """Paging re-scans a directory only after its mtime changes, and resumes from the cursor."""
+    for i in range(30):
+        (tmp_path / f"f{i:02d}.txt").write_text("x")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "inner.txt").write_text("x")
+    provider = server.FileResourceProvider(tmp_path, page_size=7)
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(server.os, "scandir", lambda path: scans.append(path) or scandir(path))
+
+    def list_all():
+        names, cursor = [], None
+        while True:
+            resources, cursor = provider.list_page(cursor)
+            names += [resource.name for resource in resources]
+            if cursor is None:
+                return names
+
+    expected = [f"f{i:02d}.txt" for i in range(30)] + ["sub/inner.txt"]
+    assert list_all() == expected
+    assert sorted(scans) == sorted([provider.root, os.path.join(provider.root, "sub")])
+    assert list_all() == expected and len(scans) == 2
+
+    (tmp_path / "f30.txt").write_text("x")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1))
+    assert list_all() == expected[:30] + ["f30.txt", "sub/inner.txt"]
+    assert len(scans) == 3
+
+
+@pytest.mark.asyncio
+async def test_file_resources_cursor_pagination(tmp_path):
+    """list_resources pages through files after the built-in resources."""
+    for name in ["a/one.txt", "a/two.txt", "b/three.txt", "four.txt", "five.txt"]:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(name)
+    server.configure_file_resources(tmp_path, page_size=2)
+    try:
+        request = ListResourcesRequest(method="resources/list")
+        page = await server.list_resources(request)
+        names = [resource.name for resource in page.resources]
+        versions = [page.meta["version"]]
+        while page.nextCursor:
+            request = ListResourcesRequest(
+                method="resources/list", params={"cursor": page.nextCursor}
+            )
+            page = await server.list_resources(request)
+            names += [resource.name for resource in page.resources]
+            versions.append(page.meta["version"])
+    finally:
+        server.configure_file_resources(None)
+
+    assert names[:4] == [resource.name for resource in server.resource_catalog.items()]
+    assert names[4:] == ["a/one.txt", "a/two.txt", "b/three.txt", "five.txt", "four.txt"]
+    assert versions == [server.resource_catalog.version] * 3
+
+
+def test_catalog_cursor_pagination():
+    """Pages resume from the cursor's position and cover every entry once."""
+    catalog = server.Catalog(ListToolsResult, "tools", page_size=4)
+    for i in range(10):
+        catalog.add(f"tool_{i}", Tool(name=f"tool_{i}", inputSchema={"type": "object"}))
+
+    names, cursor = [], None
+    while True:
+        page = catalog.page(cursor)
+        names += [tool.name for tool in page.tools]
+        cursor = page.nextCursor
+        if cursor is None:
+            break
+    assert names == [f"tool_{i}" for i in range(10)]
+    assert catalog.page(catalog.encode_cursor("tool_3")) is catalog.page(catalog.encode_cursor("tool_3"))
+
+    catalog.remove("tool_3")
+    with pytest.raises(ValueError, match="Stale cursor"):
+        catalog.page(catalog.encode_cursor("tool_3"))
+
+
+def test_catalog_removal_keeps_pages_consistent():
+    """Removed keys leave tombstones that pages skip until the key list is compacted."""
+    catalog = server.Catalog(ListToolsResult, "tools", page_size=3)
+    for i in range(12):
+        catalog.add(f"tool_{i}", Tool(name=f"tool_{i}", inputSchema={"type": "object"}))
+    expected = [f"tool_{i}" for i in range(12)]
+    for removed in ("tool_1", "tool_2", "tool_3", "tool_5", "tool_11", "tool_8", "tool_0"):
+        catalog.remove(removed)
+        expected.remove(removed)
+        names, cursor = [], None
+        while True:
+            page = catalog.page(cursor)
+            names += [tool.name for tool in page.tools]
+            cursor = page.nextCursor
+            if cursor is None:
+                break
+        assert names == expected
+        assert [tool.name for tool in catalog.result().tools] == expected
+    assert len(catalog._keys) < 12
+    catalog.add("tool_1", Tool(name="tool_1", inputSchema={"type": "object"}))
+    assert [tool.name for tool in catalog.result().tools][-1] == "tool_1"
+
+
+@pytest.mark.asyncio
+async def test_paged_tools_callable_past_first_page(caplog):
+    """Calling a tool listed on a later page finds its definition without a 'not listed' warning."""
+    server.populate_synthetic_catalog(tools=250)
+    server.configure_page_size(100)
+    try:
+        async with server.connect_in_memory() as session:
+            first = await session.list_tools()
+            assert len(first.tools) == 100 and first.nextCursor
+            with caplog.at_level("WARNING"):
+                result = await session.call_tool("synthetic_000240", {"message": "late"})
+        assert result.content[0].text == "SYNTHETIC: late"
+        # The client warns on its own (it only listed page 1); the server must not.
+        assert not [r for r in caplog.records if r.name.startswith("mcp.server") and "not listed" in r.getMessage()]
+    finally:
+        server.configure_page_size(None)
+        for i in range(250):
+            server.registry.unregister(f"synthetic_{i:06d}")
+
+
+@pytest.mark.asyncio
+async def test_get_prompt_returns_prompt_result():
+    """get_prompt answers with a GetPromptResult the SDK can send."""
+    result = await server.get_prompt("test-prompt", {"topic": "scanners"})
+    assert result.messages[0].content.text == "Please provide information about: scanners"
+
+
+def test_prompt_registry_validates_and_caches():
+    """Arguments are checked against the declared PromptArguments; only small renders are cached."""
+    prompts = server.PromptRegistry()
+    prompts.register(
+        Prompt(name="p", arguments=[
+            PromptArgument(name="code", required=True),
+            PromptArgument(name="language", required=False),
+        ]),
+        "{language}: {code}",
+        defaults={"language": "unknown"},
+    )
+    first = prompts.render("p", {"code": "x = 1"})
+    assert first.messages[0].content.text == "unknown: x = 1"
+    assert prompts.render("p", {"code": "x = 1"}) is first
+    for arguments, problem in [({}, "missing required code"), ({"code": "x", "extra": "1"}, "unknown extra")]:
+        with pytest.raises(server.PromptArgumentError, match=problem):
+            prompts.render("p", arguments)
+
+    code = "y" * (server.PROMPT_CACHE_MAX_CHARS + 1)
+    large = prompts.render("p", {"code": code, "language": "python"})
+    assert large.messages[0].content.text == f"python: {code}"
+    assert prompts.render("p", {"code": code, "language": "python"}) is not large
+
+    with pytest.raises(ValueError, match="Invalid placeholder"):
+        prompts.register(Prompt(name="q", arguments=[]), "{undeclared}")
+
+
+@pytest.mark.asyncio
+async def test_stdio_transport_smoke():
+    """The installed mcp-test-server still serves a full session over stdio."""
+    async with stdio_session() as session:
+        response = await session.list_tools()
+        assert "echo" in {tool.name for tool in response.tools}
+        result = await session.call_tool("echo", {"message": "test"})
+        assert "test" in result.content[0].text
+
+
+@pytest.mark.asyncio
+async def test_metrics_histograms_and_exports():
+    """Calls and errors land in per-tool histograms, the metrics resource and Prometheus text."""
+    before = server.metrics.get("tool", "add_numbers")
+    count, errors = (before.count, before.errors) if before else (0, 0)
+    await server.call_tool("add_numbers", {"a": 1, "b": 2})
+    await server.call_tool("add_numbers", {"a": "x"})
+
+    histogram = server.metrics.get("tool", "add_numbers")
+    assert (histogram.count, histogram.errors) == (count + 2, errors + 1)
+    assert sum(histogram.counts) == histogram.count
+
+    snapshot = json.loads((await server.read_resource(server.METRICS_URI))[0].content)
+    assert snapshot["tools"]["add_numbers"]["count"] == histogram.count
+    assert server.metrics.get("resource", server.METRICS_URI).count >= 1
+
+    text = server.metrics.prometheus()
+    assert f'mcp_tool_call_duration_seconds_count{{tool="add_numbers"}} {histogram.count}' in text
+    assert f'mcp_tool_call_errors_total{{tool="add_numbers"}} {histogram.errors}' in text
+    assert f'mcp_tool_call_duration_seconds_bucket{{tool="add_numbers",le="+Inf"}} {histogram.count}' in text
+
+    capped = server.Metrics(max_series=2)
+    for name in ("a", "b", "c", "d"):
+        capped.observe("tool", name, 0.001)
+    assert capped.get("tool", "c") is None
+    assert capped.get("tool", server.OVERFLOW_SERIES).count == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_prometheus_text():
+    """GET /metrics on the local endpoint returns the Prometheus exposition."""
+    endpoint = await asyncio.start_server(server.handle_metrics_request, "127.0.0.1", 0)
+    port = endpoint.sockets[0].getsockname()[1]
+    async with endpoint:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.0 200")
+    assert b"# TYPE mcp_tool_call_duration_seconds histogram" in body
+
+
+def test_list_selection_operations_match_sort_then_slice():
+    """Heap/hash list operations agree with sorting and are bounded by k."""
+    items = [f"item-{i % 37:02d}" for i in range(1000)] + ["zz", "aa"]
+    render = server.render_list_operation
+    assert render(items, "top_k", ", ", 5) == f"Top 5: {sorted(items, reverse=True)[:5]}"
+    assert render(items, "bottom_k", ", ", 5) == f"Bottom 5: {sorted(items)[:5]}"
+    assert render(items, "distinct_count", ", ") == "Distinct count: 39"
+    assert render(items, "distinct", ", ", 3) == "Distinct (39 total, first 3): ['item-00', 'item-01', 'item-02']"
+    assert render(items, "frequency", ", ", 2) == "Frequency (39 distinct, top 2): {'item-00': 28, 'item-01': 27}"
+    with pytest.raises(server.ToolInputError):
+        server.registry.validate("list_operations", {"items": items, "operation": "top_k", "k": 0})
+
+
+def test_external_sort_spills_and_matches_sorted():
+    """Spilled runs merge back into exactly sorted(items, key=...) order for every sort key."""
+    items = [f"file{i * 7919 % 1000}{suffix}" for i in range(3000) for suffix in ("", ".5")]
+    items += ["10", "9", "-1.5", "nan", "x"]
+    for name, key in server.SORT_KEY_FUNCTIONS.items():
+        assert list(server.external_sort(items, key, memory_budget=20000)) == sorted(items, key=key)
+    assert list(server.external_sort(["file10", "file9", "file1"], server.natural_key)) == ["file1", "file9", "file10"]
+    assert list(server.external_sort(["10", "x", "9", "-1.5"], server.numeric_key)) == ["-1.5", "9", "10", "x"]
+
+
+@pytest.mark.asyncio
+async def test_list_sort_streaming_matches_full_text():
+    """Streamed sort chunks concatenate to the non-streamed text, spilling past the memory budget."""
+    items = [f"item{i * 31 % 500}" for i in range(2000)]
+    full = await server.call_tool("list_operations", {"items": items, "operation": "sort", "sort_key": "natural"})
+    server.configure_sort_memory(10000)
+    try:
+        chunks = await server.call_tool(
+            "list_operations",
+            {"items": items, "operation": "sort", "sort_key": "natural", "stream": True, "chunk_size": 1024},
+        )
+    finally:
+        server.configure_sort_memory(server.DEFAULT_SORT_MEMORY)
+    assert all(len(chunk.text) <= 1024 for chunk in chunks)
+    assert "".join(chunk.text for chunk in chunks) == full[0].text
+    assert full[0].text == f"Sorted: {sorted(items, key=server.natural_key)}"
+
+
+@pytest.mark.asyncio
+async def test_batch_call_ordered_results_and_entry_errors():
+    """batch_call is opt-in, keeps request order and reports failures per entry."""
+    assert "batch_call" not in server.registry
+    server.configure_batch_tool(True)
+    try:
+        calls = [{"name": "echo", "arguments": {"message": f"m{i}"}} for i in range(50)]
+        calls[7] = {"name": "missing-tool"}
+        calls[9] = {"name": "add_numbers", "arguments": {"a": 1}}
+        result = await server.call_tool("batch_call", {"calls": calls})
+    finally:
+        server.configure_batch_tool(False)
+
+    results = result.structuredContent["results"]
+    assert not result.isError and result.structuredContent["errors"] == 2
+    assert [entry["name"] for entry in results] == [call["name"] for call in calls]
+    assert results[0]["content"][0]["text"] == "ECHO: m0"
+    assert results[7]["isError"] and "Unknown tool" in results[7]["content"][0]["text"]
+    assert results[9]["structuredContent"]["error"] == "invalid_arguments"
+    assert not results[49]["isError"] and results[49]["content"][0]["text"] == "ECHO: m49"
+    assert json.loads(result.content[0].text) == result.structuredContent
+
+
+@pytest.mark.asyncio
+async def test_result_cache_hits_evicts_and_skips_non_cacheable():
+    """Deterministic tools are cached by canonical arguments; clock-driven tools never are."""
+    cache = server.configure_result_cache(max_bytes=4096, ttl=None)
+    try:
+        first = await server.call_tool("format_json", {"data": {"b": 1, "a": 2}, "indent": 2})
+        again = await server.call_tool("format_json", {"indent": 2, "data": {"a": 2, "b": 1}})
+        assert again is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        await server.call_tool("timestamp", {"format": "unix"})
+        await server.call_tool("complex_schema", {"user": {"name": "n"}})
+        assert len(cache) == 1
+
+        for i in range(200):
+            await server.call_tool("add_numbers", {"a": i, "b": 1})
+        assert cache.evictions > 0 and cache.size <= cache.max_bytes
+
+        snapshot = json.loads((await server.read_resource(server.METRICS_URI))[0].content)
+        assert snapshot["result_cache"]["hits"] == cache.hits
+    finally:
+        server.configure_result_cache(None)
+
+
+@pytest.mark.asyncio
+async def test_result_cache_counts_image_data():
+    """Image results are sized by their base64 data, so the byte cap holds."""
+    cache = server.configure_result_cache(max_bytes=100_000, ttl=None)
+    server.configure_image_tool(True)
+    try:
+        result = await server.call_tool("generate_image", {"width": 64, "height": 64})
+        assert cache.size == len(result[0].data) + 64
+        for side in range(100, 400, 20):
+            await server.call_tool("generate_image", {"width": side, "height": side})
+        assert cache.size <= cache.max_bytes
+        assert sum(len(entry[0][0].data) for entry in cache._entries.values()) <= cache.max_bytes
+    finally:
+        server.configure_image_tool(False)
+        server.configure_result_cache(None)
+
+
+def test_result_cache_ttl_expires(monkeypatch):
+    """Entries past their TTL count as misses and are dropped."""
+    cache = server.ResultCache(max_bytes=1024, ttl=5)
+    now = [100.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    key = cache.key("add_numbers", {"a": 1, "b": 2})
+    cache.put(key, [TextContent(type="text", text="Result: 1 + 2 = 3")])
+    assert cache.get(key) is not None
+    now[0] += 6
+    assert cache.get(key) is None and len(cache) == 0 and cache.size == 0
+
+
+def test_decorated_tools_compile_schemas_lazily():
+    """@registry.tool defers schema checks to first validation; every built-in schema is valid."""
+    registry = server.ToolRegistry()
+
+    @registry.tool(name="lazy", description="lazy", input_schema={"type": 12})
+    async def handler(arguments):
+        return []
+
+    assert "lazy" in registry
+    with pytest.raises(jsonschema.SchemaError):
+        registry.validate("lazy", {})
+    for tool in server.registry.tools():
+        server.compile_validator(tool.inputSchema)
+
+
+def test_startup_profile_parses_importtime():
+    """--startup-profile reads `python -X importtime` output."""
+    report = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     mcp.types\n"
+        "import time:      3100 |     710000 | server\n"
+    )
+    assert server.parse_importtime(report) == [("mcp.types", 120, 120), ("server", 3100, 710000)]
+    assert server.parse_args(["--startup-profile"]).startup_profile
+
+
+@pytest.mark.asyncio
+async def test_resource_subscriptions_notify_on_content_change():
+    """A burst of writes yields one resources/updated; identical content and unsubscribed URIs yield none."""
+    uri = "mcp://test/config"
+    original = server.static_resources.get(uri).text
+    updates = []
+
+    async def on_message(message):
+        if isinstance(getattr(message, "root", None), ResourceUpdatedNotification):
+            updates.append(str(message.root.params.uri))
+
+    server.configure_subscriptions(debounce=0.01)
+    try:
+        async with server.connect_in_memory(message_handler=on_message) as session:
+            assert session.get_server_capabilities().resources.subscribe
+            await session.subscribe_resource(uri)
+            for version in range(5):
+                server.update_resource(uri, json.dumps({"version": version}))
+            await asyncio.sleep(0.1)
+            assert updates == [uri]
+
+            server.update_resource(uri, json.dumps({"version": 4}))
+            await asyncio.sleep(0.1)
+            assert updates == [uri]
+
+            await session.unsubscribe_resource(uri)
+            server.update_resource(uri, original)
+            await asyncio.sleep(0.1)
+            assert updates == [uri] and server.subscriptions.subscribers(uri) == 0
+    finally:
+        server.update_resource(uri, original)
+        server.configure_subscriptions()
+
+
+@pytest.mark.asyncio
+async def test_file_subscriptions_hash_off_loop_and_report_deletion(tmp_path, monkeypatch):
+    """File resources are hashed in a thread; deleting and restoring a watched file each notify."""
+    path = tmp_path / "watched.txt"
+    path.write_text("one")
+    uri = "mcp://files/watched.txt"
+    loop_thread = threading.get_ident()
+    hash_threads = []
+    resource_hash = server.resource_hash
+
+    def recording_hash(uri):
+        hash_threads.append(threading.get_ident())
+        return resource_hash(uri)
+
+    monkeypatch.setattr(server, "resource_hash", recording_hash)
+    updates = []
+
+    async def on_message(message):
+        if isinstance(getattr(message, "root", None), ResourceUpdatedNotification):
+            updates.append(str(message.root.params.uri))
+
+    async def wait_for(count):
+        deadline = time.monotonic() + 5
+        while len(updates) < count and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        assert len(updates) == count
+
+    server.configure_file_resources(tmp_path)
+    server.configure_subscriptions(debounce=0.01, watch_interval=0.02)
+    try:
+        async with server.connect_in_memory(message_handler=on_message) as session:
+            await session.subscribe_resource(uri)
+            path.write_text("two!")
+            await wait_for(1)
+            path.unlink()
+            await wait_for(2)
+            path.write_text("three")
+            await wait_for(3)
+            await session.unsubscribe_resource(uri)
+    finally:
+        server.configure_subscriptions()
+        server.configure_file_resources(None)
+    assert hash_threads and loop_thread not in hash_threads
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 1000, (3 << 16) + 1])
+def test_encode_base64_matches_stdlib(size):
+    data = os.urandom(size)
+    assert server.encode_base64(memoryview(data)) == base64.b64encode(data).decode()
+
+
+@pytest.mark.asyncio
+async def test_binary_file_resources_and_image_tool(tmp_path):
+    """Binary files page as blob contents; the opt-in image tool returns a PNG."""
+    data = os.urandom(2500)
+    (tmp_path / "model.bin").write_bytes(data)
+    server.configure_file_resources(tmp_path, max_read_bytes=1024)
+    server.configure_image_tool(True)
+    try:
+        async with server.connect_in_memory() as session:
+            uri, received = "mcp://files/model.bin", b""
+            while uri:
+                contents = (await session.read_resource(uri)).contents[0]
+                assert contents.mimeType == "application/octet-stream"
+                received += base64.b64decode(contents.blob)
+                uri = contents.meta.get("next")
+            assert received == data
+
+            result = await session.call_tool("generate_image", {"width": 3, "height": 2})
+            image = result.content[0]
+            assert image.type == "image" and image.mimeType == "image/png"
+            assert base64.b64decode(image.data).startswith(b"\x89PNG\r\n\x1a\n")
+    finally:
+        server.configure_image_tool(False)
+        server.configure_file_resources(None)
+    assert "generate_image" not in server.registry
+
+
+def test_scanner_loads_server_configs(tmp_path, scanner):
+    """mcp.json, mcp.yaml and .mcp/config.json all resolve args against the project directory."""
+    (tmp_path / ".mcp").mkdir()
+    (tmp_path / "mcp.json").write_text(json.dumps({
+        "mcpServers": {"py": {"command": "python", "args": ["server.py", 8], "env": {"DEBUG": 1}}}
+    }))
+    (tmp_path / "mcp.yaml").write_text("servers:\n  bin:\n    command: mcp-test-server\n")
+    (tmp_path / ".mcp" / "config.json").write_text(json.dumps({"servers": {"py": {"command": "python"}}}))
+    paths = [str(tmp_path / name) for name in ("mcp.json", "mcp.yaml", ".mcp/config.json")]
+
+    configs = scanner.load_server_configs(paths)
+    assert [config["id"] for config in configs] == [
+        f"{paths[0]}:py", f"{paths[1]}:bin", f"{paths[2]}:py",
+    ]
+    first, second, third = (config["params"] for config in configs)
+    assert (first.command, first.args, first.env) == ("python", ["server.py", "8"], {"DEBUG": "1"})
+    assert (second.command, second.args, second.env) == ("mcp-test-server", [], None)
+    assert {first.cwd, second.cwd, third.cwd} == {str(tmp_path)}
+
+
+def test_scanner_skips_yaml_configs_without_pyyaml(tmp_path, scanner, monkeypatch, capsys):
+    (tmp_path / "mcp.yaml").write_text("servers:\n  bin:\n    command: mcp-test-server\n")
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    assert scanner.load_server_configs([str(tmp_path / "mcp.yaml")]) == []
+    assert "needs PyYAML" in capsys.readouterr().out
+
+
+def test_scanner_fuzz_generator_matches_tool_schemas(scanner):
+    """Seeded instances for every tool validate against its inputSchema and cover the schema's branches."""
+    rng = random.Random(1234)
+    for tool in server.registry.tools():
+        generate = scanner.compile_generator(tool.inputSchema)
+        validator = jsonschema.Draft202012Validator(tool.inputSchema)
+        instances = [generate(rng) for _ in range(300)]
+        for instance in instances:
+            validator.validate(instance)
+        for name in tool.inputSchema.get("properties", {}):
+            present = sum(name in instance for instance in instances)
+            if name in tool.inputSchema.get("required", []):
+                assert present == len(instances), (tool.name, name)
+            else:
+                assert 0 < present < len(instances), (tool.name, name)
+        if tool.name == "complex_schema":
+            users = [instance["user"] for instance in instances]
+            assert all("name" in user for user in users)
+            assert any(key.startswith("x_") for user in users for key in user.get("metadata", {}))
+            assert not any(key.startswith("x_") for user in users for key in user)
+            formats = {instance["options"]["format"] for instance in instances
+                       if "format" in instance.get("options", {})}
+            assert formats == {"json", "yaml", "xml"}
+        if tool.name == "timestamp":
+            assert {instance["format"] for instance in instances if "format" in instance} == {"iso", "unix", "readable"}
+
+
+@pytest.mark.asyncio
+async def test_scanner_fuzzer_pages_through_tools(tmp_path, scanner):
+    """The fuzzer builds a generator for every tool across all pages of tools/list."""
+    fuzzer = scanner.ScannerFuzzer(sessions=1, duration=0.1, in_process=True, output=str(tmp_path / "fuzz.json"))
+    server.configure_page_size(2)
+    try:
+        await fuzzer.run_benchmark()
+    finally:
+        server.configure_page_size(None)
+    assert set(fuzzer.generators) == {tool.name for tool in server.registry.tools()}
+
+
+def test_launcher_default_socket_is_per_user(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert launcher.default_socket() == str(tmp_path / "mcp-test-server.sock")
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    directory = os.path.dirname(launcher.default_socket())
+    assert directory == str(tmp_path / f"mcp-test-server-{os.getuid()}")
+
+    assert launcher.private_directory(directory) == directory
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    os.chmod(directory, 0o755)
+    with pytest.raises(PermissionError):
+        launcher.private_directory(directory)
+
+
+@pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="requires SCM_RIGHTS fd passing")
+@pytest.mark.asyncio
+async def test_zygote_handoff(tmp_path):
+    """launcher.py hands its stdio to a pre-forked zygote worker on the default socket, once per session."""
+    env = {key: value for key, value in os.environ.items() if key != "XDG_RUNTIME_DIR"}
+    env["TMPDIR"] = str(tmp_path)
+    socket_path = str(tmp_path / f"mcp-test-server-{os.getuid()}" / "mcp-test-server.sock")
+    zygote = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server.py"), "--zygote", "--pool-size", "2"],
+        env=env, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not os.path.exists(socket_path):
+            assert time.monotonic() < deadline and zygote.poll() is None
+            await asyncio.sleep(0.05)
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+        assert os.stat(os.path.dirname(socket_path)).st_mode & 0o777 == 0o700
+        params = StdioServerParameters(
+            command=sys.executable, args=[os.path.join(ROOT, "launcher.py"), "--debug"], env=env
+        )
+        with open(tmp_path / "launcher.err", "w+") as errlog:
+            for message in ("first", "second", "third"):
+                async with stdio_client(params, errlog=errlog) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+                        result = await session.call_tool("echo", {"message": message})
+                        assert result.content[0].text == f"ECHO: {message}"
+        assert "ignoring --debug" in (tmp_path / "launcher.err").read_text()
+    finally:
+        zygote.terminate()
+        zygote.wait(timeout=10)
+    assert not os.path.exists(socket_path)
+
+
+@pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="requires SCM_RIGHTS fd passing")
+def test_zygote_backs_off_failing_workers(tmp_path):
+    """Workers that fail right after starting are replaced once per RESTART_BACKOFF, not in a fork loop."""
+    socket_path = str(tmp_path / "zygote.sock")
+    with open(tmp_path / "zygote.err", "w") as errlog:
+        zygote = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server.py"), "--zygote", socket_path, "--pool-size", "1"],
+            stderr=errlog,
+        )
+    try:
+        deadline = time.monotonic() + 30
+        while not os.path.exists(socket_path):
+            assert time.monotonic() < deadline and zygote.poll() is None
+            time.sleep(0.05)
+        for _ in range(3):
+            # A handshake without descriptors makes the worker fail at once.
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                sock.sendall(b"S")
+        time.sleep(server.RESTART_BACKOFF / 2)
+        assert (tmp_path / "zygote.err").read_text().count("restarting in") == 1
+        time.sleep(server.RESTART_BACKOFF * 2.5)
+        assert (tmp_path / "zygote.err").read_text().count("restarting in") == 3
+    finally:
+        zygote.terminate()
+        zygote.wait(timeout=10)
+    assert not os.path.exists(socket_path)
+
+
+def test_shard_of_parses_only_ascii_indexes():
+    assert server.shard_of("3.9f1c") == 3
+    assert server.shard_of("12.x") == 12
+    for session_id in ("9f1c", ".x", "\xb2.x", "\u0663.x", "-1.x", "3"):
+        assert server.shard_of(session_id) is None
+
+
+@pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="requires SCM_RIGHTS fd passing")
+def test_http_workers_keep_session_affinity_and_restart():
+    """Every request of a session reaches its owning worker; a killed worker is replaced."""
+    import httpx
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(root, "server.py"), "--transport", "http", "--port", "0",
+         "--json-response", "--http-workers", "2"],
+        stderr=subprocess.PIPE, text=True,
+    )
+    headers = {"Accept": "application/json, text/event-stream"}
+
+    def post(url, message, session_id=None):
+        extra = {"Mcp-Session-Id": session_id, "Mcp-Protocol-Version": "2025-06-18"} if session_id else {}
+        # A new client per request means a new connection the router must place.
+        with httpx.Client(timeout=10) as client:
+            return client.post(url, json=message, headers={**headers, **extra})
+
+    def initialize(url):
+        response = post(url, {
+            "jsonrpc": "2.0", "id": 0, "method": "initialize",
+            "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+                       "clientInfo": {"name": "test", "version": "0"}},
+        })
+        session_id = response.headers["mcp-session-id"]
+        post(url, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session_id)
+        return session_id
+
+    try:
+        url = proc.stderr.readline().split()[-1] + "/"
+        started = [proc.stderr.readline().split() for _ in range(2)]
+        pids = {int(words[2]): int(words[-1].rstrip(")")) for words in started}
+        sessions = {}
+        for _ in range(50):
+            session_id = initialize(url)
+            sessions.setdefault(server.shard_of(session_id), session_id)
+            if len(sessions) == 2:
+                break
+        assert set(sessions) == {0, 1}
+
+        for shard, session_id in sessions.items():
+            for i in range(6):
+                response = post(url, {"jsonrpc": "2.0", "id": i + 1, "method": "tools/call",
+                                      "params": {"name": "echo", "arguments": {"message": f"{shard}-{i}"}}},
+                                session_id)
+                assert response.json()["result"]["content"][0]["text"] == f"ECHO: {shard}-{i}"
+
+        # Adopted connections have Nagle off: keep-alive responses do not wait on delayed ACKs.
+        host, port = url.split("//")[1].split("/")[0].rsplit(":", 1)
+        elapsed = []
+        with socket.create_connection((host, int(port))) as sock, sock.makefile("rb") as reader:
+            for i in range(10):
+                body = json.dumps({"jsonrpc": "2.0", "id": i + 1, "method": "tools/call",
+                                   "params": {"name": "echo", "arguments": {"message": "x"}}}).encode()
+                start = time.perf_counter()
+                sock.sendall(
+                    f"POST /mcp/ HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                    f"Accept: application/json, text/event-stream\r\nMcp-Session-Id: {sessions[0]}\r\n"
+                    f"Mcp-Protocol-Version: 2025-06-18\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                length = 0
+                while (line := reader.readline()) != b"\r\n":
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                assert b"ECHO: x" in reader.read(length)
+                elapsed.append(time.perf_counter() - start)
+        assert sorted(elapsed)[5] < 0.03
+
+        # A non-ASCII "digit" prefix is not a shard; the request is answered, not dropped.
+        with httpx.Client(timeout=10) as client:
+            response = client.post(url, json={"jsonrpc": "2.0", "id": 8, "method": "tools/list"},
+                                   headers={**headers, "Mcp-Session-Id": b"\xb2.x"})
+        assert response.status_code == 404
+
+        os.kill(pids[1], signal.SIGKILL)
+        assert "exited" in proc.stderr.readline()
+        assert proc.stderr.readline().startswith("HTTP worker 1 started")
+        assert post(url, {"jsonrpc": "2.0", "id": 9, "method": "tools/list"}, sessions[1]).status_code == 404
+        assert post(url, {"jsonrpc": "2.0", "id": 9, "method": "tools/list"}, sessions[0]).status_code == 200
+        assert server.shard_of(initialize(url)) in (0, 1)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def test_transport_selection():
+    """stdio stays the default; http is selectable from the entry point."""
+    assert server.parse_args([]).transport == "stdio"
+    args = server.parse_args(["--transport", "http", "--port", "9123", "--keep-alive", "5"])
+    assert (args.transport, args.port, args.keep_alive) == ("http", 9123, 5)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])